@@ -1,20 +1,28 @@
 import os
 import pygame
-import random
 import sys
-import cv2
 import mediapipe as mp
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_landmark_arguments, add_service_arguments, add_scheduler_arguments,
+                        add_latency_arguments, make_parser, make_solution, open_capture, open_display,
+                        open_latency, open_profiler, close_capture)
+from common.landmarks import HAND_CONNECTIONS, hands_to_array
+from common.overlay import LandmarkOverlay
+from common.tracking import HandTrackingWorker
+from preview import CameraPreview
+from simulation import MAX_CATCH_UP, OBSTACLE_SPEED, TICK, TICK_RATE, CarSimulation
+
 # Optional: set Pygame window position
 os.environ['SDL_VIDEO_WINDOW_POS'] = '700,100'
 
-# Initialize Pygame
-pygame.init()
-
 # Initial game window size
 INITIAL_WIDTH, INITIAL_HEIGHT = 600, 800
-win = pygame.display.set_mode((INITIAL_WIDTH, INITIAL_HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Hand-Controlled Car Game")
+CAPTION = "Hand-Controlled Car Game"
+
+# Game window and fonts, created in main() once the display is known
+win = None
+title_font = button_font = score_font = None
 
 # Colors
 WHITE = (255, 255, 255)
@@ -24,54 +32,104 @@ DARK_GRAY = (30, 30, 30)
 GREEN = (0, 200, 0)
 BLUE = (0, 122, 255)
 
-# Fonts
-title_font = pygame.font.SysFont("Arial", 60)
-button_font = pygame.font.SysFont("Arial", 35)
-score_font = pygame.font.SysFont("Arial", 30)
-
-# Clock
+# Clock; game logic runs at TICK_RATE whatever the render rate is
 clock = pygame.time.Clock()
 FPS = 60
 
-# Initial car size (will adjust dynamically)
-car_width, car_height = 60, 100
-
-# Obstacles
-obstacles = []
-obstacle_width, obstacle_height = 60, 100
-obstacle_speed = 15
-
-
-def spawn_obstacle(WIDTH):
-    x = random.randint(50, WIDTH - obstacle_width - 50)
-    return pygame.Rect(x, -obstacle_height, obstacle_width, obstacle_height)
-
-
-def draw_window(state, score, WIDTH, HEIGHT, car, obstacles):
-    win.fill(GRAY)
-
-    # Road borders
-    pygame.draw.rect(win, (80, 80, 80), (40, 0, WIDTH - 80, HEIGHT))
 
-    # Lane lines
-    lane_line_height = 40
-    lane_line_gap = 60
-    for i in range(0, HEIGHT, lane_line_gap):
-        pygame.draw.rect(win, WHITE, (WIDTH // 2 - 5, i, 10, lane_line_height))
-
-    # Obstacles
-    for obs in obstacles:
-        pygame.draw.rect(win, WHITE, obs)
-
-    # Car
-    pygame.draw.rect(win, RED, car)
-
-    # Score (only show if game is playing)
-    if state == "playing":
-        score_text = score_font.render(f"Score: {score}", True, WHITE)
-        win.blit(score_text, (40, 30))
-
-    pygame.display.update()
+class RoadRenderer:
+    """Draws the playing screen touching as few pixels as possible.
+
+    The road (background, borders) and the lane line pattern are rendered once
+    per window size; the lanes scroll by blitting the pattern at an offset.
+    Each frame only the areas covered by last frame's sprites are restored
+    from the cached road, and draw() returns the rectangles that changed so
+    the display update is limited to them. The score text is re-rendered
+    only when the score changes. Obstacles are blitted in one batch from a
+    cached sprite; with more than DIRTY_LIMIT of them a full repaint is
+    cheaper than tracking their rects.
+    """
+
+    LANE_LINE_HEIGHT = 40
+    LANE_LINE_GAP = 60
+    DIRTY_LIMIT = 200
+
+    def __init__(self, lanes=2):
+        self.lane_count = max(1, lanes)
+        self.size = None
+        self.road = None
+        self.lanes = None
+        self.lane_rects = []
+        self.sprites = {}
+        self.previous = []   # Rects drawn last frame, to be restored
+        self.scroll = 0
+        self._score = None
+        self._score_text = None
+
+    def _build(self, size):
+        width, height = size
+        self.road = pygame.Surface(size).convert()
+        self.road.fill(GRAY)
+        # Road borders
+        pygame.draw.rect(self.road, (80, 80, 80), (40, 0, width - 80, height))
+
+        # Lane lines between the lanes, one gap taller than the window so they can scroll
+        self.lane_rects = [pygame.Rect(40 + (width - 80) * i // self.lane_count - 5, 0, 10, height)
+                           for i in range(1, self.lane_count)]
+        self.lanes = pygame.Surface((10, height + self.LANE_LINE_GAP)).convert()
+        self.lanes.fill((80, 80, 80))
+        for i in range(0, height + self.LANE_LINE_GAP, self.LANE_LINE_GAP):
+            pygame.draw.rect(self.lanes, WHITE, (0, i, 10, self.LANE_LINE_HEIGHT))
+        self.size = size
+
+    def invalidate(self):
+        """Force a full repaint, e.g. after another screen was shown"""
+        self.size = None
+
+    def sprite(self, width, height):
+        surface = self.sprites.get((width, height))
+        if surface is None:
+            surface = self.sprites[(width, height)] = pygame.Surface((width, height)).convert()
+            surface.fill(WHITE)
+        return surface
+
+    def score_text(self, score):
+        if score != self._score:
+            self._score = score
+            self._score_text = score_font.render(f"Score: {score}", True, WHITE)
+        return self._score_text
+
+    def draw(self, surface, state, score, car, obstacles, speed):
+        """Draw one frame; returns the dirty rects, or None after a full repaint"""
+        size = surface.get_size()
+        full = size != self.size or len(obstacles) > self.DIRTY_LIMIT
+        if size != self.size:
+            self._build(size)
+        if full:
+            surface.blit(self.road, (0, 0))
+        else:
+            surface.blits([(self.road, rect, rect) for rect in self.previous], doreturn=False)
+
+        # Lane lines
+        self.scroll = (self.scroll + speed) % self.LANE_LINE_GAP
+        area = pygame.Rect(0, self.LANE_LINE_GAP - self.scroll, 10, size[1])
+        surface.blits([(self.lanes, rect, area) for rect in self.lane_rects], doreturn=False)
+
+        # Obstacles
+        # Their rects are kept after a full repaint too, so the next frame erases them
+        batch = [(self.sprite(w, h), (x, y)) for x, y, w, h in obstacles.active.tolist()]
+        drawn = surface.blits(batch)
+
+        # Car
+        drawn.append(pygame.draw.rect(surface, RED, car))
+
+        # Score (only show if game is playing)
+        if state == "playing":
+            drawn.append(surface.blit(self.score_text(score), (40, 30)))
+
+        dirty = None if full else self.previous + drawn + self.lane_rects
+        self.previous = drawn
+        return dirty
 
 
 def draw_menu(WIDTH, HEIGHT):
@@ -88,8 +146,6 @@ def draw_menu(WIDTH, HEIGHT):
         start_btn_rect.centery - start_btn_text.get_height() // 2)
     )
 
-    pygame.display.update()
-
 
 def draw_game_over(WIDTH, HEIGHT):
     win.fill(DARK_GRAY)
@@ -116,156 +172,188 @@ def draw_game_over(WIDTH, HEIGHT):
         quit_rect.centery - quit_text.get_height() // 2)
     )
 
-    pygame.display.update()
 
-
-def main():
-    global obstacles
-    score = 0
+def main(argv=None):
+    global win, title_font, button_font, score_font
+    parser = make_parser("Hand-controlled car game")
+    add_landmark_arguments(parser)
+    add_service_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_latency_arguments(parser)
+    parser.add_argument("--stress", type=int, default=0, metavar="N",
+                        help="benchmark mode: start playing at once, keep about N obstacles "
+                             "on screen and never end the game on a collision")
+    parser.add_argument("--lanes", type=int, default=2, help="number of road lanes (default: 2)")
+    parser.add_argument("--seed", type=int, default=None, help="seed obstacle placement for repeatable runs")
+    parser.add_argument("--composite", action="store_true",
+                        help="show the camera preview inside the game window instead of a separate "
+                             "OpenCV window")
+    parser.add_argument("--preview-fps", type=float, default=15.0, metavar="FPS",
+                        help="with --composite, how often the preview takes a new camera frame (default: 15)")
+    args = parser.parse_args(argv)
+
+    # Initialize Pygame
+    display = open_display(args)
+    win = display.init_pygame((INITIAL_WIDTH, INITIAL_HEIGHT), CAPTION, pygame.RESIZABLE)
+    title_font = pygame.font.SysFont("Arial", 60)
+    button_font = pygame.font.SysFont("Arial", 35)
+    score_font = pygame.font.SysFont("Arial", 30)
 
     # Hand tracking setup
-    mp_drawing = mp.solutions.drawing_utils
     mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(max_num_hands=1,
-                           min_detection_confidence=0.7,
-                           min_tracking_confidence=0.7)
-
-    # Webcam
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
-    cv2.namedWindow('Hand Camera')
-    cv2.moveWindow('Hand Camera', 100, 100)
-
-    game_state = "menu"
-    spawn_timer = 0
-    frame_counter = 0
+    hands = make_solution(args, "hands", lambda: mp_hands.Hands(max_num_hands=1,
+                                                                min_detection_confidence=0.7,
+                                                                min_tracking_confidence=0.7), max_hands=1)
+
+    overlay = LandmarkOverlay(HAND_CONNECTIONS, point_color=(0, 255, 0), line_color=(255, 0, 0))
+
+    def draw_hand(frame, results):
+        overlay.draw(frame, hands_to_array(results))
+
+    # Webcam and inference run on a worker thread so the game keeps its FPS
+    cap = open_capture(args, width=320, height=240)
+    profiler = open_profiler(args, "car_game")
+    latency = open_latency(args, "car_game")
+    latency_seq = 0
+    tracker = HandTrackingWorker(cap, hands, scale=args.inference_scale, landmark=8,
+                                 annotate=None if args.composite else draw_hand,
+                                 profile=profiler.enabled).start()
+    preview = CameraPreview(HAND_CONNECTIONS, args.preview_fps) if args.composite else None
+    shown_seq = 0
+    renderer = RoadRenderer(args.lanes)
+    static_screen = None  # Menu / game over screen currently on the window
+
+    def shutdown():
+        tracker.stop()
+        close_capture(cap)
+        display.close()
+        pygame.quit()
+        sys.exit()
+    if preview is None:
+        display.named_window('Hand Camera')
+        display.move_window('Hand Camera', 100, 100)
+
+    game_state = "playing" if args.stress else "menu"
 
     # Set initial window size variables
     WIDTH, HEIGHT = pygame.display.get_surface().get_size()
-
-    # Initialize car rect dynamically
-    car_width_dynamic = max(40, WIDTH // 10)
-    car_height_dynamic = max(60, HEIGHT // 8)
-    car = pygame.Rect(WIDTH // 2 - car_width_dynamic // 2, HEIGHT - 150, car_width_dynamic, car_height_dynamic)
-
-    # Adjust obstacle size dynamically (optional)
-    global obstacle_width, obstacle_height
-    obstacle_width = max(40, WIDTH // 10)
-    obstacle_height = max(60, HEIGHT // 8)
+    sim = CarSimulation(WIDTH, HEIGHT, seed=args.seed, stress=args.stress)
+    lag = 0.0  # Game time not simulated yet, in seconds
 
     while True:
-        clock.tick(FPS)
-        frame_counter += 1
+        profiler.next_frame()
+        with profiler.stage("tick"):
+            elapsed = display.tick(clock, FPS)
+
+        # Headless runs have no wall clock to follow: one tick per frame
+        lag += TICK if display.headless else elapsed / 1000.0
 
         # Update current window size on each frame
         WIDTH, HEIGHT = pygame.display.get_surface().get_size()
+        if (WIDTH, HEIGHT) != (sim.width, sim.height):
+            sim.resize(WIDTH, HEIGHT)
 
-        # Update car and obstacle sizes relative to window size if you want (optional)
-        car_width_dynamic = max(40, WIDTH // 10)
-        car_height_dynamic = max(60, HEIGHT // 8)
-        obstacle_width = max(40, WIDTH // 10)
-        obstacle_height = max(60, HEIGHT // 8)
-
-        # Update car size but keep position centered horizontally
-        car.width = car_width_dynamic
-        car.height = car_height_dynamic
-        # Keep car near bottom
-        if car.bottom != HEIGHT - 50:
-            car.bottom = HEIGHT - 50
-
-        for event in pygame.event.get():
+        key = None
+        for event in display.pygame_events():
             if event.type == pygame.QUIT:
-                cap.release()
-                cv2.destroyAllWindows()
-                pygame.quit()
-                sys.exit()
+                shutdown()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                key = 27
 
             if game_state == "menu":
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if WIDTH // 2 - 100 <= event.pos[0] <= WIDTH // 2 + 100 and HEIGHT // 2 <= event.pos[1] <= HEIGHT // 2 + 60:
                         game_state = "playing"
-                        car.x = WIDTH // 2 - car.width // 2
-                        obstacles = []
-                        score = 0
+                        sim.reset()
+                        lag = 0.0
 
             elif game_state == "game_over":
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if WIDTH // 2 - 110 <= event.pos[0] <= WIDTH // 2 - 10:
                         game_state = "playing"
-                        car.x = WIDTH // 2 - car.width // 2
-                        obstacles = []
-                        score = 0
+                        sim.reset()
+                        lag = 0.0
                     elif WIDTH // 2 + 10 <= event.pos[0] <= WIDTH // 2 + 110:
-                        cap.release()
-                        cv2.destroyAllWindows()
-                        pygame.quit()
-                        sys.exit()
-
-        # Webcam processing
-        success, frame = cap.read()
-        if not success:
-            continue
-
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        results = hands.process(frame_rgb)
-
-
-        if results and results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2))
-
-                index_finger = hand_landmarks.landmark[8]
-                finger_x = int(index_finger.x * WIDTH)
-                car.centerx += (finger_x - car.centerx) // 3
-
-                # Clamp inside road borders dynamically
-                if car.left < 40:
-                    car.left = 40
-                if car.right > WIDTH - 40:
-                    car.right = WIDTH - 40
-
-        cv2.imshow('Hand Camera', frame)
-        if cv2.waitKey(1) & 0xFF == 27:
+                        shutdown()
+
+        # Latest hand position from the tracking worker, never waits
+        sample = tracker.latest()
+        steer = sample.point[0] if sample is not None and sample.point is not None else None
+        if sample is not None and sample.seq != latency_seq:
+            latency_seq = sample.seq
+            latency.begin(sample.timestamp)
+            latency.mark("inference", sample.inferred)
+
+        with profiler.stage("display"):
+            if preview is not None:
+                # Single window: no OpenCV event loop to service
+                if preview.update(sample):
+                    shown_seq = sample.seq
+                polled = display.next_frame() & 0xFF
+            else:
+                if sample is not None and sample.seq != shown_seq:
+                    display.show('Hand Camera', sample.frame)
+                    shown_seq = sample.seq
+                polled = display.wait_key(1) & 0xFF
+            key = key or polled
+        if tracker.finished:
+            last = tracker.latest()
+            if last is None or last.seq == shown_seq or preview is not None:
+                break  # Source ran out and its last frame has been used
+        if key == 27:
             break
 
-        if game_state == "menu":
-            draw_menu(WIDTH, HEIGHT)
+        with profiler.stage("game"):
+            dirty = None
+            if game_state == "menu":
+                lag = 0.0
+                if static_screen != ("menu", WIDTH, HEIGHT):
+                    draw_menu(WIDTH, HEIGHT)
+                    static_screen = ("menu", WIDTH, HEIGHT)
+                else:
+                    dirty = []
+
+            elif game_state == "playing":
+                # Fixed timestep: as many ticks as the elapsed time covers
+                lag = min(lag, MAX_CATCH_UP * TICK)
+                steps = 0
+                while lag >= TICK and not sim.game_over:
+                    sim.step(steer)
+                    lag -= TICK
+                    steps += 1
+                if steps:
+                    latency.mark("update")
+                if sim.game_over:
+                    game_state = "game_over"
 
-        elif game_state == "playing":
-            spawn_timer += 1
-            if spawn_timer > 30:
-                obstacles.append(spawn_obstacle(WIDTH))
-                spawn_timer = 0
+                if static_screen is not None:
+                    renderer.invalidate()
+                    static_screen = None
+                dirty = renderer.draw(win, game_state, sim.score, pygame.Rect(sim.car), sim.obstacles,
+                                      OBSTACLE_SPEED * steps)
 
-            new_obstacles = []
-            for obs in obstacles:
-                obs.y += obstacle_speed
-                if obs.y > HEIGHT:
-                    score += 1
+            elif game_state == "game_over":
+                lag = 0.0
+                if static_screen != ("game_over", WIDTH, HEIGHT):
+                    draw_game_over(WIDTH, HEIGHT)
+                    static_screen = ("game_over", WIDTH, HEIGHT)
                 else:
-                    new_obstacles.append(obs)
-            obstacles = new_obstacles
-
-            for obs in obstacles:
-                if car.colliderect(obs):
-                    game_state = "game_over"
+                    dirty = []
 
-            draw_window(game_state, score, WIDTH, HEIGHT, car, obstacles)
+            if preview is not None:
+                with profiler.stage("preview"):
+                    covered = preview.draw(win)
+                if covered is not None and dirty is not None:
+                    dirty.append(covered)
 
-        elif game_state == "game_over":
-            draw_game_over(WIDTH, HEIGHT)
+            display.present(CAPTION, win, dirty)
+        latency.present()
 
     # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
-    pygame.quit()
-    sys.exit()
+    if args.stress:
+        print(f"[STRESS] {len(sim.obstacles)} obstacles on screen, {args.lanes} lanes, "
+              f"score {sim.score}, {sim.collisions} collision ticks in {sim.ticks / TICK_RATE:.0f}s of game time")
+    shutdown()
 
 
 if __name__ == "__main__":
@@ -1,56 +1,69 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_landmark_arguments, add_scheduler_arguments, make_parser, make_solution,
+                        open_capture, open_display, open_profiler, close_capture)
+from common.inference import inference_input
+from common.landmarks import HAND_CONNECTIONS, hands_to_array
+from common.overlay import LandmarkOverlay
+
+parser = make_parser("MediaPipe hand tracking demo")
+add_landmark_arguments(parser)
+add_scheduler_arguments(parser)
+args = parser.parse_args()
+
 # Initialize MediaPipe Hands
-mp_drawing = mp.solutions.drawing_utils
 mp_hands = mp.solutions.hands
 
+# Red dots, green lines and green node numbers, drawn in one batch per frame
+overlay = LandmarkOverlay(HAND_CONNECTIONS, point_color=(0, 0, 255), radius=7,
+                          line_color=(0, 255, 0), thickness=7,
+                          labels=True, label_color=(0, 255, 0), font_scale=0.4)
+
 # Webcam capture
-cap = cv2.VideoCapture(0)
+cap = open_capture(args)
+profiler = open_profiler(args, "hand_tracking")
+display = open_display(args)
 
-with mp_hands.Hands(
+with make_solution(args, "hands", lambda: mp_hands.Hands(
     max_num_hands=2,
     min_detection_confidence=0.7,
-    min_tracking_confidence=0.7) as hands:
+    min_tracking_confidence=0.7), max_hands=2) as hands:
 
     while cap.isOpened():
-        success, image = cap.read()
+        profiler.next_frame()
+        with profiler.stage("read"):
+            success, image = cap.read()
         if not success:
             print("Ignoring empty camera frame.")
             continue
 
-        image = cv2.flip(image, 1)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with profiler.stage("flip"):
+            image = cv2.flip(image, 1)
+        # Inference gets its own (possibly smaller) RGB copy, so the
+        # BGR frame can be drawn on directly without converting back
+        with profiler.stage("cvtColor"):
+            image_rgb = inference_input(image, args.inference_scale)
         image_rgb.flags.writeable = False
 
         # Detect hand
-        results = hands.process(image_rgb)
+        with profiler.stage("inference"):
+            results = hands.process(image_rgb)
 
-        image_rgb.flags.writeable = True
-        image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-
-        # Draw hand landmarks
+        # Draw hand landmarks and node numbers
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                image,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=5, circle_radius=7),  # Dots
-                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=7))  # Lines
-
-
-                # Draw node numbers
-                for i, landmark in enumerate(hand_landmarks.landmark):
-                    h, w, _ = image.shape
-                    cx, cy = int(landmark.x * w), int(landmark.y * h)
-                    cv2.putText(image, str(i), (cx, cy), cv2.FONT_HERSHEY_SIMPLEX,
-                                0.4, (0, 255, 0), 1)
+            with profiler.stage("draw"):
+                overlay.draw(image, hands_to_array(results))
 
-        cv2.imshow('Hand Tracking', image)
+        with profiler.stage("display"):
+            display.show('Hand Tracking', image)
+            key = display.wait_key(5) & 0xFF
 
-        if cv2.waitKey(5) & 0xFF == 27:  # ESC to exit
+        if key == 27:  # ESC to exit
             break
 
-cap.release()
-cv2.destroyAllWindows()
+close_capture(cap)
+display.close()
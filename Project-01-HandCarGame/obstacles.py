@@ -0,0 +1,112 @@
+import sys
+import time
+
+import numpy as np
+
+
+class ObstacleField:
+    """Obstacle rectangles kept in preallocated NumPy arrays.
+
+    Active obstacles are the first `count` rows of `rects` (x, y, w, h), so
+    moving, culling and collision are single array operations instead of a
+    Python loop over pygame.Rect objects. Storage doubles when it runs out.
+    """
+
+    def __init__(self, capacity=256):
+        self.rects = np.zeros((capacity, 4), dtype=np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def active(self):
+        """(count, 4) view of the live obstacles"""
+        return self.rects[:self.count]
+
+    def clear(self):
+        self.count = 0
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed > len(self.rects):
+            grown = np.zeros((max(needed, 2 * len(self.rects)), 4), dtype=np.int32)
+            grown[:self.count] = self.active
+            self.rects = grown
+
+    def spawn(self, x, y, width, height):
+        self._reserve(1)
+        self.rects[self.count] = (x, y, width, height)
+        self.count += 1
+
+    def spawn_many(self, xs, ys, width, height):
+        n = len(xs)
+        self._reserve(n)
+        block = self.rects[self.count:self.count + n]
+        block[:, 0] = xs
+        block[:, 1] = ys
+        block[:, 2] = width
+        block[:, 3] = height
+        self.count += n
+
+    def advance(self, dy, limit):
+        """Move every obstacle down by dy and drop those past `limit`.
+
+        Returns how many were dropped (each one scores a point).
+        """
+        active = self.active
+        active[:, 1] += dy
+        keep = active[:, 1] <= limit
+        kept = int(np.count_nonzero(keep))
+        passed = self.count - kept
+        if passed:
+            self.rects[:kept] = active[keep]
+            self.count = kept
+        return passed
+
+    def hits(self, rect):
+        """Boolean mask of the obstacles overlapping rect (x, y, w, h)"""
+        x, y, w, h = rect
+        a = self.active
+        return ((a[:, 0] < x + w) & (a[:, 0] + a[:, 2] > x) &
+                (a[:, 1] < y + h) & (a[:, 1] + a[:, 3] > y))
+
+    def collides(self, rect):
+        return bool(self.hits(rect).any())
+
+
+def _benchmark(count, frames=600):
+    """Move and collide `count` obstacles: NumPy field against a list of pygame.Rect"""
+    import pygame
+
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, 1920, count)
+    ys = rng.integers(-100, 1080, count)
+    car = pygame.Rect(900, 900, 60, 100)
+
+    field = ObstacleField(count)
+    field.spawn_many(xs, ys, 60, 100)
+    start = time.perf_counter()
+    for _ in range(frames):
+        field.advance(1, 10 ** 9)
+        field.collides(car)
+    numpy_ms = (time.perf_counter() - start) * 1000.0 / frames
+
+    rects = [pygame.Rect(int(x), int(y), 60, 100) for x, y in zip(xs, ys)]
+    start = time.perf_counter()
+    for _ in range(frames):
+        kept = []
+        for obs in rects:
+            obs.y += 1
+            kept.append(obs)
+        rects = kept
+        any(car.colliderect(obs) for obs in rects)
+    list_ms = (time.perf_counter() - start) * 1000.0 / frames
+
+    print(f"[OBSTACLES] {count} obstacles: numpy {numpy_ms:.3f} ms/frame, "
+          f"pygame.Rect list {list_ms:.3f} ms/frame ({list_ms / max(numpy_ms, 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    for n in [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]:
+        _benchmark(n)
@@ -0,0 +1,72 @@
+import time
+
+import pygame
+
+from common.landmarks import hands_to_array, to_pixels
+
+# Same colors as the landmark overlay of the separate camera window (BGR there)
+LANDMARK_COLOR = (0, 255, 0)
+CONNECTION_COLOR = (0, 0, 255)
+
+
+class CameraPreview:
+    """Camera preview composited into a corner of the pygame window.
+
+    The BGR frame published by the tracking worker is wrapped as a pygame
+    surface with frombuffer(), so it is not copied or colour converted, and
+    the hand landmarks are drawn straight onto the window on top of it. A new
+    frame is taken at most `fps` times per second; in between the previous
+    one is blitted again, which keeps the corner intact under the dirty-rect
+    renderer.
+    """
+
+    def __init__(self, connections, fps=15.0, margin=10):
+        self.connections = sorted(connections)
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.margin = margin
+        self.frame = None     # Keeps the buffer behind `surface` alive
+        self.surface = None
+        self.points = None    # (hands, 21, 2) pixel positions inside the preview
+        self.seq = 0
+        self._last = 0.0
+
+    def update(self, sample):
+        """Take the worker's sample if it is new and the preview is due"""
+        if sample is None or sample.seq == self.seq:
+            return False
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        self.seq = sample.seq
+
+        frame = sample.frame
+        height, width = frame.shape[:2]
+        try:
+            self.surface = pygame.image.frombuffer(frame, (width, height), "BGR")
+        except ValueError:
+            # pygame without BGR buffers: one conversion per preview update
+            frame = frame[..., ::-1].copy()
+            self.surface = pygame.image.frombuffer(frame, (width, height), "RGB")
+        self.frame = frame
+
+        hands = hands_to_array(sample.results) if sample.results else None
+        self.points = to_pixels(hands, width, height) if hands is not None and len(hands) else None
+        return True
+
+    def draw(self, surface):
+        """Blit the preview and its overlay; returns the rect covered, or None"""
+        if self.surface is None:
+            return None
+        width, height = self.surface.get_size()
+        x = surface.get_width() - width - self.margin
+        y = self.margin
+        rect = surface.blit(self.surface, (x, y))
+
+        if self.points is not None:
+            for hand in (self.points + (x, y)).tolist():
+                for a, b in self.connections:
+                    pygame.draw.line(surface, CONNECTION_COLOR, hand[a], hand[b], 2)
+                for point in hand:
+                    pygame.draw.circle(surface, LANDMARK_COLOR, point, 2)
+        return rect
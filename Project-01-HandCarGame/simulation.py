@@ -0,0 +1,195 @@
+"""Game logic of the car game, separate from pygame and the camera.
+
+The game advances in fixed ticks of 1/TICK_RATE seconds with a seeded RNG,
+so a run is fully determined by the seed, the window size and the steering
+signal. Driven headlessly it runs thousands of ticks per second:
+
+    python Project-01-HandCarGame/simulation.py --ticks 100000 --seed 1 --steer sine
+    python Project-01-HandCarGame/simulation.py --steer recordings/session1 --restart
+
+and prints a digest of the final state for regression checks.
+"""
+import argparse
+import hashlib
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from obstacles import ObstacleField
+
+TICK_RATE = 60
+TICK = 1.0 / TICK_RATE
+ROAD_MARGIN = 40        # Road border width on each side
+OBSTACLE_SPEED = 15     # Pixels per tick
+SPAWN_INTERVAL = 30     # Ticks between obstacles (a new one spawns on the tick after)
+MAX_CATCH_UP = 5        # Most ticks simulated for one rendered frame after a stall
+
+
+class CarSimulation:
+    """State and rules of one game.
+
+    step(steer) advances one tick; steer is the normalized x of the steering
+    finger or None when no hand is visible. The car and obstacle sizes follow
+    the window size like they always have, via resize().
+    """
+
+    def __init__(self, width=600, height=800, seed=None, stress=0):
+        self.rng = np.random.default_rng(seed)
+        self.stress = stress  # Keep about this many obstacles on screen; collisions don't end the game
+        self.obstacles = ObstacleField()
+        self.ticks = 0
+        self.collisions = 0
+        self.car_x = 0
+        self.resize(width, height)
+        self.reset()
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        self.car_w = max(40, width // 10)
+        self.car_h = max(60, height // 8)
+        self.obstacle_w = max(40, width // 10)
+        self.obstacle_h = max(60, height // 8)
+        # Keep the car near the bottom
+        self.car_y = height - 50 - self.car_h
+
+    def reset(self):
+        self.car_x = self.width // 2 - self.car_w // 2
+        self.obstacles.clear()
+        self.score = 0
+        self.spawn_timer = 0
+        self.game_over = False
+
+    @property
+    def car(self):
+        return (self.car_x, self.car_y, self.car_w, self.car_h)
+
+    def steer(self, x):
+        """Move the car a third of the way towards normalized x"""
+        center = self.car_x + self.car_w // 2
+        center += (int(x * self.width) - center) // 3
+        self.car_x = center - self.car_w // 2
+
+        # Clamp inside road borders
+        if self.car_x < ROAD_MARGIN:
+            self.car_x = ROAD_MARGIN
+        if self.car_x + self.car_w > self.width - ROAD_MARGIN:
+            self.car_x = self.width - ROAD_MARGIN - self.car_w
+
+    def _spawn(self):
+        if self.stress:
+            n = math.ceil(self.stress * OBSTACLE_SPEED / (self.height + self.obstacle_h))
+            xs = self.rng.integers(ROAD_MARGIN, max(ROAD_MARGIN + 1, self.width - ROAD_MARGIN - self.obstacle_w), n)
+            ys = -self.obstacle_h - self.rng.integers(0, OBSTACLE_SPEED, n)
+            self.obstacles.spawn_many(xs, ys, self.obstacle_w, self.obstacle_h)
+            return
+
+        self.spawn_timer += 1
+        if self.spawn_timer > SPAWN_INTERVAL:
+            x = int(self.rng.integers(50, self.width - self.obstacle_w - 50 + 1))
+            self.obstacles.spawn(x, -self.obstacle_h, self.obstacle_w, self.obstacle_h)
+            self.spawn_timer = 0
+
+    def step(self, steer=None):
+        self.ticks += 1
+        if steer is not None:
+            self.steer(steer)
+        if self.game_over:
+            return
+
+        self._spawn()
+        self.score += self.obstacles.advance(OBSTACLE_SPEED, self.height)
+
+        if self.obstacles.collides(self.car):
+            self.collisions += 1
+            if not self.stress:
+                self.game_over = True
+
+    def digest(self):
+        """Short hash of the complete state, for comparing runs"""
+        h = hashlib.sha1()
+        h.update(np.array([self.ticks, self.score, self.collisions, self.spawn_timer, int(self.game_over),
+                           *self.car], dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(self.obstacles.active).tobytes())
+        return h.hexdigest()[:16]
+
+
+def steering_signal(spec, seed=None):
+    """Endless iterator of normalized steering x (None = no hand).
+
+    spec is "sine", "random" (seeded random walk), a landmark recording
+    directory (index fingertip of the first hand) or a text file with one
+    value per line, empty or nan for no hand. Recordings and files repeat.
+    """
+    if spec == "sine":
+        t = 0
+        while True:
+            yield 0.5 + 0.4 * math.sin(2 * math.pi * t / 240)
+            t += 1
+
+    if spec == "random":
+        rng = np.random.default_rng(seed)
+        x = 0.5
+        while True:
+            x = min(max(x + rng.normal(0, 0.02), 0.0), 1.0)
+            yield x
+
+    if os.path.isdir(spec):
+        from common.recording import LandmarkReplay
+        replay = LandmarkReplay(spec)
+        values = []
+        for i in range(len(replay)):
+            chunk, row = divmod(i, replay.chunk_size)
+            counts = replay.hand_count[chunk]  # None before hands were first recorded
+            values.append(float(replay.hands[chunk][row, 0, 8, 0]) if counts is not None and counts[row] else None)
+    else:
+        with open(spec) as f:
+            values = [float(v) if v.strip() and v.strip().lower() != "nan" else None
+                      for v in (line.split(",")[-1] for line in f)]
+    if not values:
+        raise ValueError(f"{spec}: empty steering signal")
+    while True:
+        yield from values
+
+
+def run(ticks, seed=None, steer="sine", width=600, height=800, stress=0, restart=False):
+    """Drive a simulation headlessly; returns it with the games played and elapsed time"""
+    sim = CarSimulation(width, height, seed, stress)
+    signal = steering_signal(steer, seed)
+    games = 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if sim.game_over:
+            if not restart:
+                break
+            sim.reset()
+            games += 1
+        sim.step(next(signal))
+    return sim, games, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless fixed-timestep car game simulation")
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steer", default="sine",
+                        help="sine, random, a landmark recording directory or a file of x values")
+    parser.add_argument("--width", type=int, default=600)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--stress", type=int, default=0, metavar="N", help="keep about N obstacles on screen")
+    parser.add_argument("--restart", action="store_true", help="start a new game after a crash")
+    args = parser.parse_args(argv)
+
+    sim, games, elapsed = run(args.ticks, args.seed, args.steer, args.width, args.height,
+                              args.stress, args.restart)
+    print(f"[SIM] {sim.ticks} ticks in {elapsed:.2f}s ({sim.ticks / elapsed if elapsed else 0:.0f} ticks/s, "
+          f"{sim.ticks / TICK_RATE:.0f}s of game time)")
+    print(f"[SIM] games={games} score={sim.score} collisions={sim.collisions} "
+          f"obstacles={len(sim.obstacles)} digest={sim.digest()}")
+
+
+if __name__ == "__main__":
+    main()
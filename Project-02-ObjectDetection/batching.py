@@ -0,0 +1,216 @@
+"""Batched YOLO inference shared by several frame streams.
+
+Frames from any number of streams are submitted to one FrameBatcher, which
+runs a single predict call on up to `batch_size` of them at once. Benchmark
+batch sizes and weights on the same frames:
+
+    python Project-02-ObjectDetection/batching.py --weights yolov8n.pt yolov8s.pt yolov8m.pt \\
+        --batch 1 2 4 8 --streams 4 --source synthetic:640x480
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class FrameBatcher:
+    """Collect frames into batches and run one predict call per batch.
+
+    submit(stream, frame) returns a Future for that frame's result. A worker
+    thread takes the oldest pending frame and keeps adding frames until the
+    batch has `batch_size` of them or `max_wait` seconds have passed since
+    the oldest one was submitted, then calls predict(frames) once and hands
+    each result back through its frame's Future. Frames are batched in
+    submission order, so every stream gets its results in the order it sent
+    the frames. If predict raises, every Future of that batch raises, and
+    frames still queued at close() are cancelled; submitting after close()
+    raises RuntimeError.
+    """
+
+    def __init__(self, predict, batch_size=4, max_wait=0.010):
+        self.predict = predict
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.batches = 0
+        self.frames = 0
+        self.waits = []       # Submit -> batch start, seconds
+        self.inference = []   # Seconds per predict call
+        self.sizes = []
+        self._next_seq = {}
+        self._queue = queue.Queue()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="FrameBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, stream, frame):
+        if not self._running:
+            raise RuntimeError("submit() on a closed FrameBatcher")
+        seq = self._next_seq.get(stream, 0)
+        self._next_seq[stream] = seq + 1
+        future = Future()
+        self._queue.put((time.perf_counter(), stream, seq, frame, future))
+        return future
+
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                results = self.predict([item[3] for item in batch])
+            except Exception as e:
+                for item in batch:
+                    item[4].set_exception(e)
+                continue
+            self.inference.append(time.perf_counter() - start)
+            self.waits.extend(start - item[0] for item in batch)
+            self.sizes.append(len(batch))
+            self.batches += 1
+            self.frames += len(batch)
+            for item, result in zip(batch, results):
+                item[4].set_result(result)
+
+    def stats(self):
+        waits = np.asarray(self.waits) * 1000.0 if self.waits else np.zeros(1)
+        inference = np.asarray(self.inference) * 1000.0 if self.inference else np.zeros(1)
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch": self.frames / self.batches if self.batches else 0.0,
+            "wait_p50": float(np.percentile(waits, 50)),
+            "wait_p95": float(np.percentile(waits, 95)),
+            "batch_ms": float(inference.mean()),
+            "frame_ms": float(inference.sum() / self.frames) if self.frames else 0.0,
+        }
+
+    def close(self):
+        """Stop the worker; frames still queued are cancelled so nobody waits on them"""
+        self._running = False
+        self._thread.join(timeout=2.0)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            item[4].cancel()
+
+
+def yolo_predict(model, **kwargs):
+    """predict(frames) for a FrameBatcher from an ultralytics YOLO model"""
+    def predict(frames):
+        return model(frames, **kwargs)
+    return predict
+
+
+def load_frames(source, count, width=None, height=None, loop=True):
+    """Up to `count` frames of a source, read into memory"""
+    from common.sources import open_source
+
+    cap = open_source(source, width=width, height=height, loop=loop)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            if not cap.isOpened():
+                break
+            continue
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"{source}: no frames")
+    return frames
+
+
+def _run_streams(batcher, frames, streams, per_stream, fps):
+    """Feed `streams` threads of frames through the batcher; returns end-to-end latencies"""
+    latencies = [[] for _ in range(streams)]
+
+    def stream(index):
+        interval = 1.0 / fps if fps else 0.0
+        start = time.perf_counter()
+        for k in range(per_stream):
+            if interval:
+                delay = start + k * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            submitted = time.perf_counter()
+            batcher.submit(index, frames[(index + k * streams) % len(frames)]).result()
+            latencies[index].append(time.perf_counter() - submitted)
+
+    threads = [threading.Thread(target=stream, args=(i,)) for i in range(streams)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.concatenate([np.asarray(l) for l in latencies]) * 1000.0
+
+
+def _benchmark(args):
+    from ultralytics import YOLO
+
+    frames = load_frames(args.source, args.frames, args.width, args.height)
+    print(f"[BATCH] {args.streams} streams x {args.per_stream} frames at {frames[0].shape[1]}x{frames[0].shape[0]}, "
+          f"max wait {args.max_wait:g} ms" + (f", {args.fps:g} FPS per stream" if args.fps else ""))
+    print(f"{'weights':<14}{'batch':>6}{'mean':>7}{'fps':>9}{'ms/frame':>10}{'wait p50':>10}{'wait p95':>10}"
+          f"{'e2e p50':>10}{'e2e p95':>10}")
+
+    for weights in args.weights:
+        model = YOLO(weights)
+        model(frames[:1], verbose=False, imgsz=args.imgsz)  # Warm-up
+        for batch_size in args.batch:
+            batcher = FrameBatcher(yolo_predict(model, verbose=False, imgsz=args.imgsz),
+                                   batch_size, args.max_wait / 1000.0)
+            start = time.perf_counter()
+            latencies = _run_streams(batcher, frames, args.streams, args.per_stream, args.fps)
+            elapsed = time.perf_counter() - start
+            batcher.close()
+            s = batcher.stats()
+            p50, p95 = np.percentile(latencies, [50, 95])
+            print(f"{os.path.basename(weights):<14}{batch_size:>6}{s['mean_batch']:>7.2f}"
+                  f"{s['frames'] / elapsed:>9.1f}{s['frame_ms']:>10.1f}{s['wait_p50']:>10.1f}"
+                  f"{s['wait_p95']:>10.1f}{p50:>10.1f}{p95:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput and latency of batched YOLO inference")
+    parser.add_argument("--source", default="synthetic:640x480", help="frames to run on (any --source spec)")
+    parser.add_argument("--frames", type=int, default=64, help="distinct frames loaded from the source")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--weights", nargs="+", default=["yolov8n.pt", "yolov8s.pt", "yolov8m.pt"])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--streams", type=int, default=4, help="concurrent streams submitting frames")
+    parser.add_argument("--per-stream", type=int, default=50, help="frames each stream submits")
+    parser.add_argument("--fps", type=float, default=0.0,
+                        help="pace every stream at FPS instead of submitting as fast as results return")
+    parser.add_argument("--max-wait", type=float, default=20.0, metavar="MS",
+                        help="longest a frame waits for its batch to fill (default: 20)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+
+def parse_level(spec):
+    """"yolov8s.pt:480" -> ("yolov8s.pt", 480); the size defaults to 640"""
+    weights, _, imgsz = spec.rpartition(":")
+    if not weights or not imgsz.isdigit():
+        return spec, 640
+    return weights, int(imgsz)
+
+
+class AdaptiveController:
+    """Switch between preloaded models and input sizes to stay within a latency budget.
+
+    `levels` is a list of (weights, imgsz) ordered from the most accurate to
+    the fastest; `load(weights, imgsz)` returns a model for one of them and
+    is called for every level up front, so switching never waits on a load.
+    predict(frames) runs the current level and records its latency per
+    frame. Once `window` frames have been measured on a level, the rolling
+    p90 is compared with the budget:
+
+    - above the budget: step to the next faster level;
+    - below `budget * headroom`: step back to the next more accurate level,
+      unless that level was already measured over the budget. That
+      measurement expires once the current level has stayed under the
+      headroom for `reprobe` windows in a row, so a transient overload does
+      not lock out the better model for good.
+
+    The headroom gap and the minimum `window` frames between switches are
+    the hysteresis that keeps it from oscillating between two levels.
+    """
+
+    def __init__(self, levels, load, budget_ms, window=30, headroom=0.7, log=None, reprobe=10):
+        if not levels:
+            raise ValueError("the adaptive controller needs at least one model level")
+        self.levels = list(levels)
+        self.budget_ms = budget_ms
+        self.window = window
+        self.headroom = headroom
+        self.reprobe = reprobe
+        self.models = {}
+        for weights, imgsz in self.levels:
+            start = time.perf_counter()
+            self.models[(weights, imgsz)] = load(weights, imgsz)
+            print(f"[ADAPT] loaded {self._name((weights, imgsz))} in {time.perf_counter() - start:.1f}s")
+
+        self.level = 0
+        self.frames = 0
+        self.switches = []
+        self.measured = {}      # Last rolling p90 seen per level, ms
+        self._calm_frames = 0   # Frames in a row the current level stayed under the headroom
+        self._latencies = deque(maxlen=window)
+        self._log = open(log, "a") if log else None
+
+    @staticmethod
+    def _name(level):
+        weights, imgsz = level
+        return f"{os.path.splitext(os.path.basename(weights))[0]}@{imgsz}"
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    @property
+    def model(self):
+        return self.models[self.current]
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def predict(self, frames):
+        """predict(frames) for a FrameBatcher on the current level"""
+        weights, imgsz = self.current
+        start = time.perf_counter()
+        results = self.model(frames, imgsz=imgsz, verbose=False)
+        per_frame = (time.perf_counter() - start) * 1000.0 / max(len(frames), 1)
+        for _ in frames:
+            self._latencies.append(per_frame)
+        self.frames += len(frames)
+        self._adapt(len(frames))
+        return results
+
+    def _adapt(self, count):
+        if len(self._latencies) < self.window:
+            return
+        p90 = float(np.percentile(self._latencies, 90))
+        self.measured[self.level] = p90
+        target = self.level
+        if p90 > self.budget_ms and self.level + 1 < len(self.levels):
+            target = self.level + 1
+        elif p90 < self.budget_ms * self.headroom and self.level > 0:
+            self._calm_frames += count
+            known = self.measured.get(self.level - 1)
+            if known is not None and known > self.budget_ms and self._calm_frames >= self.reprobe * self.window:
+                # Load has been low for long enough to give the better level another try
+                del self.measured[self.level - 1]
+                known = None
+            if known is None or known <= self.budget_ms:
+                target = self.level - 1
+        else:
+            self._calm_frames = 0
+        if target != self.level:
+            self._switch(target, p90)
+
+    def _switch(self, target, p90):
+        record = {
+            "frame": self.frames,
+            "time": time.time(),
+            "from": self._name(self.current),
+            "to": self._name(self.levels[target]),
+            "p90_ms": round(p90, 2),
+            "budget_ms": round(self.budget_ms, 2),
+        }
+        direction = "over" if target > self.level else "under"
+        print(f"[ADAPT] frame {self.frames}: {record['from']} -> {record['to']} "
+              f"(p90 {p90:.1f} ms {direction} budget {self.budget_ms:.1f} ms)")
+        self.switches.append(record)
+        if self._log is not None:
+            self._log.write(json.dumps(record) + "\n")
+            self._log.flush()
+        self.level = target
+        self._latencies.clear()
+        self._calm_frames = 0
+
+    def stats(self):
+        return {
+            "level": self._name(self.current),
+            "frames": self.frames,
+            "switches": len(self.switches),
+            "measured_p90": {self._name(self.levels[i]): ms for i, ms in self.measured.items()},
+        }
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+
+# COCO's IoU thresholds for mAP50-95
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+# (boxes, scores, classes) of a frame without detections
+EMPTY_DETECTIONS = (np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))
+
+
+def _intersections(a, b):
+    """(N, M) intersection areas and the (N,) / (M,) areas of xyxy boxes"""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter, area_a, area_b
+
+
+def box_iou(a, b):
+    """(N, M) IoU of (N, 4) and (M, 4) xyxy boxes"""
+    inter, area_a, area_b = _intersections(a, b)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def box_ios(a, b):
+    """(N, M) intersection over the smaller box; 1 when one box lies inside the other"""
+    inter, area_a, area_b = _intersections(a, b)
+    smaller = np.minimum(area_a[:, None], area_b[None, :])
+    return np.where(smaller > 0, inter / np.maximum(smaller, 1e-9), 0.0)
+
+
+def detections(result):
+    """(boxes xyxy (N, 4), scores (N,), classes (N,)) float32/int arrays of an ultralytics result"""
+    boxes = result.boxes
+    return (boxes.xyxy.cpu().numpy().astype(np.float32),
+            boxes.conf.cpu().numpy().astype(np.float32),
+            boxes.cls.cpu().numpy().astype(np.int64))
+
+
+def load_yolo_labels(directory, index, width, height):
+    """Ground truth of frame `index` from DIR/NNNNNN.txt in YOLO format (cls cx cy w h, normalized)"""
+    path = os.path.join(directory, f"{index:06d}.txt")
+    if not os.path.exists(path):
+        return EMPTY_DETECTIONS
+    rows = np.loadtxt(path, ndmin=2, dtype=np.float32)
+    if rows.size == 0:
+        return EMPTY_DETECTIONS
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, np.ones(len(rows), np.float32), rows[:, 0].astype(np.int64)
+
+
+def _average_precision(recall, precision):
+    """COCO style 101-point interpolated AP"""
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    points = np.linspace(0, 1, 101)
+    index = np.searchsorted(recall, points, side="left")
+    return float(np.mean(np.where(index < len(precision), precision[np.minimum(index, len(precision) - 1)], 0.0)))
+
+
+def mean_average_precision(predictions, ground_truth, iou_thresholds=IOU_THRESHOLDS):
+    """mAP of per-frame predictions against per-frame ground truth.
+
+    Both are lists with one (boxes, scores, classes) tuple per frame; ground
+    truth scores are ignored. Predictions are matched greedily by score to
+    the unmatched ground truth box of the same class with the highest IoU.
+    Returns {"map50": ..., "map": mean over iou_thresholds}.
+    """
+    classes = set()
+    for _, _, c in ground_truth:
+        classes.update(c.tolist())
+    if not classes:
+        return {"map50": 0.0, "map": 0.0}
+
+    aps = np.zeros((len(classes), len(iou_thresholds)))
+    for ci, cls in enumerate(sorted(classes)):
+        scores, hits, total = [], [], 0
+        for (pb, ps, pc), (gb, _, gc) in zip(predictions, ground_truth):
+            p = pc == cls
+            g = gc == cls
+            total += int(g.sum())
+            if not p.any():
+                continue
+            order = np.argsort(-ps[p])
+            iou = box_iou(pb[p][order], gb[g])
+            matched = np.zeros((len(iou_thresholds), int(g.sum())), dtype=bool)
+            frame_hits = np.zeros((len(order), len(iou_thresholds)), dtype=bool)
+            for k in range(len(order)):
+                for t, threshold in enumerate(iou_thresholds):
+                    candidates = np.where(~matched[t], iou[k], 0.0) if iou.shape[1] else iou[k]
+                    if candidates.size and candidates.max() >= threshold:
+                        j = int(candidates.argmax())
+                        matched[t, j] = True
+                        frame_hits[k, t] = True
+            scores.append(ps[p][order])
+            hits.append(frame_hits)
+        if not scores or total == 0:
+            continue
+        order = np.argsort(-np.concatenate(scores))
+        hits = np.concatenate(hits)[order]
+        tp = np.cumsum(hits, axis=0)
+        fp = np.cumsum(~hits, axis=0)
+        for t in range(len(iou_thresholds)):
+            recall = tp[:, t] / total
+            precision = tp[:, t] / np.maximum(tp[:, t] + fp[:, t], 1)
+            aps[ci, t] = _average_precision(recall, precision)
+
+    return {"map50": float(aps[:, 0].mean()), "map": float(aps.mean())}
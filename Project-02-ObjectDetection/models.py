@@ -0,0 +1,201 @@
+"""Load YOLO through PyTorch, ONNX Runtime or OpenVINO, exporting once.
+
+Exported models are cached on disk, keyed by the weights file contents, the
+input size, the backend and the quantization, so only the first run pays for
+the export. Compare backends on a local video:
+
+    python Project-02-ObjectDetection/models.py --video val.mp4 --configs torch onnx onnx:int8 openvino:int8
+    python Project-02-ObjectDetection/models.py --video val.mp4 --labels val_labels/ --weights yolov8n.pt
+
+Without --labels, mAP is measured against the PyTorch model's detections.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BACKENDS = ("torch", "onnx", "openvino")
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "opencv-projects", "yolo")
+
+
+def resolve_weights(weights):
+    """Local path of the weights, downloading official ones like ultralytics does on first use"""
+    if os.path.exists(weights):
+        return weights
+    from ultralytics.utils.downloads import attempt_download_asset
+    return str(attempt_download_asset(weights))
+
+
+def _weights_digest(weights):
+    """Content hash of a weights file (the name for weights ultralytics has yet to download)"""
+    if not os.path.exists(weights):
+        return hashlib.sha1(weights.encode()).hexdigest()[:12]
+    h = hashlib.sha1()
+    with open(weights, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def cache_path(weights, backend, imgsz, int8=False, dynamic=False, cache_dir=DEFAULT_CACHE):
+    """Where the exported model for these settings lives in the cache"""
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    key = f"{stem}-{_weights_digest(weights)}-{imgsz}{'-int8' if int8 else ''}{'-dynamic' if dynamic else ''}"
+    if backend == "onnx":
+        return os.path.join(cache_dir, key + ".onnx")
+    # ultralytics recognises OpenVINO models by the directory suffix
+    return os.path.join(cache_dir, key + "_openvino_model")
+
+
+def _quantize_onnx(source, target):
+    """Dynamic INT8 weight quantization with ONNX Runtime (ultralytics exports ONNX as FP32 only)"""
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError:
+        raise SystemExit("--int8 with the onnx backend needs onnxruntime (pip install onnxruntime)")
+    quantize_dynamic(source, target, weight_type=QuantType.QUInt8)
+
+
+def export_model(weights, backend, imgsz=640, int8=False, dynamic=False, cache_dir=DEFAULT_CACHE,
+                 data="coco8.yaml"):
+    """Path of the exported model, exporting into the cache on a miss.
+
+    dynamic exports a variable batch size, needed when frames are batched.
+    OpenVINO INT8 is calibrated by ultralytics on `data`.
+    """
+    from ultralytics import YOLO
+
+    # Resolve first so the cache key is the file's hash both before and after the download
+    weights = resolve_weights(weights)
+    target = cache_path(weights, backend, imgsz, int8, dynamic, cache_dir)
+    if os.path.exists(target):
+        return target
+    os.makedirs(cache_dir, exist_ok=True)
+
+    model = YOLO(weights)
+    if backend == "onnx":
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=dynamic)
+        if int8:
+            _quantize_onnx(exported, target)
+            os.remove(exported)
+        else:
+            shutil.move(exported, target)
+    else:
+        options = {"int8": True, "data": data} if int8 else {}
+        exported = model.export(format="openvino", imgsz=imgsz, dynamic=dynamic, **options)
+        shutil.move(exported, target)
+    print(f"[MODEL] exported {weights} to {target}")
+    return target
+
+
+def load_model(weights="yolov8m.pt", backend="torch", imgsz=640, int8=False, dynamic=False,
+               cache_dir=DEFAULT_CACHE, warmup=1):
+    """YOLO model on the requested backend, warmed up with `warmup` blank frames"""
+    from ultralytics import YOLO
+
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if int8 and backend == "torch":
+        raise ValueError("int8 needs an exported backend (onnx or openvino)")
+    if backend == "torch":
+        model = YOLO(weights)
+    else:
+        model = YOLO(export_model(weights, backend, imgsz, int8, dynamic, cache_dir), task="detect")
+
+    # The first predict call builds the predictor and allocates buffers
+    blank = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    for _ in range(warmup):
+        model(blank, imgsz=imgsz, verbose=False)
+    return model
+
+
+def add_model_arguments(parser):
+    """Add --weights/--backend/--int8/--imgsz/--model-cache/--warmup"""
+    group = parser.add_argument_group("model")
+    group.add_argument("--weights", default="yolov8m.pt", help="YOLO weights (default: yolov8m.pt)")
+    group.add_argument("--backend", choices=BACKENDS, default="torch",
+                       help="run the model through PyTorch, or export it once to ONNX / OpenVINO (default: torch)")
+    group.add_argument("--int8", action="store_true",
+                       help="quantize the exported model to INT8 (onnx / openvino only)")
+    group.add_argument("--imgsz", type=int, default=640, help="inference size (default: 640)")
+    group.add_argument("--model-cache", default=DEFAULT_CACHE, metavar="DIR",
+                       help=f"where exported models are kept (default: {DEFAULT_CACHE})")
+    group.add_argument("--warmup", type=int, default=1, metavar="N",
+                       help="blank frames run through the model before the first real one (default: 1)")
+    return parser
+
+
+def _parse_config(spec):
+    backend, _, option = spec.partition(":")
+    if backend not in BACKENDS or option not in ("", "int8") or (backend == "torch" and option):
+        raise argparse.ArgumentTypeError(f"{spec}: expected BACKEND or BACKEND:int8 (int8 for onnx / openvino)")
+    return backend, option == "int8"
+
+
+def _benchmark(args):
+    from batching import load_frames
+    from metrics import detections, load_yolo_labels, mean_average_precision
+
+    frames = load_frames(args.video, args.frames, None, None, loop=False)
+    height, width = frames[0].shape[:2]
+    print(f"[MODEL] {args.weights} at imgsz {args.imgsz} on {len(frames)} frames of {args.video} ({width}x{height})")
+
+    reference = None
+    if args.labels:
+        reference = [load_yolo_labels(args.labels, i, width, height) for i in range(len(frames))]
+
+    print(f"{'config':<16}{'export s':>9}{'startup s':>10}{'mean ms':>9}{'p50':>8}{'p95':>8}{'mAP50':>8}{'mAP50-95':>10}")
+    for backend, int8 in args.configs:
+        start = time.perf_counter()
+        if backend != "torch":
+            export_model(args.weights, backend, args.imgsz, int8, cache_dir=args.model_cache)
+        exported = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model = load_model(args.weights, backend, args.imgsz, int8, cache_dir=args.model_cache, warmup=args.warmup)
+        startup = time.perf_counter() - start
+
+        times, predictions = [], []
+        for frame in frames:
+            t = time.perf_counter()
+            result = model(frame, imgsz=args.imgsz, verbose=False)[0]
+            times.append(time.perf_counter() - t)
+            predictions.append(detections(result))
+        times = np.asarray(times) * 1000.0
+
+        if reference is None:
+            # First config becomes the reference when there are no labels
+            reference = predictions
+        accuracy = mean_average_precision(predictions, reference)
+        p50, p95 = np.percentile(times, [50, 95])
+        name = backend + (":int8" if int8 else "")
+        print(f"{name:<16}{exported:>9.1f}{startup:>10.2f}{times.mean():>9.1f}{p50:>8.1f}{p95:>8.1f}"
+              f"{accuracy['map50']:>8.3f}{accuracy['map']:>10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare YOLO startup, latency and mAP across backends")
+    parser.add_argument("--video", required=True, help="local validation video (or any --source spec)")
+    parser.add_argument("--labels", metavar="DIR",
+                        help="ground truth as YOLO txt files named by frame index (000000.txt); "
+                             "without it the first config is the reference")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--weights", default="yolov8m.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--configs", type=_parse_config, nargs="+",
+                        default=[("torch", False), ("onnx", False), ("onnx", True), ("openvino", False),
+                                 ("openvino", True)],
+                        metavar="BACKEND[:int8]")
+    parser.add_argument("--model-cache", default=DEFAULT_CACHE, metavar="DIR")
+    parser.add_argument("--warmup", type=int, default=1)
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
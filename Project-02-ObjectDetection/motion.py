@@ -0,0 +1,112 @@
+import time
+
+import cv2
+import numpy as np
+
+GATE_WIDTH = 160        # Width the frames are downscaled to before scoring
+PIXEL_THRESHOLD = 25    # Grey level change that counts a pixel as moving
+
+
+def motion_image(frame, width):
+    """Frame downscaled to `width`, grey and blurred, ready for moving_pixels()"""
+    height = frame.shape[0] * width / frame.shape[1]
+    small = cv2.resize(frame, (width, max(1, round(height))), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    return cv2.GaussianBlur(gray, (5, 5), 0)
+
+
+def moving_pixels(image, reference):
+    """Mask of the pixels of a motion_image() that changed against an earlier one"""
+    return cv2.absdiff(image, reference) > PIXEL_THRESHOLD
+
+
+class MotionGate:
+    """Decide per frame whether a mostly static scene needs a new detection.
+
+    Each frame is downscaled to GATE_WIDTH, converted to grey and scored as
+    the fraction of moving pixels: either the difference against the frame
+    the detector last ran on ("diff", so slow drifts add up too) or the
+    foreground of a MOG2 background model ("mog2"). should_infer() is True
+    when the score reaches `threshold` or the cached results are older than
+    `max_stale` seconds; otherwise the caller reuses its cached results.
+
+    Every decision is counted by reason, and the CPU time of the gate itself
+    and of the inferences the caller reports through inferred() give the
+    CPU saved by the skipped frames.
+    """
+
+    def __init__(self, threshold=0.01, max_stale=2.0, method="diff"):
+        if method not in ("diff", "mog2"):
+            raise ValueError(f"unknown motion gate method {method!r}")
+        self.threshold = threshold
+        self.max_stale = max_stale
+        self.method = method
+        self.decisions = {"first": 0, "motion": 0, "stale": 0, "skipped": 0}
+        self.score = 0.0
+        self.gate_cpu = 0.0
+        self.inference_cpu = 0.0
+        self.inferences = 0
+        self._reference = None
+        self._last_inference = None
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(history=300, detectShadows=False) \
+            if method == "mog2" else None
+
+    def _score(self, small):
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(small)
+            return float(np.count_nonzero(mask)) / mask.size
+        if self._reference is None:
+            return 1.0
+        moving = moving_pixels(small, self._reference)
+        return float(np.count_nonzero(moving)) / moving.size
+
+    def should_infer(self, frame):
+        cpu = time.process_time()
+        small = motion_image(frame, GATE_WIDTH)
+        self.score = self._score(small)
+        now = time.perf_counter()
+
+        if self._last_inference is None:
+            reason = "first"
+        elif self.score >= self.threshold:
+            reason = "motion"
+        elif self.max_stale and now - self._last_inference >= self.max_stale:
+            reason = "stale"
+        else:
+            reason = "skipped"
+        self.decisions[reason] += 1
+
+        if reason != "skipped":
+            self._reference = small
+            self._last_inference = now
+        self.gate_cpu += time.process_time() - cpu
+        return reason != "skipped"
+
+    def inferred(self, cpu_seconds):
+        """Report the CPU time the detector took on a frame this gate let through"""
+        self.inference_cpu += cpu_seconds
+        self.inferences += 1
+
+    def stats(self):
+        frames = sum(self.decisions.values())
+        skipped = self.decisions["skipped"]
+        per_inference = self.inference_cpu / self.inferences if self.inferences else 0.0
+        saved = skipped * per_inference - self.gate_cpu
+        return {
+            "frames": frames,
+            "decisions": dict(self.decisions),
+            "skip_rate": skipped / frames if frames else 0.0,
+            "gate_ms": self.gate_cpu * 1000.0 / frames if frames else 0.0,
+            "inference_ms": per_inference * 1000.0,
+            "cpu_saved_s": saved,
+            "cpu_saved": saved / (saved + self.inference_cpu + self.gate_cpu) if saved > 0 else 0.0,
+        }
+
+    def report(self, name="motion gate"):
+        s = self.stats()
+        d = s["decisions"]
+        print(f"[GATE] {name}: {s['frames']} frames, inferred on {d['first'] + d['motion'] + d['stale']} "
+              f"(motion {d['motion']}, stale {d['stale']}), skipped {d['skipped']} ({s['skip_rate']:.0%}); "
+              f"gate {s['gate_ms']:.2f} ms CPU/frame, inference {s['inference_ms']:.1f} ms CPU/frame, "
+              f"~{s['cpu_saved_s']:.1f}s CPU saved ({s['cpu_saved']:.0%})")
+        return s
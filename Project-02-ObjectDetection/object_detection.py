@@ -1,38 +1,328 @@
+import argparse
+import os
+import sys
+import time
 import cv2
-from ultralytics import YOLO
-
-# Load YOLOv8 pre-trained model (YOLOv8n is the lightest version)
-# model = YOLO('yolov8n.pt')  # You can also try 'yolov8s.pt' for slightly better accuracy
-# model = YOLO('yolov8m.pt')
-# model = YOLO('yolov8l.pt')
-model = YOLO('yolov8m.pt')
-print("✅ YOLOv8 model loaded")
-# Open webcam
-cap = cv2.VideoCapture(0)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    # Run YOLOv8 on the frame
-    try:
-        results = model(frame)
-    except Exception as e:
-        print(f"❌ Model prediction failed: {e}")
-        continue
-
-
-    # Annotate the frame with bounding boxes
-    annotated_frame = results[0].plot()
-
-    # Display it
-    cv2.imshow("YOLOv8 Object Detection", annotated_frame)
-
-    if cv2.waitKey(1) & 0xFF == 27:  # Press ESC to quit
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import make_parser, open_capture, open_display, open_profiler, close_capture
+from common.latency import capture_timestamp
+from common.sources import open_source
+from batching import FrameBatcher, yolo_predict
+from controller import AdaptiveController, parse_level
+from models import add_model_arguments, load_model
+from metrics import detections
+from motion import MotionGate
+from pipeline import DetectionPipeline
+from sinks import DetectionSinks
+from tiling import TiledDetector, draw_detections
+from tracker import BoxTracker, DetectionSchedule, draw_tracks
+
+
+def _run_sequential(caps, batcher, windows, display, profiler, schedules=None, names=None, gates=None,
+                    sinks=None, plot_every=1, tilers=None):
+    """Read, detect, plot and show one frame per stream at a time.
+
+    With schedules (one DetectionSchedule per stream) only frames that are
+    due go to the detector; boxes on the others come from the tracker. With
+    gates (one MotionGate per stream) frames of a static scene skip the
+    detector too, and the stream's last results are drawn on them instead.
+    With tilers (one TiledDetector per stream) due frames are detected tile
+    by tile instead of through the batcher.
+    Every frame's boxes go to the sinks; only every plot_every-th frame is
+    annotated and shown (none with 0).
+    """
+    cached = [None] * len(caps)
+    seq = -1
+    running = True
+    while running:
+        profiler.next_frame()
+        with profiler.stage("read"):
+            frames = [cap.read() for cap in caps]
+        if not all(ret for ret, _ in frames):
+            break
+        timestamps = [capture_timestamp(cap) for cap in caps]
+        seq += 1
+        plot = plot_every > 0 and seq % plot_every == 0
+
+        if schedules is not None:
+            with profiler.stage("cvtColor"):
+                grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for _, frame in frames]
+            due = [schedule.due() for schedule in schedules]
+        else:
+            due = [True] * len(frames)
+        if gates is not None:
+            with profiler.stage("gate"):
+                due = [d and gate.should_infer(frame) for d, gate, (_, frame) in zip(due, gates, frames)]
+
+        # Run YOLOv8 on the frames; results come back per stream in order
+        cpu = time.process_time()
+        with profiler.stage("inference"):
+            if tilers is not None:
+                results = []
+                for tiler, d, (_, frame) in zip(tilers, due, frames):
+                    try:
+                        results.append(tiler.detect(frame) if d else None)
+                    except Exception as e:
+                        print(f"❌ Model prediction failed: {e}")
+                        results.append(None)
+            else:
+                futures = [batcher.submit(i, frame) if due[i] else None for i, (_, frame) in enumerate(frames)]
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result() if future is not None else None)
+                    except Exception as e:
+                        print(f"❌ Model prediction failed: {e}")
+                        results.append(None)
+        if gates is not None and any(due):
+            cpu = (time.process_time() - cpu) / sum(due)
+            for gate, d in zip(gates, due):
+                if d:
+                    gate.inferred(cpu)
+
+        for i, (window, result) in enumerate(zip(windows, results)):
+            frame = frames[i][1]
+            if schedules is not None:
+                # Detections update the tracks, the other frames only move them
+                with profiler.stage("track"):
+                    if result is not None:
+                        found = result if tilers is not None else detections(result)
+                        tracks = schedules[i].detect(grays[i], *found)
+                    else:
+                        tracks = schedules[i].track(grays[i])
+            elif result is not None:
+                cached[i] = result
+            elif not due[i] and cached[i] is not None:
+                # Static scene: the last detections still apply
+                result = cached[i]
+            else:
+                continue
+
+            if sinks:
+                with profiler.stage("sink"):
+                    if schedules is not None:
+                        boxes = schedules[i].tracker.detections()
+                    else:
+                        boxes = result if tilers is not None else detections(result)
+                    sinks.write(i, seq, timestamps[i], *boxes)
+            if not plot:
+                continue
+
+            # Annotate the frame with bounding boxes
+            with profiler.stage("plot"):
+                if schedules is not None:
+                    annotated_frame = draw_tracks(frame, tracks, names)
+                elif tilers is not None:
+                    annotated_frame = draw_detections(frame, *result, names)
+                elif due[i]:
+                    annotated_frame = result.plot()
+                else:
+                    annotated_frame = result.plot(img=frame)
+
+            # Display it
+            with profiler.stage("display"):
+                display.show(window, annotated_frame)
+
+        with profiler.stage("display"):
+            key = display.wait_key(1) & 0xFF
+        if key == 27:  # Press ESC to quit
+            running = False
+
+
+def _parse_size(spec):
+    """"640x480" -> (640, 480)"""
+    width, _, height = spec.lower().partition("x")
+    if not (width.isdigit() and height.isdigit()) or int(width) == 0 or int(height) == 0:
+        raise argparse.ArgumentTypeError(f"{spec}: expected WIDTHxHEIGHT, e.g. 640x480")
+    return int(width), int(height)
+
+
+def _sink_writer(sinks):
+    """on_result callback of the pipeline's inference thread"""
+    def write(stream, seq, timestamp, result):
+        sinks.write(stream, seq, timestamp, *detections(result))
+    return write
+
+
+def _run_pipelined(pipeline, windows, display, profiler):
+    """Show annotated frames as the pipeline threads produce them"""
+    while True:
+        frame = pipeline.next_frame()
+        if frame is None:
+            if pipeline.finished:
+                break
+            continue
+        started = time.perf_counter()
+
+        profiler.next_frame()
+        with profiler.stage("display"):
+            display.show(windows[frame.stream], frame.image)
+            key = display.wait_key(1) & 0xFF
+        pipeline.presented(frame, started)
+
+        if key == 27:  # Press ESC to quit
+            break
+
+
+def main(argv=None):
+    """Run detection on the selected source; returns source stats and the stage profile"""
+    parser = make_parser("YOLOv8 object detection")
+    add_model_arguments(parser)
+    parser.add_argument("--capture-size", type=_parse_size, default=(640, 480), metavar="WxH",
+                        help="resolution requested from the camera (default: 640x480)")
+    group = parser.add_argument_group("detection output")
+    group.add_argument("--detections", nargs="+", default=[], metavar="SINK",
+                       help="stream every frame's detections (stream, seq, ts, wall, cls, conf, xyxy) to out.jsonl, "
+                            "a directory of columnar .npy chunks, udp://HOST:PORT or unix:/PATH")
+    group.add_argument("--plot-every", type=int, default=1, metavar="N",
+                       help="annotate and show only every Nth frame; 0 draws nothing (default: 1)")
+    group = parser.add_argument_group("adaptive model")
+    group.add_argument("--adaptive", nargs="+", type=parse_level, metavar="WEIGHTS[:IMGSZ]",
+                       help="preload these models, most accurate first (e.g. yolov8m.pt:640 yolov8s.pt:640 "
+                            "yolov8n.pt:480 yolov8n.pt:320), and switch between them to hold the budget")
+    group.add_argument("--target-fps", type=float, default=None, metavar="FPS",
+                       help="with --adaptive, keep inference under 1000/FPS ms per frame")
+    group.add_argument("--latency-budget", type=float, default=None, metavar="MS",
+                       help="with --adaptive, keep inference under MS per frame")
+    group.add_argument("--adapt-window", type=int, default=30, metavar="N",
+                       help="frames measured on a model before it may be switched (default: 30)")
+    group.add_argument("--adapt-log", metavar="PATH", help="append every switch to PATH as JSONL")
+    group = parser.add_argument_group("batching")
+    group.add_argument("--sources", nargs="+", default=[], metavar="SRC",
+                       help="more streams to detect on alongside --source, batched together")
+    group.add_argument("--batch", type=int, default=1, metavar="B",
+                       help="frames per predict call across all streams (default: 1)")
+    group.add_argument("--max-wait", type=float, default=10.0, metavar="MS",
+                       help="longest a frame waits for its batch to fill (default: 10)")
+    group = parser.add_argument_group("pipelining")
+    group.add_argument("--pipeline", action="store_true",
+                       help="run capture, inference and annotation on separate threads; the display "
+                            "keeps camera rate and overlays the newest detections")
+    group.add_argument("--queue-size", type=int, default=2, metavar="N",
+                       help="frames per stream each pipeline queue holds before dropping the oldest (default: 2)")
+    group = parser.add_argument_group("tracking")
+    group.add_argument("--detect-every", type=int, default=1, metavar="N",
+                       help="run the detector every N frames (and whenever a track is lost); boxes on the "
+                            "frames in between are moved by optical flow and keep their track IDs (default: 1)")
+    group.add_argument("--track-iou", type=float, default=0.3, metavar="IOU",
+                       help="IoU a detection needs to continue an existing track (default: 0.3)")
+    group = parser.add_argument_group("motion gate")
+    group.add_argument("--motion-gate", type=float, default=None, metavar="FRACTION",
+                       help="skip the detector while less than FRACTION of the (downscaled) frame moves "
+                            "and reuse the last results, e.g. 0.01")
+    group.add_argument("--gate-method", choices=("diff", "mog2"), default="diff",
+                       help="difference against the last detected frame, or MOG2 background subtraction "
+                            "(default: diff)")
+    group.add_argument("--max-stale", type=float, default=2.0, metavar="S",
+                       help="with --motion-gate, detect at least every S seconds (default: 2)")
+    group = parser.add_argument_group("tiling")
+    group.add_argument("--tile", type=int, default=0, metavar="SIZE",
+                       help="detect on overlapping SIZE x SIZE tiles of each frame, batched into one predict "
+                            "call, so small objects in high-resolution frames survive (default: 0, off)")
+    group.add_argument("--tile-overlap", type=float, default=0.2, metavar="FRACTION",
+                       help="overlap between neighbouring tiles (default: 0.2)")
+    group.add_argument("--no-full-frame", dest="full_frame", action="store_false",
+                       help="leave the downscaled full frame out of the tile batch")
+    group.add_argument("--tile-motion", type=float, default=0.005, metavar="FRACTION",
+                       help="rerun a tile without detections only when this fraction of it moved (default: 0.005)")
+    group.add_argument("--tile-refresh", type=int, default=30, metavar="N",
+                       help="run every tile at least every N frames (default: 30)")
+    args = parser.parse_args(argv)
+    if args.adaptive and args.target_fps is None and args.latency_budget is None:
+        parser.error("--adaptive needs --target-fps or --latency-budget")
+    if args.int8 and args.backend == "torch":
+        parser.error("--int8 needs --backend onnx or openvino")
+    if args.pipeline and args.detect_every > 1:
+        parser.error("--detect-every is not supported together with --pipeline")
+    if args.pipeline and args.motion_gate is not None:
+        parser.error("--motion-gate is not supported together with --pipeline")
+    if args.pipeline and args.tile:
+        parser.error("--tile is not supported together with --pipeline")
+    streams = 1 + len(args.sources)
+    if not args.pipeline and args.batch > streams:
+        # The sequential loop submits one frame per stream and waits for their results,
+        # so a bigger batch never fills and every frame would sit out --max-wait
+        print(f"[BATCH] --batch {args.batch} capped at {streams} (one frame per stream without --pipeline)")
+        args.batch = streams
+
+    # Load YOLOv8 pre-trained model (YOLOv8n is the lightest version)
+    # --weights yolov8n.pt  # You can also try 'yolov8s.pt' for slightly better accuracy
+    # --weights yolov8l.pt
+    # Exported ONNX / OpenVINO models need a dynamic batch size to take batches (tiles are a batch too)
+    def load(weights, imgsz):
+        return load_model(weights, args.backend, imgsz, args.int8, dynamic=args.batch > 1 or args.tile > 0,
+                          cache_dir=args.model_cache, warmup=args.warmup)
+
+    start = time.perf_counter()
+    controller = None
+    if args.adaptive:
+        budget = args.latency_budget if args.latency_budget is not None else 1000.0 / args.target_fps
+        controller = AdaptiveController(args.adaptive, load, budget, args.adapt_window, log=args.adapt_log)
+        predict, names = controller.predict, controller.names
+    else:
+        model = load(args.weights, args.imgsz)
+        predict, names = yolo_predict(model, imgsz=args.imgsz), model.names
+    print(f"✅ YOLOv8 model loaded ({args.backend}{' int8' if args.int8 else ''}, "
+          f"{time.perf_counter() - start:.1f}s)")
+
+    # Open webcam, plus any extra streams
+    width, height = args.capture_size
+    caps = [open_capture(args, width=width, height=height)]
+    caps += [open_source(source, realtime=args.realtime, width=width, height=height, loop=args.loop)
+             for source in args.sources]
+    windows = ["YOLOv8 Object Detection"] if len(caps) == 1 else \
+        [f"YOLOv8 Object Detection {i}" for i in range(len(caps))]
+    profiler = open_profiler(args, "object_detection")
+    display = open_display(args)
+
+    # One predict call covers up to --batch frames from all streams
+    batcher = FrameBatcher(predict, args.batch, args.max_wait / 1000.0)
+
+    schedules = None
+    if args.detect_every > 1:
+        schedules = [DetectionSchedule(args.detect_every, BoxTracker(args.track_iou)) for _ in caps]
+    gates = None
+    if args.motion_gate is not None:
+        gates = [MotionGate(args.motion_gate, args.max_stale, args.gate_method) for _ in caps]
+    tilers = None
+    if args.tile:
+        tilers = [TiledDetector(predict, args.tile, args.tile_overlap, full_frame=args.full_frame,
+                                motion=args.tile_motion, refresh=args.tile_refresh) for _ in caps]
+
+    sinks = DetectionSinks(args.detections, names)
+
+    if args.pipeline:
+        pipeline = DetectionPipeline(caps, batcher, args.queue_size,
+                                     on_result=_sink_writer(sinks) if sinks else None,
+                                     plot_every=args.plot_every).start()
+        _run_pipelined(pipeline, windows, display, profiler)
+        pipeline.stop()
+    else:
+        _run_sequential(caps, batcher, windows, display, profiler, schedules, names, gates,
+                        sinks, args.plot_every, tilers)
+
+    batcher.close()
+    sinks.close()
+    stats = close_capture(caps[0])
+    for cap in caps[1:]:
+        close_capture(cap)
+    display.close()
+    pipeline_stats = pipeline.report() if args.pipeline else None
+    adaptive_stats = None
+    if controller is not None:
+        controller.close()
+        adaptive_stats = controller.stats()
+        print(f"[ADAPT] {adaptive_stats['switches']} switches, ended on {adaptive_stats['level']}")
+    gate_stats = [gate.report(window) for gate, window in zip(gates, windows)] if gates else None
+    tiling_stats = [tiler.report(window) for tiler, window in zip(tilers, windows)] if tilers else None
+    batching = batcher.stats()
+    print(f"[BATCH] {batching['frames']} frames in {batching['batches']} batches "
+          f"(mean {batching['mean_batch']:.2f}), {batching['frame_ms']:.1f} ms inference per frame, "
+          f"wait p50 {batching['wait_p50']:.1f} ms / p95 {batching['wait_p95']:.1f} ms")
+    return {"source": stats, "profile": profiler.summary(), "batching": batching, "pipeline": pipeline_stats,
+            "motion_gate": gate_stats, "adaptive": adaptive_stats, "tiling": tiling_stats}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from common.latency import capture_timestamp
+from common.reporting import percentiles
+
+# A frame ready for display: its stream, capture time, the annotated image and
+# how much older than the frame the overlaid detections are (None without any)
+PipelineFrame = namedtuple("PipelineFrame", ["stream", "timestamp", "image", "age"])
+
+STAGES = ("capture", "inference", "annotate", "display")
+
+
+class StageQueue:
+    """Bounded FIFO between two pipeline stages.
+
+    When full, put() drops the oldest item instead of blocking, so a slow
+    consumer always gets the newest frames and never stalls its producer.
+    Depth at every put and the time every item spent queued are recorded.
+    """
+
+    def __init__(self, name, maxsize=2):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.puts = 0
+        self.dropped = 0
+        self.depths = []
+        self.waits = []
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append((time.perf_counter(), item))
+            self.puts += 1
+            self.depths.append(len(self._items))
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest item, or None after `timeout` seconds or once closed and empty"""
+        with self._cond:
+            if not self._items and not self.closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            queued, item = self._items.popleft()
+        self.waits.append(time.perf_counter() - queued)
+        return item
+
+    def get_nowait(self):
+        return self.get(0) if self._items else None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        return {
+            "depth": len(self._items),
+            "mean_depth": float(np.mean(self.depths)) if self.depths else 0.0,
+            "max_depth": max(self.depths, default=0),
+            "puts": self.puts,
+            "dropped": self.dropped,
+            "wait": percentiles(np.multiply(self.waits, 1000.0)),
+        }
+
+
+class DetectionPipeline:
+    """Capture, inference and annotation on their own threads.
+
+    One capture thread per stream puts every frame into both the inference
+    and the annotation queue. The inference thread takes what is queued (up
+    to the batcher's batch size), runs it through the FrameBatcher and keeps
+    only the newest result per stream. The annotation thread draws that
+    latest result onto each new camera frame, so the display runs at camera
+    rate while detections refresh at whatever rate inference manages.
+
+    The caller shows frames on the main thread (where GUI calls have to
+    happen): next_frame() returns the next annotated PipelineFrame and
+    presented() records it as on screen.
+    """
+
+    def __init__(self, caps, batcher, queue_size=2, on_result=None, plot_every=1):
+        self.caps = caps
+        self.batcher = batcher
+        self.on_result = on_result    # Called as on_result(stream, seq, timestamp, result)
+        self.plot_every = plot_every  # Annotate every Nth frame of a stream, none with 0
+        size = queue_size * len(caps)
+        self.infer_queue = StageQueue("infer", size)
+        self.annotate_queue = StageQueue("annotate", size)
+        self.display_queue = StageQueue("display", size)
+        self.timings = {stage: [] for stage in STAGES}
+        self.latency = []   # Capture -> presented, seconds
+        self.ages = []      # Capture of the shown frame - capture of its detections
+        self.detections = 0
+        self.finished = False
+        self._latest = [None] * len(caps)  # (result, capture time) per stream
+        self._lock = threading.Lock()
+        self._running = False
+        self._threads = []
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._running = True
+        targets = [(self._capture, (i,), f"capture-{i}") for i in range(len(self.caps))]
+        targets += [(self._infer, (), "inference"), (self._annotate, (), "annotate")]
+        for target, args, name in targets:
+            thread = threading.Thread(target=target, args=args, name=f"DetectionPipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _finish(self):
+        """The first stream to run out ends the pipeline, like the sequential loop"""
+        self.finished = True
+        self._running = False
+        self.infer_queue.close()
+        self.annotate_queue.close()
+
+    def _capture(self, index):
+        cap = self.caps[index]
+        seq = 0
+        while self._running:
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                if not cap.isOpened():
+                    break
+                continue
+            self.timings["capture"].append(time.perf_counter() - start)
+            item = (index, seq, capture_timestamp(cap), frame)
+            self.infer_queue.put(item)
+            if self.plot_every and seq % self.plot_every == 0:
+                self.annotate_queue.put(item)
+            seq += 1
+        self._finish()
+
+    def _infer(self):
+        while True:
+            item = self.infer_queue.get(timeout=0.1)
+            if item is None:
+                if self.infer_queue.closed:
+                    break
+                continue
+            items = [item]
+            while len(items) < self.batcher.batch_size:
+                item = self.infer_queue.get_nowait()
+                if item is None:
+                    break
+                items.append(item)
+
+            start = time.perf_counter()
+            futures = [self.batcher.submit(index, frame) for index, _, _, frame in items]
+            for (index, seq, timestamp, _), future in zip(items, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Model prediction failed: {e}")
+                    continue
+                with self._lock:
+                    self._latest[index] = (result, timestamp)
+                if self.on_result is not None:
+                    self.on_result(index, seq, timestamp, result)
+                self.detections += 1
+            self.timings["inference"].append(time.perf_counter() - start)
+
+    def _annotate(self):
+        while True:
+            item = self.annotate_queue.get(timeout=0.1)
+            if item is None:
+                if self.annotate_queue.closed:
+                    break
+                continue
+            index, _, timestamp, frame = item
+            with self._lock:
+                latest = self._latest[index]
+
+            start = time.perf_counter()
+            if latest is None:
+                image, age = frame, None
+            else:
+                result, detected = latest
+                image, age = result.plot(img=frame), timestamp - detected
+            self.timings["annotate"].append(time.perf_counter() - start)
+            self.display_queue.put(PipelineFrame(index, timestamp, image, age))
+        self.display_queue.close()
+
+    def next_frame(self, timeout=0.1):
+        """Next annotated frame, or None (check `finished` to tell a timeout from the end)"""
+        return self.display_queue.get(timeout)
+
+    def presented(self, frame, started):
+        """frame is on screen; started is when the main loop took it from the queue"""
+        now = time.perf_counter()
+        self.timings["display"].append(now - started)
+        self.latency.append(now - frame.timestamp)
+        if frame.age is not None:
+            self.ages.append(frame.age)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        stages = {}
+        for stage in STAGES:
+            s = percentiles(np.multiply(self.timings[stage], 1000.0))
+            s["fps"] = s["count"] / elapsed if elapsed > 0 else 0.0
+            stages[stage] = s
+        stages["inference"]["fps"] = self.detections / elapsed if elapsed > 0 else 0.0
+        return {
+            "elapsed": elapsed,
+            "stages": stages,
+            "queues": {q.name: q.stats() for q in (self.infer_queue, self.annotate_queue, self.display_queue)},
+            "latency": percentiles(np.multiply(self.latency, 1000.0)),
+            "detection_age": percentiles(np.multiply(self.ages, 1000.0)),
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"\n[PIPELINE] {s['elapsed']:.1f}s")
+        print(f"{'stage':<12}{'fps':>8}{'mean':>9}{'p50':>9}{'p95':>9}   (ms per call)")
+        for stage, t in s["stages"].items():
+            print(f"{stage:<12}{t['fps']:>8.1f}{t['mean']:>9.2f}{t['p50']:>9.2f}{t['p95']:>9.2f}")
+        print(f"{'queue':<12}{'depth':>8}{'mean':>9}{'max':>9}{'dropped':>9}{'wait p50':>10}{'wait p95':>10}")
+        for name, q in s["queues"].items():
+            print(f"{name:<12}{q['depth']:>8}{q['mean_depth']:>9.2f}{q['max_depth']:>9}{q['dropped']:>9}"
+                  f"{q['wait']['p50']:>10.2f}{q['wait']['p95']:>10.2f}")
+        latency, age = s["latency"], s["detection_age"]
+        print(f"[PIPELINE] capture -> display p50 {latency['p50']:.1f} ms / p95 {latency['p95']:.1f} ms, "
+              f"detections shown {age['p50']:.1f} ms / {age['p95']:.1f} ms older than their frame")
+        return s
+
+    def stop(self):
+        self._finish()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
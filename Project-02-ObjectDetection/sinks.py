@@ -0,0 +1,201 @@
+"""Stream compact detection records to files or a local socket.
+
+Every frame becomes one record: its stream, frame sequence number, capture
+time and the class, confidence and xyxy box of each detection. The capture
+time is stored twice: "ts" is time.perf_counter() of this process, good for
+latencies within one run, and "wall" is the same instant as Unix time
+(time.time()), which other processes and later runs can line up with. Sinks
+are selected by spec:
+
+    out.jsonl            one JSON object per frame
+    out/                 columnar .npy chunks, one row per detection (see ColumnarSink)
+    udp://HOST:PORT      one JSON datagram per frame
+    unix:/PATH           the same over a Unix datagram socket
+
+Reading a columnar recording back:
+
+    python Project-02-ObjectDetection/sinks.py out/
+"""
+import json
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+
+def wall_clock(timestamp):
+    """Unix time of a time.perf_counter() timestamp taken in this process"""
+    return timestamp + (time.time() - time.perf_counter())
+
+
+def _record_json(stream, seq, timestamp, boxes, scores, classes):
+    record = {"stream": stream, "seq": seq, "ts": round(timestamp, 6), "wall": round(wall_clock(timestamp), 6),
+              "cls": classes.tolist(), "conf": np.round(scores, 4).tolist(),
+              "xyxy": np.round(boxes, 1).tolist()}
+    return json.dumps(record, separators=(",", ":"))
+
+
+class JsonlSink:
+    """{"stream", "seq", "ts", "wall", "cls": [...], "conf": [...], "xyxy": [[x1, y1, x2, y2], ...]} per line"""
+
+    def __init__(self, path):
+        self._file = open(path, "w")
+        self.records = 0
+
+    def write(self, stream, seq, timestamp, boxes, scores, classes):
+        self._file.write(_record_json(stream, seq, timestamp, boxes, scores, classes) + "\n")
+        self.records += 1
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarSink:
+    """One row per detection in .npy chunks, like the landmark recordings:
+
+        stream_00000.npy   (N,) int16
+        seq_00000.npy      (N,) int64      frame sequence number in its stream
+        ts_00000.npy       (N,) float64    capture time, perf_counter() of the recording process
+        wall_00000.npy     (N,) float64    capture time, Unix time
+        cls_00000.npy      (N,) int16
+        conf_00000.npy     (N,) float32
+        xyxy_00000.npy     (N, 4) float32
+
+    Frames without detections leave no rows; meta.json counts all frames.
+    """
+
+    FIELDS = (("stream", np.int16, ()), ("seq", np.int64, ()), ("ts", np.float64, ()), ("wall", np.float64, ()),
+              ("cls", np.int16, ()), ("conf", np.float32, ()), ("xyxy", np.float32, (4,)))
+
+    def __init__(self, path, chunk_size=65536, names=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.names = names
+        os.makedirs(path, exist_ok=True)
+        self.records = 0
+        self.rows = 0
+        self.chunks = 0
+        self._row = 0
+        self._columns = {name: np.zeros((chunk_size,) + shape, dtype) for name, dtype, shape in self.FIELDS}
+
+    def write(self, stream, seq, timestamp, boxes, scores, classes):
+        self.records += 1
+        n = len(classes)
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_size - self._row)
+            rows = slice(self._row, self._row + take)
+            part = slice(start, start + take)
+            columns = self._columns
+            columns["stream"][rows] = stream
+            columns["seq"][rows] = seq
+            columns["ts"][rows] = timestamp
+            columns["wall"][rows] = wall_clock(timestamp)
+            columns["cls"][rows] = classes[part]
+            columns["conf"][rows] = scores[part]
+            columns["xyxy"][rows] = boxes[part]
+            self._row += take
+            start += take
+            if self._row == self.chunk_size:
+                self._flush()
+
+    def _flush(self):
+        if self._row:
+            index = f"{self.chunks:05d}"
+            for name, array in self._columns.items():
+                np.save(os.path.join(self.path, f"{name}_{index}.npy"), array[:self._row])
+            self.rows += self._row
+            self.chunks += 1
+            self._row = 0
+        meta = {"frames": self.records, "rows": self.rows, "chunks": self.chunks,
+                "fields": [name for name, _, _ in self.FIELDS]}
+        if self.names:
+            meta["names"] = {int(k): v for k, v in self.names.items()}
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        self._flush()
+
+
+def read_columnar(path):
+    """All chunks of a ColumnarSink directory as one array per field"""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {}
+    for name in meta["fields"]:
+        chunks = [np.load(os.path.join(path, f"{name}_{i:05d}.npy")) for i in range(meta["chunks"])]
+        columns[name] = np.concatenate(chunks) if chunks else np.zeros(0)
+    return meta, columns
+
+
+class SocketSink:
+    """JSON records as datagrams to udp://HOST:PORT or unix:/PATH.
+
+    The socket never blocks the detection loop: a record that cannot be sent
+    (no listener, full buffer) is dropped and counted.
+    """
+
+    def __init__(self, spec):
+        if spec.startswith("unix:"):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._address = spec[len("unix:"):]
+        else:
+            host, _, port = spec[len("udp://"):].rpartition(":")
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._address = (host or "127.0.0.1", int(port))
+        self._socket.setblocking(False)
+        self.records = 0
+        self.dropped = 0
+
+    def write(self, stream, seq, timestamp, boxes, scores, classes):
+        try:
+            self._socket.sendto(_record_json(stream, seq, timestamp, boxes, scores, classes).encode(),
+                                self._address)
+            self.records += 1
+        except OSError:
+            self.dropped += 1
+
+    def close(self):
+        self._socket.close()
+
+
+def open_detection_sink(spec, names=None):
+    if spec.startswith("udp://") or spec.startswith("unix:"):
+        return SocketSink(spec)
+    if spec.endswith(".jsonl"):
+        return JsonlSink(spec)
+    return ColumnarSink(spec, names=names)
+
+
+class DetectionSinks:
+    """Fan one frame's detections out to every configured sink"""
+
+    def __init__(self, specs, names=None):
+        self.sinks = [open_detection_sink(spec, names) for spec in specs]
+
+    def __bool__(self):
+        return bool(self.sinks)
+
+    def write(self, stream, seq, timestamp, boxes, scores, classes):
+        for sink in self.sinks:
+            sink.write(stream, seq, timestamp, boxes, scores, classes)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+            dropped = getattr(sink, "dropped", 0)
+            print(f"[SINK] {type(sink).__name__}: {sink.records} frames" +
+                  (f", {dropped} dropped" if dropped else ""))
+
+
+if __name__ == "__main__":
+    meta, columns = read_columnar(sys.argv[1])
+    print(f"{meta['frames']} frames, {meta['rows']} detections in {meta['chunks']} chunks")
+    if meta["rows"]:
+        classes, counts = np.unique(columns["cls"], return_counts=True)
+        names = meta.get("names", {})
+        for cls, count in zip(classes.tolist(), counts.tolist()):
+            print(f"  {names.get(str(cls), cls)}: {count}")
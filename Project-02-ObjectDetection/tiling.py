@@ -0,0 +1,210 @@
+"""Tiled YOLO inference for frames much larger than the model input.
+
+A 1080p frame letterboxed to 640 shrinks every object threefold, so small
+ones disappear. Here the frame is cut into overlapping tiles at the model's
+input size, the tiles go through the model as one batch and the boxes are
+merged across tiles. Compare full-frame and tiled detection on a video:
+
+    python Project-02-ObjectDetection/tiling.py --video street_1080p.mp4 --weights yolov8n.pt yolov8s.pt
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from metrics import EMPTY_DETECTIONS, box_ios, detections
+from motion import motion_image, moving_pixels
+
+MOTION_SCALE = 8        # Tiles are checked for motion on a frame downscaled by this factor
+SMALL_OBJECT = 32 * 32  # COCO's "small" area in pixels
+
+
+def tile_grid(width, height, size, overlap=0.2):
+    """(T, 4) xyxy tiles of `size` covering the frame, overlapping by `overlap`; the last row / column
+    is shifted back to end on the frame border instead of running past it"""
+    step = max(1, int(size * (1.0 - overlap)))
+
+    def starts(length):
+        if length <= size:
+            return [0]
+        positions = list(range(0, length - size, step))
+        return positions + [length - size]
+
+    return np.array([(x, y, min(x + size, width), min(y + size, height))
+                     for y in starts(height) for x in starts(width)], dtype=np.int32)
+
+
+def merge_detections(boxes, scores, classes, threshold=0.5):
+    """Greedy class-aware NMS on intersection over the smaller box.
+
+    A box cut by a tile border only covers part of the same object found
+    whole in the neighbouring tile or the full-frame pass; their IoU is low,
+    but the cut box lies almost entirely inside the whole one, so IoS
+    catches the duplicate.
+    """
+    if len(boxes) == 0:
+        return EMPTY_DETECTIONS
+    order = np.argsort(-scores)
+    boxes, scores, classes = boxes[order], scores[order], classes[order]
+    overlap = box_ios(boxes, boxes) >= threshold
+    overlap &= classes[:, None] == classes[None, :]
+    keep = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if keep[i]:
+            keep[i + 1:] &= ~overlap[i, i + 1:]
+    return boxes[keep], scores[keep], classes[keep]
+
+
+class TiledDetector:
+    """Detect on overlapping tiles of a large frame in one batched predict call.
+
+    predict(images) is the same callable the FrameBatcher uses. A tile is
+    run when part of it moved since the previous frame or when it held
+    detections last time; every other tile keeps its previous boxes. Every
+    `refresh` frames all tiles run. With full_frame, the whole frame is
+    added to the batch as well, so objects larger than a tile are still
+    found whole. Boxes of all tiles are merged with merge_detections().
+    """
+
+    def __init__(self, predict, tile=640, overlap=0.2, merge=0.5, full_frame=True, motion=0.005, refresh=30):
+        self.predict = predict
+        self.tile = tile
+        self.overlap = overlap
+        self.merge = merge
+        self.full_frame = full_frame
+        self.motion = motion
+        self.refresh = refresh
+        self.grid = None
+        self.frames = 0
+        self.tiles_run = 0
+        self.tiles_skipped = 0
+        self._size = None
+        self._cache = []
+        self._full = EMPTY_DETECTIONS
+        self._prev = None
+
+    def _reset(self, width, height):
+        self._size = (width, height)
+        self.grid = tile_grid(width, height, self.tile, self.overlap)
+        self._cache = [EMPTY_DETECTIONS] * len(self.grid)
+        self._full = EMPTY_DETECTIONS
+        self._prev = None
+
+    def _active_tiles(self, frame):
+        # The same moving pixel test as MotionGate, counted per tile
+        small = motion_image(frame, max(1, frame.shape[1] // MOTION_SCALE))
+        prev, self._prev = self._prev, small
+        if prev is None or self.motion is None or (self.refresh and self.frames % self.refresh == 0):
+            return np.ones(len(self.grid), dtype=bool)
+
+        moving = moving_pixels(small, prev).astype(np.float32)
+        integral = cv2.integral(moving)
+        g = self.grid // MOTION_SCALE
+        x0, y0 = g[:, 0], g[:, 1]
+        x1 = np.maximum(g[:, 2], x0 + 1).clip(max=small.shape[1])
+        y1 = np.maximum(g[:, 3], y0 + 1).clip(max=small.shape[0])
+        counts = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        fraction = counts / np.maximum((x1 - x0) * (y1 - y0), 1)
+        prior = np.array([len(boxes) > 0 for boxes, _, _ in self._cache])
+        return (fraction >= self.motion) | prior
+
+    def detect(self, frame):
+        """(boxes xyxy, scores, classes) of the whole frame"""
+        height, width = frame.shape[:2]
+        if self._size != (width, height):
+            self._reset(width, height)
+        active = self._active_tiles(frame)
+        self.frames += 1
+        indices = np.flatnonzero(active)
+        self.tiles_run += len(indices)
+        self.tiles_skipped += len(self.grid) - len(indices)
+
+        if len(indices):
+            crops = [np.ascontiguousarray(frame[y0:y1, x0:x1]) for x0, y0, x1, y1 in self.grid[indices].tolist()]
+            results = self.predict(crops + [frame] if self.full_frame else crops)
+            for index, result in zip(indices, results):
+                boxes, scores, classes = detections(result)
+                x0, y0 = self.grid[index, :2]
+                self._cache[index] = (boxes + np.array([x0, y0, x0, y0], dtype=np.float32), scores, classes)
+            if self.full_frame:
+                self._full = detections(results[-1])
+
+        parts = self._cache + [self._full]
+        return merge_detections(np.concatenate([p[0] for p in parts]),
+                                np.concatenate([p[1] for p in parts]),
+                                np.concatenate([p[2] for p in parts]), self.merge)
+
+    def stats(self):
+        total = self.tiles_run + self.tiles_skipped
+        return {"frames": self.frames, "tiles": len(self.grid) if self.grid is not None else 0,
+                "tiles_run": self.tiles_run, "tiles_skipped": self.tiles_skipped,
+                "skip_rate": self.tiles_skipped / total if total else 0.0}
+
+    def report(self, name="tiles"):
+        s = self.stats()
+        print(f"[TILES] {name}: {s['frames']} frames on {s['tiles']} tiles, ran {s['tiles_run']}, "
+              f"skipped {s['tiles_skipped']} ({s['skip_rate']:.0%})")
+        return s
+
+
+def draw_detections(frame, boxes, scores, classes, names):
+    """Boxes labelled with class and score, in a colour per class"""
+    for (x1, y1, x2, y2), score, cls in zip(boxes.astype(int).tolist(), scores.tolist(), classes.tolist()):
+        color = ((cls * 67) % 256, (cls * 151) % 256, (cls * 199) % 256)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, f"{names.get(cls, cls)} {score:.2f}", (x1, max(y1 - 5, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
+
+
+def _benchmark(args):
+    from batching import load_frames, yolo_predict
+    from models import load_model
+
+    frames = load_frames(args.video, args.frames, None, None, loop=False)
+    height, width = frames[0].shape[:2]
+    grid = tile_grid(width, height, args.tile, args.overlap)
+    print(f"[TILES] {len(frames)} frames of {args.video} ({width}x{height}), "
+          f"{len(grid)} tiles of {args.tile} with {args.overlap:.0%} overlap")
+    print(f"{'weights':<14}{'mode':<12}{'ms/frame':>10}{'tiles/frame':>13}{'objects':>9}{'small':>7}")
+
+    for weights in args.weights:
+        model = load_model(weights, args.backend, args.imgsz, args.int8, dynamic=True, cache_dir=args.model_cache)
+        predict = yolo_predict(model, imgsz=args.imgsz, verbose=False)
+        modes = [("full frame", None),
+                 ("tiled", TiledDetector(predict, args.tile, args.overlap, motion=None)),
+                 ("tiled+skip", TiledDetector(predict, args.tile, args.overlap))]
+        for mode, tiler in modes:
+            objects = small = 0
+            start = time.perf_counter()
+            for frame in frames:
+                boxes, _, _ = tiler.detect(frame) if tiler else detections(predict([frame])[0])
+                areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+                objects += len(boxes)
+                small += int((areas < SMALL_OBJECT).sum())
+            ms = (time.perf_counter() - start) * 1000.0 / len(frames)
+            tiles = tiler.tiles_run / tiler.frames if tiler else 0.0
+            print(f"{os.path.basename(weights):<14}{mode:<12}{ms:>10.1f}{tiles:>13.1f}"
+                  f"{objects / len(frames):>9.1f}{small / len(frames):>7.1f}")
+
+
+def main(argv=None):
+    from models import BACKENDS, DEFAULT_CACHE
+
+    parser = argparse.ArgumentParser(description="Full-frame against tiled YOLO inference on high-resolution video")
+    parser.add_argument("--video", required=True, help="high-resolution video (or any --source spec)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--tile", type=int, default=640)
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--weights", nargs="+", default=["yolov8n.pt", "yolov8s.pt"])
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--model-cache", default=DEFAULT_CACHE, metavar="DIR")
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Run the detector every N frames and track boxes with optical flow in between.
+
+Compare accuracy against CPU time for several N on a recorded video; every
+frame's detections are the reference unless YOLO labels are given:
+
+    python Project-02-ObjectDetection/tracker.py --video recording.mp4 --every 1 2 4 8 15
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from metrics import EMPTY_DETECTIONS, box_iou
+
+GRID = 4            # Flow points per box side
+MIN_POINTS = 4      # Fewer good flow points than this and the track is lost until the next detection
+
+
+class Track:
+    def __init__(self, track_id, box, score, cls):
+        self.id = track_id
+        self.box = box          # xyxy float32
+        self.score = score
+        self.cls = cls
+        self.missed = 0         # Detections in a row this track was not matched in
+        self.lost = False       # Optical flow failed since the last detection
+
+
+class BoxTracker:
+    """Boxes with stable IDs, matched by IoU on detection frames and moved by
+    sparse Lucas-Kanade optical flow on the frames in between.
+
+    update() associates new detections with existing tracks of the same
+    class (greedy, highest IoU first); unmatched detections start new tracks
+    and tracks unmatched for more than `max_missed` detections are dropped.
+    propagate() shifts every box by the median flow of a grid of points
+    inside it, all tracks in one calcOpticalFlowPyrLK call.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=1):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_id = 1
+        self._prev_gray = None
+
+    def update(self, gray, boxes, scores, classes):
+        tracks = self.tracks
+        matched_tracks, matched_dets = set(), set()
+        if tracks and len(boxes):
+            iou = box_iou(np.stack([t.box for t in tracks]), boxes)
+            iou[np.array([t.cls for t in tracks])[:, None] != classes[None, :]] = 0.0
+            for ti, di in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in matched_tracks or di in matched_dets:
+                    continue
+                track = tracks[ti]
+                track.box, track.score, track.missed, track.lost = boxes[di].copy(), float(scores[di]), 0, False
+                matched_tracks.add(ti)
+                matched_dets.add(di)
+
+        kept = []
+        for ti, track in enumerate(tracks):
+            if ti not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            kept.append(track)
+        for di in range(len(boxes)):
+            if di not in matched_dets:
+                kept.append(Track(self.next_id, boxes[di].copy(), float(scores[di]), int(classes[di])))
+                self.next_id += 1
+        self.tracks = kept
+        self._prev_gray = gray
+        return self.tracks
+
+    def propagate(self, gray):
+        """Move the boxes from the previous frame to gray; returns how many tracks were lost"""
+        active = [t for t in self.tracks if not t.lost]
+        if self._prev_gray is None or not active:
+            self._prev_gray = gray
+            return 0
+
+        # GRID x GRID points spread over the inner 80% of every box
+        steps = (np.arange(GRID, dtype=np.float32) + 0.5) / GRID * 0.8 + 0.1
+        gx, gy = np.meshgrid(steps, steps)
+        boxes = np.stack([t.box for t in active])
+        widths = boxes[:, 2] - boxes[:, 0]
+        heights = boxes[:, 3] - boxes[:, 1]
+        xs = boxes[:, None, 0] + gx.ravel()[None] * widths[:, None]
+        ys = boxes[:, None, 1] + gy.ravel()[None] * heights[:, None]
+        points = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, points, None,
+                                                    winSize=(15, 15), maxLevel=2)
+        flow = (moved - points).reshape(len(active), GRID * GRID, 2)
+        good = status.reshape(len(active), GRID * GRID).astype(bool)
+
+        lost = 0
+        for track, track_flow, track_good in zip(active, flow, good):
+            if track_good.sum() < MIN_POINTS:
+                track.lost = True
+                lost += 1
+                continue
+            dx, dy = np.median(track_flow[track_good], axis=0)
+            track.box = track.box + np.array([dx, dy, dx, dy], dtype=np.float32)
+        self._prev_gray = gray
+        return lost
+
+    def detections(self):
+        """Current boxes as (boxes, scores, classes) arrays"""
+        if not self.tracks:
+            return EMPTY_DETECTIONS
+        return (np.stack([t.box for t in self.tracks]).astype(np.float32),
+                np.array([t.score for t in self.tracks], np.float32),
+                np.array([t.cls for t in self.tracks], np.int64))
+
+
+class DetectionSchedule:
+    """Decide per frame whether to run the detector or only track.
+
+    The detector runs every `every` frames and additionally as soon as a
+    track loses its optical flow, or when trigger() was called.
+    """
+
+    def __init__(self, every=1, tracker=None):
+        self.every = max(1, every)
+        self.tracker = tracker or BoxTracker()
+        self.since = None       # Frames since the last detection
+        self.detected = 0
+        self.tracked = 0
+        self._triggered = False
+
+    def trigger(self):
+        self._triggered = True
+
+    def due(self):
+        return self.since is None or self.since + 1 >= self.every or self._triggered
+
+    def detect(self, gray, boxes, scores, classes):
+        self.since = 0
+        self.detected += 1
+        self._triggered = False
+        return self.tracker.update(gray, boxes, scores, classes)
+
+    def track(self, gray):
+        self.since = (self.since or 0) + 1
+        self.tracked += 1
+        if self.tracker.propagate(gray):
+            self._triggered = True
+        return self.tracker.tracks
+
+
+def draw_tracks(frame, tracks, names):
+    """Boxes labelled with track ID, class and score, in a colour per ID"""
+    for track in tracks:
+        x1, y1, x2, y2 = track.box.astype(int).tolist()
+        color = ((track.id * 67) % 256, (track.id * 151) % 256, (track.id * 199) % 256)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        label = f"#{track.id} {names.get(track.cls, track.cls)} {track.score:.2f}"
+        cv2.putText(frame, label, (x1, max(y1 - 5, 12)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
+
+
+def _benchmark(args):
+    from batching import load_frames
+    from metrics import detections, load_yolo_labels, mean_average_precision
+    from models import load_model
+
+    frames = load_frames(args.video, args.frames, loop=False)
+    height, width = frames[0].shape[:2]
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    model = load_model(args.weights, args.backend, args.imgsz, args.int8, cache_dir=args.model_cache)
+
+    # Detect on every frame once; the runs below take their detection frames from here
+    detected, detect_cpu = [], []
+    for frame in frames:
+        cpu = time.process_time()
+        detected.append(detections(model(frame, imgsz=args.imgsz, verbose=False)[0]))
+        detect_cpu.append(time.process_time() - cpu)
+
+    reference = detected
+    if args.labels:
+        reference = [load_yolo_labels(args.labels, i, width, height) for i in range(len(frames))]
+
+    print(f"[TRACK] {args.weights} on {len(frames)} frames of {args.video} ({width}x{height}), "
+          f"detector {np.mean(detect_cpu) * 1000.0:.1f} ms CPU per call")
+    print(f"{'N':>4}{'detections':>12}{'CPU ms/frame':>14}{'saved':>8}{'mAP50':>8}{'mAP50-95':>10}{'track IDs':>11}")
+    for every in args.every:
+        schedule = DetectionSchedule(every, BoxTracker(args.iou, args.max_missed))
+        predictions, cpu = [], 0.0
+        for i, gray in enumerate(grays):
+            if schedule.due():
+                cpu += detect_cpu[i]
+                start = time.process_time()
+                schedule.detect(gray, *detected[i])
+            else:
+                start = time.process_time()
+                schedule.track(gray)
+            cpu += time.process_time() - start
+            predictions.append(schedule.tracker.detections())
+
+        accuracy = mean_average_precision(predictions, reference)
+        per_frame = cpu * 1000.0 / len(frames)
+        saved = 1.0 - cpu / max(sum(detect_cpu), 1e-9)
+        print(f"{every:>4}{schedule.detected:>12}{per_frame:>14.1f}{saved:>8.0%}{accuracy['map50']:>8.3f}"
+              f"{accuracy['map']:>10.3f}{schedule.tracker.next_id - 1:>11}")
+
+
+def main(argv=None):
+    from models import add_model_arguments
+
+    parser = argparse.ArgumentParser(description="Accuracy against CPU time of detect-every-N tracking")
+    parser.add_argument("--video", required=True, help="recorded video (or any --source spec)")
+    parser.add_argument("--labels", metavar="DIR",
+                        help="ground truth as YOLO txt files named by frame index; default: detections on every frame")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--every", type=int, nargs="+", default=[1, 2, 4, 8, 15])
+    parser.add_argument("--iou", type=float, default=0.3, help="IoU needed to match a detection to a track")
+    parser.add_argument("--max-missed", type=int, default=1, help="detections a track may go unmatched")
+    add_model_arguments(parser)
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,32 @@
+import os
+import sys
 import cv2
 import numpy as np
 import mediapipe as mp
 from doodle_recognizer import DoodleRecognizer
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.cli import (add_landmark_arguments, add_service_arguments, add_scheduler_arguments,
+                        add_latency_arguments, make_parser, make_solution, open_capture, open_display,
+                        open_latency, open_profiler, close_capture)
+from common.inference import inference_input
+from common.latency import capture_timestamp
+from common.landmarks import HAND_CONNECTIONS, fingers_extended, hands_to_array, landmarks_to_array, to_pixels
+from common.overlay import LandmarkOverlay
+
 class AirCanvasPro:
-    def __init__(self):
+    def __init__(self, args):
         # Initialize mediapipe
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self.hands = make_solution(args, "hands", lambda: self.mp_hands.Hands(
             max_num_hands=1,
             min_detection_confidence=0.8,
             min_tracking_confidence=0.8
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
+        ), max_hands=1)
+        self.hand_overlay = LandmarkOverlay(HAND_CONNECTIONS, point_color=(0, 255, 0), radius=4,
+                                            line_color=(255, 0, 0))
+        self.inference_scale = args.inference_scale
         
         # Canvas setup
         self.canvas_width, self.canvas_height = 1280, 720
@@ -64,9 +77,10 @@ class AirCanvasPro:
         self.pointer_outline = (0, 0, 0)
         
         # Initialize video capture
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(3, 1280)
-        self.cap.set(4, 720)
+        self.cap = open_capture(args, width=1280, height=720)
+        self.profiler = open_profiler(args, "air_canvas")
+        self.latency = open_latency(args, "air_canvas")
+        self.display = open_display(args)
     
     def draw_palette(self, frame):
         """Draw the color palette on the canvas"""
@@ -139,12 +153,11 @@ class AirCanvasPro:
     
     def process_gestures(self, landmarks):
         """Process hand gestures and update drawing state"""
-        lm = landmarks.landmark
+        lm = landmarks_to_array(landmarks)
         fingers = self.fingers_up(lm)
         
         # Get index finger tip position (smoothed)
-        index_x = int(lm[8].x * self.canvas_width)
-        index_y = int(lm[8].y * self.canvas_height)
+        index_x, index_y = to_pixels(lm[8], self.canvas_width, self.canvas_height).tolist()
         
         # Smooth the coordinates
         if self.smoothed_x is None or self.smoothed_y is None:
@@ -253,77 +266,88 @@ class AirCanvasPro:
         print(f"[AI] Prediction: {prediction} ({confidence:.2f} confidence)")
     
     def fingers_up(self, landmarks):
-        """Check which fingers are up"""
-        tips = [4, 8, 12, 16, 20]
-        fingers = []
+        """Check which fingers are up (landmarks is a (21, 3) array)"""
+        # Other fingers: tip above PIP joint
+        fingers = fingers_extended(landmarks)
         
         # Thumb (different logic)
-        fingers.append(1 if landmarks[4].x < landmarks[3].x else 0)
-        
-        # Other fingers
-        for tip in tips[1:]:
-            fingers.append(1 if landmarks[tip].y < landmarks[tip - 2].y else 0)
+        fingers[0] = landmarks[4, 0] < landmarks[3, 0]
         
-        return fingers
+        return fingers.astype(int).tolist()
     
     def is_pinch(self, landmarks):
         """Check if thumb and index finger are pinching"""
-        thumb = landmarks[4]
-        index = landmarks[8]
-        dist = ((thumb.x - index.x)**2 + (thumb.y - index.y)**2)**0.5
+        dist = np.hypot(*(landmarks[4, :2] - landmarks[8, :2]))
         return dist < 0.05
     
     def run(self):
+        profiler = self.profiler
         while self.cap.isOpened():
-            ret, frame = self.cap.read()
+            profiler.next_frame()
+            with profiler.stage("read"):
+                ret, frame = self.cap.read()
             if not ret:
                 break
+            self.latency.begin(capture_timestamp(self.cap))
             
             # Flip and convert to RGB
-            frame = cv2.flip(frame, 1)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with profiler.stage("flip"):
+                frame = cv2.flip(frame, 1)
+            with profiler.stage("cvtColor"):
+                rgb = inference_input(frame, self.inference_scale)
             
             # Process hand landmarks
-            results = self.hands.process(rgb)
+            with profiler.stage("inference"):
+                results = self.hands.process(rgb)
+            self.latency.mark("inference")
             
             # Create output canvas
-            output = self.canvas.copy()
-            self.draw_ui(output)
+            with profiler.stage("draw"):
+                output = self.canvas.copy()
+                self.draw_ui(output)
             
             if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Draw hand landmarks
-                    self.mp_drawing.draw_landmarks(
-                        frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
-                        self.mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2))
-                    
+                hand_points = hands_to_array(results)
+                # Draw hand landmarks
+                with profiler.stage("overlay"):
+                    self.hand_overlay.draw(frame, hand_points)
+                for points in hand_points:
                     # Process gestures
-                    self.process_gestures(hand_landmarks)
+                    with profiler.stage("gestures"):
+                        self.process_gestures(points)
                     
                     # Get pointer position
-                    pointer_x = int(hand_landmarks.landmark[8].x * self.canvas_width)
-                    pointer_y = int(hand_landmarks.landmark[8].y * self.canvas_height)
+                    pointer_x, pointer_y = to_pixels(points[8], self.canvas_width, self.canvas_height).tolist()
                     
                     # Draw pointer on both windows
-                    self.draw_pointer(frame, 
-                                    int(hand_landmarks.landmark[8].x * frame.shape[1]),
-                                    int(hand_landmarks.landmark[8].y * frame.shape[0]))
-                    self.draw_pointer(output, pointer_x, pointer_y)
+                    with profiler.stage("draw"):
+                        self.draw_pointer(frame, 
+                                        *to_pixels(points[8], frame.shape[1], frame.shape[0]).tolist())
+                        self.draw_pointer(output, pointer_x, pointer_y)
+            self.latency.mark("update")
             
             # Show windows
-            cv2.imshow("Hand Tracking", frame)
-            cv2.imshow("Air Canvas Pro", output)
+            with profiler.stage("display"):
+                self.display.show("Hand Tracking", frame)
+                self.display.show("Air Canvas Pro", output)
+                key = self.display.wait_key(1) & 0xFF
+            self.latency.present()
             
             # Exit conditions
-            if (cv2.waitKey(1) & 0xFF == 27 or
-                cv2.getWindowProperty("Air Canvas Pro", cv2.WND_PROP_VISIBLE) < 1 or
-                cv2.getWindowProperty("Hand Tracking", cv2.WND_PROP_VISIBLE) < 1):
+            if (key == 27 or
+                not self.display.window_visible("Air Canvas Pro") or
+                not self.display.window_visible("Hand Tracking")):
                 break
         
-        self.cap.release()
-        cv2.destroyAllWindows()
+        close_capture(self.cap)
+        self.display.close()
 
 if __name__ == "__main__":
-    app = AirCanvasPro()
+    parser = make_parser("Air Canvas Pro")
+    add_landmark_arguments(parser)
+    add_service_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    app = AirCanvasPro(args)
     app.run()
\ No newline at end of file
@@ -1,38 +1,62 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
 import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_landmark_arguments, add_service_arguments, add_scheduler_arguments, make_parser,
+                        make_solution, open_capture, open_display, open_profiler, close_capture)
+from common.inference import inference_input
+from common.landmarks import HAND_CONNECTIONS, hands_to_array
+from common.overlay import LandmarkOverlay
 from gestures import GestureRecognizer
 from robot_utils import Robot
 
-def main():
+def main(argv=None):
+    parser = make_parser("Hand gesture controlled robot")
+    add_landmark_arguments(parser)
+    add_service_arguments(parser)
+    add_scheduler_arguments(parser)
+    args = parser.parse_args(argv)
     mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
+    hands = make_solution(args, "hands", lambda: mp_hands.Hands(
         max_num_hands=1,
         min_detection_confidence=0.8,
-        min_tracking_confidence=0.5)
+        min_tracking_confidence=0.5), max_hands=1)
     
     recognizer = GestureRecognizer()
+    overlay = LandmarkOverlay(HAND_CONNECTIONS)
     robot = Robot()
     
-    cap = cv2.VideoCapture(0)
+    cap = open_capture(args)
+    profiler = open_profiler(args, "hand_bot")
+    display = open_display(args)
     
     while cap.isOpened():
-        ret, frame = cap.read()
+        profiler.next_frame()
+        with profiler.stage("read"):
+            ret, frame = cap.read()
         if not ret:
             continue
             
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
+        with profiler.stage("flip"):
+            frame = cv2.flip(frame, 1)
+        with profiler.stage("cvtColor"):
+            rgb_frame = inference_input(frame, args.inference_scale)
+        with profiler.stage("inference"):
+            results = hands.process(rgb_frame)
         
         robot_canvas = np.ones((480, 640, 3), dtype=np.uint8) * 255
         
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp.solutions.drawing_utils.draw_landmarks(
-                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                gesture = recognizer.recognize(hand_landmarks)
+            # One array conversion per frame, shared by all checks below
+            hand_points = hands_to_array(results)
+            with profiler.stage("overlay"):
+                overlay.draw(frame, hand_points)
+            for points in hand_points:
+                with profiler.stage("gestures"):
+                    gesture = recognizer.recognize(points)
                 robot.update(gesture)
                 
                 # Display debug info
@@ -41,23 +65,26 @@ def main():
         else:
             robot.update("neutral")
         
-        robot.draw(robot_canvas)
-        
-        # Display mood text
-        mood_text = robot.state.upper()
-        text_size = cv2.getTextSize(mood_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
-        text_x = (robot_canvas.shape[1] - text_size[0]) // 2
-        cv2.putText(robot_canvas, mood_text, (text_x, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        with profiler.stage("draw"):
+            robot.draw(robot_canvas)
+            
+            # Display mood text
+            mood_text = robot.state.upper()
+            text_size = cv2.getTextSize(mood_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
+            text_x = (robot_canvas.shape[1] - text_size[0]) // 2
+            cv2.putText(robot_canvas, mood_text, (text_x, 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
         
-        cv2.imshow('Hand Gestures', frame)
-        cv2.imshow('Robot', robot_canvas)
+        with profiler.stage("display"):
+            display.show('Hand Gestures', frame)
+            display.show('Robot', robot_canvas)
+            key = display.wait_key(10) & 0xFF
         
-        if cv2.waitKey(10) & 0xFF == ord('q'):
+        if key == ord('q'):
             break
     
-    cap.release()
-    cv2.destroyAllWindows()
+    close_capture(cap)
+    display.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,35 +2,44 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from letters import LETTER_MAPPINGS
+from common.cli import make_solution
+from common.inference import inference_input
+from common.landmarks import HAND_CONNECTIONS, fingers_extended, landmarks_to_array
+from common.overlay import LandmarkOverlay
+from common.profiler import StageProfiler
 
 class HandDetector:
-    def __init__(self):
+    def __init__(self, args=None, profiler=None):
+        self.profiler = profiler or StageProfiler()
+        self.inference_scale = getattr(args, "inference_scale", 1.0)
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self.hands = make_solution(args, "hands", lambda: self.mp_hands.Hands(
             max_num_hands=2,  # Detect both hands
             min_detection_confidence=0.8,
             min_tracking_confidence=0.5
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+        ), max_hands=2)
+        self.overlay = LandmarkOverlay(HAND_CONNECTIONS)
         self.prev_letter = None
         self.letter_stable_frames = 0
         self.stability_threshold = 5  # Require 5 consistent frames
 
     def detect_hands(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        with self.profiler.stage("cvtColor"):
+            rgb_frame = inference_input(frame, self.inference_scale)
+        with self.profiler.stage("inference"):
+            results = self.hands.process(rgb_frame)
         return results
 
-    def _get_finger_state(self, landmarks, tip_idx, pip_idx):
-        return landmarks[tip_idx].y < landmarks[pip_idx].y
+    def _get_finger_states(self, points):
+        # Tip above PIP joint for all five fingers in one comparison
+        return fingers_extended(points).tolist()
 
     def classify_gesture(self, landmarks):
+        # Accepts MediaPipe landmarks or a (21, 3) array from hands_to_array()
+        points = landmarks_to_array(landmarks)
+
         # Finger states (True = extended, False = bent)
-        thumb_up = self._get_finger_state(landmarks, 4, 3)
-        index_up = self._get_finger_state(landmarks, 8, 6)
-        middle_up = self._get_finger_state(landmarks, 12, 10)
-        ring_up = self._get_finger_state(landmarks, 16, 14)
-        pinky_up = self._get_finger_state(landmarks, 20, 18)
+        thumb_up, index_up, middle_up, ring_up, pinky_up = self._get_finger_states(points)
 
         # Space detection (open palm)
         if all([index_up, middle_up, ring_up, pinky_up]) and not thumb_up:
@@ -1,11 +1,19 @@
+import os
+import sys
 import cv2
 import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_landmark_arguments, add_service_arguments, add_scheduler_arguments, make_parser,
+                        open_capture, open_display, open_profiler, close_capture)
+from common.landmarks import hands_to_array
 from hand_utils import HandDetector
 from letters import LETTER_MAPPINGS, WORD_DATABASE, WORD_MATCH_THRESHOLD
 
 class SignLanguageTranslator:
-    def __init__(self):
-        self.detector = HandDetector()
+    def __init__(self, args=None, profiler=None):
+        self.detector = HandDetector(args, profiler)
+        self.profiler = self.detector.profiler
         self.current_letters = []
         self.translation_history = []
         self.word_buffer = ""
@@ -35,12 +43,12 @@ class SignLanguageTranslator:
         results = self.detector.detect_hands(frame)
         
         if results.multi_hand_landmarks:
-            for landmarks in results.multi_hand_landmarks:
-                self.detector.mp_draw.draw_landmarks(
-                    frame, landmarks, self.detector.mp_hands.HAND_CONNECTIONS
-                )
-                
-                letter = self.detector.classify_gesture(landmarks.landmark)
+            hand_points = hands_to_array(results)
+            with self.profiler.stage("overlay"):
+                self.detector.overlay.draw(frame, hand_points)
+            for points in hand_points:
+                with self.profiler.stage("gestures"):
+                    letter = self.detector.classify_gesture(points)
                 if letter and (not self.current_letters or letter != self.current_letters[-1]):
                     self.current_letters.append(letter)
                     if letter == " ":
@@ -60,33 +68,46 @@ class SignLanguageTranslator:
                 self.word_buffer = ""
 
         # Display
-        y_offset = 50
-        for line in display_text.split('\n'):
-            cv2.putText(frame, line, (30, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            y_offset += 30
+        with self.profiler.stage("draw"):
+            y_offset = 50
+            for line in display_text.split('\n'):
+                cv2.putText(frame, line, (30, y_offset), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                y_offset += 30
 
         return frame
 
-def main():
-    translator = SignLanguageTranslator()
-    cap = cv2.VideoCapture(0)
+def main(argv=None):
+    parser = make_parser("ASL fingerspelling translator")
+    add_landmark_arguments(parser)
+    add_service_arguments(parser)
+    add_scheduler_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = open_profiler(args, "translator")
+    translator = SignLanguageTranslator(args, profiler)
+    cap = open_capture(args)
+    display = open_display(args)
     
     while cap.isOpened():
-        ret, frame = cap.read()
+        profiler.next_frame()
+        with profiler.stage("read"):
+            ret, frame = cap.read()
         if not ret:
             break
         
-        frame = cv2.flip(frame, 1)
+        with profiler.stage("flip"):
+            frame = cv2.flip(frame, 1)
         frame = translator.translate_frame(frame)
         
-        cv2.imshow("ASL Translator", frame)
+        with profiler.stage("display"):
+            display.show("ASL Translator", frame)
+            key = display.wait_key(10) & 0xFF
         
-        if cv2.waitKey(10) & 0xFF == ord('q'):
+        if key == ord('q'):
             break
     
-    cap.release()
-    cv2.destroyAllWindows()
+    close_capture(cap)
+    display.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import cv2
 import numpy as np
+from common.landmarks import landmarks_to_array, to_pixels
 
 POSE_CONNECTIONS = [
     (11, 13), (13, 15),     # Left arm
@@ -12,19 +13,16 @@ POSE_CONNECTIONS = [
     (23, 25), (25, 27),     # Left leg
     (24, 26), (26, 28)      # Right leg
 ]
+CONNECTION_INDEX = np.array(POSE_CONNECTIONS)
 
 def draw_clone(canvas, landmarks, frame_shape):
     h, w, _ = frame_shape
 
-    points = []
-    for lm in landmarks:
-        x, y = int(lm.x * w), int(lm.y * h)
-        points.append((x, y))
+    # All pixel positions in one vectorized conversion
+    points = to_pixels(landmarks_to_array(landmarks, dims=2), w, h)
 
-    for start, end in POSE_CONNECTIONS:
-        x1, y1 = points[start]
-        x2, y2 = points[end]
-        cv2.line(canvas, (x1, y1), (x2, y2), (0, 255, 255), 3, cv2.LINE_AA)
+    # Every bone as a two point polyline, drawn in a single call
+    cv2.polylines(canvas, list(points[CONNECTION_INDEX]), False, (0, 255, 255), 3, cv2.LINE_AA)
 
-    for x, y in points:
+    for x, y in points.tolist():
         cv2.circle(canvas, (x, y), 6, (255, 255, 255), -1)
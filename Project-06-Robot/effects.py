@@ -1,13 +1,14 @@
 # effects.py
 
 import cv2
+import numpy as np
+from common.landmarks import landmarks_to_array, to_pixels
 
 TRAIL_LENGTH = 15
+KEY_IDXS = np.array([11, 12, 13, 14, 15, 16, 23, 24])  # Arms and shoulders
 
 def draw_trails(canvas, landmarks, trail_points):
-    key_idxs = [11, 12, 13, 14, 15, 16, 23, 24]  # Arms and shoulders
-
-    current = [(landmarks[i].x, landmarks[i].y) for i in key_idxs]
+    current = landmarks_to_array(landmarks, dims=2)[KEY_IDXS]
     trail_points.append(current)
 
     if len(trail_points) > TRAIL_LENGTH:
@@ -16,7 +17,6 @@ def draw_trails(canvas, landmarks, trail_points):
     h, w, _ = canvas.shape
     for i in range(len(trail_points) - 1):
         alpha = int(255 * (i + 1) / TRAIL_LENGTH)
-        for p1, p2 in zip(trail_points[i], trail_points[i+1]):
-            x1, y1 = int(p1[0] * w), int(p1[1] * h)
-            x2, y2 = int(p2[0] * w), int(p2[1] * h)
-            cv2.line(canvas, (x1, y1), (x2, y2), (0, alpha, 255), 2)
+        # Segments from every key point to its position one step later
+        segments = np.stack([trail_points[i], trail_points[i + 1]], axis=1)
+        cv2.polylines(canvas, list(to_pixels(segments, w, h)), False, (0, alpha, 255), 2)
@@ -1,45 +1,78 @@
 # main.py
 
+import os
+import sys
 import cv2
 import mediapipe as mp
 import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_inference_arguments, add_landmark_arguments, make_parser, make_solution,
+                        open_capture, open_display, open_profiler, close_capture)
+from common.inference import inference_input
+from common.landmarks import landmarks_to_array
+from common.overlay import LandmarkOverlay
 from clone_engine import draw_clone
 from effects import draw_trails
 
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-mp_drawing = mp.solutions.drawing_utils
+pose_overlay = LandmarkOverlay(mp_pose.POSE_CONNECTIONS)
+
+
+def main(argv=None):
+    """Run the pose mirror; returns source stats and the stage profile"""
+    parser = make_parser("Cyber clone pose mirror")
+    add_inference_arguments(parser)
+    add_landmark_arguments(parser)
+    args = parser.parse_args(argv)
+    pose = make_solution(args, "pose", mp_pose.Pose)
+
+    # Initialize webcam
+    cap = open_capture(args)
+    profiler = open_profiler(args, "robot")
+    display = open_display(args)
+    trail_points = []
+
+    while True:
+        profiler.next_frame()
+        with profiler.stage("read"):
+            ret, frame = cap.read()
+        if not ret:
+            break
 
-# Initialize webcam
-cap = cv2.VideoCapture(0)
-trail_points = []
+        with profiler.stage("flip"):
+            frame = cv2.flip(frame, 1)
+        with profiler.stage("cvtColor"):
+            rgb = inference_input(frame, args.inference_scale)
+        with profiler.stage("inference"):
+            results = pose.process(rgb)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+        clone_canvas = np.zeros_like(frame)
 
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(rgb)
+        if results.pose_landmarks:
+            landmarks = landmarks_to_array(results.pose_landmarks)
+            with profiler.stage("draw"):
+                draw_clone(clone_canvas, landmarks, frame.shape)
+                draw_trails(clone_canvas, landmarks, trail_points)
 
-    clone_canvas = np.zeros_like(frame)
+            # Optional: draw landmarks on webcam (the visibility column hides occluded joints)
+            with profiler.stage("overlay"):
+                pose_overlay.draw(frame, landmarks_to_array(results.pose_landmarks, dims=4))
 
-    if results.pose_landmarks:
-        landmarks = results.pose_landmarks.landmark
-        draw_clone(clone_canvas, landmarks, frame.shape)
-        draw_trails(clone_canvas, landmarks, trail_points)
+        # Show both windows
+        with profiler.stage("display"):
+            display.show("Webcam Feed", frame)
+            display.show("Cyber Clone", clone_canvas)
+            key = display.wait_key(1) & 0xFF
 
-        # Optional: draw landmarks on webcam
-        mp_drawing.draw_landmarks(
-            frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+        if key == 27:
+            break
 
-    # Show both windows
-    cv2.imshow("Webcam Feed", frame)
-    cv2.imshow("Cyber Clone", clone_canvas)
+    stats = close_capture(cap)
+    pose.close()
+    display.close()
+    return {"source": stats, "profile": profiler.summary()}
 
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
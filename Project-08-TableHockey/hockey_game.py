@@ -3,11 +3,23 @@ import numpy as np
 import mediapipe as mp
 import random
 import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.cli import (add_landmark_arguments, add_service_arguments, add_scheduler_arguments,
+                        add_latency_arguments, make_parser, make_solution, open_capture, open_display,
+                        open_latency, open_profiler, close_capture)
+from common.inference import inference_input
+from common.latency import capture_timestamp
+from common.landmarks import HAND_CONNECTIONS, hands_to_array, to_pixels
+from common.overlay import LandmarkOverlay
 
 # Initialize MediaPipe Hands
 mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+# Close to MediaPipe's default hand style, but one colour for joints and one for bones
+hand_overlay = LandmarkOverlay(HAND_CONNECTIONS, point_color=(48, 48, 255), radius=4,
+                               line_color=(224, 224, 224), thickness=2)
 
 # Game constants
 TABLE_WIDTH = 1000
@@ -100,16 +112,18 @@ class Paddle:
         self.y = max(PADDLE_RADIUS, min(TABLE_HEIGHT - PADDLE_RADIUS, y))
 
 class HockeyGame:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        
-        self.hands = mp_hands.Hands(
+    def __init__(self, args):
+        self.cap = open_capture(args, width=1280, height=720)
+        self.profiler = open_profiler(args, "hockey")
+        self.latency = open_latency(args, "hockey")
+        self.display = open_display(args)
+        self.inference_scale = args.inference_scale
+        
+        self.hands = make_solution(args, "hands", lambda: mp_hands.Hands(
             max_num_hands=2,
             min_detection_confidence=0.8,
             min_tracking_confidence=0.7
-        )
+        ), max_hands=2)
         
         self.puck = Puck()
         self.paddle1 = Paddle(100, True)
@@ -122,31 +136,28 @@ class HockeyGame:
         self.game_started = False  # Added game state
         
     def detect_hands(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        with self.profiler.stage("cvtColor"):
+            rgb_frame = inference_input(frame, self.inference_scale)
+        with self.profiler.stage("inference"):
+            results = self.hands.process(rgb_frame)
+        self.latency.mark("inference")
         
         hand_positions = [None, None]
         
         if results.multi_hand_landmarks:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                index_tip = hand_landmarks.landmark[8]
-                h, w, _ = frame.shape
-                x_pos = int(index_tip.x * w)
-                y_pos = int(index_tip.y * h)
+            # Index tips of every hand converted to pixels at once
+            h, w, _ = frame.shape
+            hand_points = hands_to_array(results)
+            index_tips = to_pixels(hand_points[:, 8], w, h).tolist()
+            with self.profiler.stage("overlay"):
+                hand_overlay.draw(frame, hand_points)
+            for handedness, (x_pos, y_pos) in zip(results.multi_handedness, index_tips):
                 
                 if "Left" in handedness.classification[0].label:
                     hand_positions[0] = (x_pos, y_pos)
                 else:
                     hand_positions[1] = (x_pos, y_pos)
                 
-                mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
                 cv2.circle(frame, (x_pos, y_pos), 12, (0, 255, 255), -1)
                 cv2.circle(frame, (x_pos, y_pos), 6, (0, 0, 0), -1)
         
@@ -276,26 +287,34 @@ class HockeyGame:
         return False
     
     def run(self):
-        cv2.namedWindow('Air Hockey with Start Menu', cv2.WINDOW_NORMAL)
+        self.display.named_window('Air Hockey with Start Menu', cv2.WINDOW_NORMAL)
+        profiler = self.profiler
         
         while True:
-            ret, frame = self.cap.read()
+            profiler.next_frame()
+            with profiler.stage("read"):
+                ret, frame = self.cap.read()
             if not ret:
                 break
+            self.latency.begin(capture_timestamp(self.cap))
             
-            frame = cv2.flip(frame, 1)
+            with profiler.stage("flip"):
+                frame = cv2.flip(frame, 1)
             
             if not self.game_started:
                 # Show start menu
                 hand_positions = self.detect_hands(frame)
-                menu_frame, button_rect = self.draw_start_screen(frame)
+                with profiler.stage("draw"):
+                    menu_frame, button_rect = self.draw_start_screen(frame)
                 
                 # Check for start button click
                 if self.check_start_button_click(hand_positions, button_rect):
                     self.game_started = True
                     print("🎮 Game started!")
+                self.latency.mark("update")
                 
-                cv2.imshow('Air Hockey with Start Menu', menu_frame)
+                with profiler.stage("display"):
+                    self.display.show('Air Hockey with Start Menu', menu_frame)
                 
             else:
                 # Game is running
@@ -314,7 +333,8 @@ class HockeyGame:
                     self.paddle2.update(table_x, table_y)
                 
                 if not self.game_over:
-                    goal = self.puck.update(self.paddle1, self.paddle2)
+                    with profiler.stage("physics"):
+                        goal = self.puck.update(self.paddle1, self.paddle2)
                     if goal == 1:
                         self.score1 += 1
                         self.puck.reset()
@@ -328,8 +348,10 @@ class HockeyGame:
                     elif self.score2 >= MAX_SCORE:
                         self.game_over = True
                         self.winner = "PLAYER 2"
+                self.latency.mark("update")
                 
-                combined_frame = self.draw_game(frame)
+                with profiler.stage("draw"):
+                    combined_frame = self.draw_game(frame)
                 
                 # Add instructions
                 camera_height = frame.shape[0]
@@ -342,17 +364,20 @@ class HockeyGame:
                 cv2.putText(combined_frame, "Press 'Q' to quit", (10, instructions_y + 80), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
                 
-                cv2.imshow('Air Hockey with Start Menu', combined_frame)
+                with profiler.stage("display"):
+                    self.display.show('Air Hockey with Start Menu', combined_frame)
             
             # Handle keys
-            key = cv2.waitKey(1) & 0xFF
+            with profiler.stage("display"):
+                key = self.display.wait_key(1) & 0xFF
+            self.latency.present()
             if key == ord('q'):
                 break
             elif key == ord('r'):
                 self.reset_game()
         
-        self.cap.release()
-        cv2.destroyAllWindows()
+        close_capture(self.cap)
+        self.display.close()
     
     def reset_game(self):
         self.score1 = 0
@@ -368,5 +393,11 @@ class HockeyGame:
 
 # Run the game
 if __name__ == "__main__":
-    game = HockeyGame()
+    parser = make_parser("Air hockey controlled by hand tracking")
+    add_landmark_arguments(parser)
+    add_service_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    game = HockeyGame(args)
     game.run()
\ No newline at end of file
@@ -1,4 +1,7 @@
 from flask import Flask, jsonify, request
+import argparse
+import os
+import sys
 import cv2
 import base64
 import numpy as np
@@ -6,8 +9,23 @@ import time
 from datetime import datetime
 import mediapipe as mp
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.cli import make_solution, open_profiler
+from common.inference import inference_input
+
 app = Flask(__name__)
 
+# FOCUSGUARD_RECORD=dir keeps the landmarks of every processed frame,
+# FOCUSGUARD_REPLAY=dir answers from such a recording instead of MediaPipe
+landmark_args = argparse.Namespace(record=os.environ.get("FOCUSGUARD_RECORD"),
+                                   replay=os.environ.get("FOCUSGUARD_REPLAY"))
+
+# Face mesh and hands run on frames downscaled by this factor
+INFERENCE_SCALE = float(os.environ.get("FOCUSGUARD_INFERENCE_SCALE", "1.0"))
+
+# Per-request stage timings, enabled with CV_PROFILE
+profiler = open_profiler(landmark_args, "focusguard")
+
 # Add CORS headers manually for local development
 @app.after_request
 def after_request(response):
@@ -19,17 +37,17 @@ def after_request(response):
 class FocusDetector:
     def __init__(self):
         # Initialize MediaPipe solutions
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+        self.face_mesh = make_solution(landmark_args, "face", lambda: mp.solutions.face_mesh.FaceMesh(
             max_num_faces=1,
             refine_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
-        )
-        self.hands = mp.solutions.hands.Hands(
+        ))
+        self.hands = make_solution(landmark_args, "hands", lambda: mp.solutions.hands.Hands(
             max_num_hands=2,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
-        )
+        ))
         
         # Metrics
         self.start_time = time.time()
@@ -42,13 +60,16 @@ class FocusDetector:
         
     def detect_distractions(self, frame):
         distractions = []
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with profiler.stage("cvtColor"):
+            rgb_frame = inference_input(frame, INFERENCE_SCALE)
         
         # Face detection for looking away
-        face_results = self.face_mesh.process(rgb_frame)
+        with profiler.stage("face_mesh"):
+            face_results = self.face_mesh.process(rgb_frame)
         
         # Hand detection for phone use
-        hand_results = self.hands.process(rgb_frame)
+        with profiler.stage("hands"):
+            hand_results = self.hands.process(rgb_frame)
         
         # 1. No face detected (away from screen)
         if not face_results.multi_face_landmarks:
@@ -153,10 +174,12 @@ def process_frame():
         if not data or 'image' not in data:
             return jsonify({"error": "No image data provided"}), 400
             
-        image_data = data['image'].split(',')[1]
-        image_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        profiler.next_frame()
+        with profiler.stage("decode"):
+            image_data = data['image'].split(',')[1]
+            image_bytes = base64.b64decode(image_data)
+            nparr = np.frombuffer(image_bytes, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         if frame is None:
             return jsonify({"error": "Invalid image data"}), 400
@@ -0,0 +1,4 @@
+# Shared building blocks used by the individual projects.
+#
+# The projects are plain scripts, so each entry point puts the repository
+# root on sys.path before importing from here.
@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+# A captured image together with when it was grabbed and its position in the stream
+Frame = namedtuple("Frame", ["image", "timestamp", "seq"])
+
+
+class ThreadedCapture:
+    """Read a capture device on a background thread, keeping only the newest frame.
+
+    Works as a drop-in replacement for cv2.VideoCapture in the project loops:
+    read() returns (ret, image) but never hands back a frame that has been
+    sitting in the driver queue while the caller was busy with inference.
+    """
+
+    def __init__(self, source=0, width=None, height=None, max_failures=30):
+        # Accept either a device index / path or an already opened capture
+        if isinstance(source, (int, str)):
+            self.cap = cv2.VideoCapture(source)
+        else:
+            self.cap = source
+
+        if width is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        self.max_failures = max_failures  # Consecutive bad reads before giving up
+
+        # Stream statistics
+        self.seq = 0          # Frames grabbed so far
+        self.dropped = 0      # Frames overwritten before anyone read them
+        self.delivered = 0    # Frames handed to the caller
+
+        self._cond = threading.Condition()
+        self._latest = None
+        self._last_read_seq = 0
+        self._finished = False
+        self._release_on_exit = False  # release() gave up waiting; the reader thread releases the device
+        self._running = False
+        self._thread = None
+        self._started = None
+        self.last_timestamp = None  # Grab time of the frame read() returned last
+
+    def start(self):
+        """Start the reader thread (called automatically on the first read)"""
+        if self._thread is None:
+            self._started = time.perf_counter()
+            self._running = True
+            self._thread = threading.Thread(target=self._reader, name="ThreadedCapture", daemon=True)
+            self._thread.start()
+        return self
+
+    def _reader(self):
+        failures = 0
+        while self._running:
+            ret, image = self.cap.read()
+            timestamp = time.perf_counter()
+
+            if not ret:
+                failures += 1
+                if failures >= self.max_failures or not self.cap.isOpened():
+                    break
+                time.sleep(0.005)
+                continue
+            failures = 0
+
+            with self._cond:
+                self.seq += 1
+                # The previous frame was never picked up by the consumer
+                if self._latest is not None and self._latest.seq > self._last_read_seq:
+                    self.dropped += 1
+                self._latest = Frame(image, timestamp, self.seq)
+                self._cond.notify_all()
+
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+            release = self._release_on_exit
+        if release:
+            self.cap.release()
+
+    def read_frame(self, timeout=None):
+        """Return the newest frame not yet delivered, or None when the stream has ended.
+
+        Like cv2.VideoCapture.read(), this waits for as long as the device
+        takes (slow opens, exposure stalls); with a timeout it also returns
+        None once `timeout` seconds pass without a new frame.
+        """
+        self.start()
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while self._latest is None or self._latest.seq <= self._last_read_seq:
+                if self._finished:
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            frame = self._latest
+            self._last_read_seq = frame.seq
+            self.delivered += 1
+            return frame
+
+    def read(self):
+        """cv2.VideoCapture compatible read()"""
+        frame = self.read_frame()
+        if frame is None:
+            return False, None
+        self.last_timestamp = frame.timestamp
+        return True, frame.image
+
+    def stats(self):
+        """Counters describing how the consumer keeps up with the device"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        with self._cond:
+            return {
+                "captured": self.seq,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "frames": self.delivered,
+                "elapsed": elapsed,
+                "fps": self.delivered / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def isOpened(self):
+        if self._finished:
+            return False
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            with self._cond:
+                if not self._finished:
+                    # Still blocked inside cap.read(); releasing under it is unsafe
+                    self._release_on_exit = True
+                    return
+        self.cap.release()
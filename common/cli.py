@@ -0,0 +1,211 @@
+import argparse
+import atexit
+import os
+
+from common.display import make_display
+from common.hand_scheduler import RoiHandTracker
+from common.hand_service import HandRingReader, SharedCapture, SharedHands
+from common.latency import make_latency_tracker
+from common.profiler import make_profiler
+from common.recording import LandmarkRecorder, LandmarkReplay, RecordingSolution, ReplaySolution
+from common.sources import SyntheticSource, open_source
+
+
+def add_source_arguments(parser):
+    """Add the --source/--realtime/--loop options every entry point accepts"""
+    group = parser.add_argument_group("frame source")
+    group.add_argument("--source", default=None,
+                       help="webcam index, video file, image directory or "
+                            "synthetic[:WxH][@FPS][:FRAMES] (default: 0)")
+    group.add_argument("--realtime", action="store_true",
+                       help="pace file and synthetic sources at their FPS instead of max speed")
+    group.add_argument("--loop", action="store_true",
+                       help="restart file and image sources when they run out")
+    return parser
+
+
+def add_landmark_arguments(parser):
+    """Add --record/--replay for MediaPipe landmark recordings"""
+    group = parser.add_argument_group("landmark recording")
+    group.add_argument("--record", metavar="DIR",
+                       help="store every MediaPipe result in DIR while running")
+    group.add_argument("--replay", metavar="DIR",
+                       help="feed the results recorded in DIR instead of running MediaPipe")
+    return parser
+
+
+def add_inference_arguments(parser):
+    """Add --inference-scale for apps that run a MediaPipe solution on the frames"""
+    parser.add_argument("--inference-scale", type=float, default=1.0, metavar="S",
+                        help="downscale frames by S before MediaPipe; drawing and display "
+                             "stay at full resolution (default: 1.0)")
+    return parser
+
+
+def add_scheduler_arguments(parser):
+    """Add the options of the cropped / frame-skipping hand scheduler, and --inference-scale"""
+    group = parser.add_argument_group("hand inference scheduling")
+    group.add_argument("--roi", action="store_true",
+                       help="run Hands on a crop around the previous hands instead of the full frame")
+    group.add_argument("--hand-skip", type=int, default=0, metavar="N",
+                       help="extrapolate landmarks for N frames between inferences (default: 0)")
+    group.add_argument("--full-every", type=int, default=30, metavar="N",
+                       help="with --roi, search the full frame every N inferences (default: 30)")
+    add_inference_arguments(group)
+    return parser
+
+
+def add_service_arguments(parser):
+    """Add --hand-service for reading from a running common.hand_service"""
+    parser.add_argument("--hand-service", metavar="NAME",
+                        help="take frames and hand landmarks from the shared memory ring "
+                             "published by `python -m common.hand_service --name NAME`")
+    return parser
+
+
+def add_profile_arguments(parser):
+    """Add --profile [PATH] for per-stage latency measurement"""
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="time every stage of the frame loop, print p50/p95/p99 at exit and "
+                             "stream per-frame records to PATH (.jsonl or .csv); "
+                             "CV_PROFILE=PATH does the same")
+    return parser
+
+
+def add_display_arguments(parser):
+    """Add --headless/--events for running without a display server"""
+    group = parser.add_argument_group("headless output")
+    group.add_argument("--headless", nargs="?", const="null", metavar="SINK",
+                       help="open no windows and write them to SINK instead: a video file "
+                            "(out.mp4 -> out-<window>.mp4), a directory for image sequences "
+                            "or null (default when SINK is omitted)")
+    group.add_argument("--events", metavar="FILE",
+                       help="with --headless, scripted key presses and clicks (JSONL, see common/display.py)")
+    group.add_argument("--output-fps", type=float, default=30.0, metavar="FPS",
+                       help="frame rate stored in headless video files (default: 30)")
+    return parser
+
+
+def add_latency_arguments(parser):
+    """Add --latency [PATH] for input-to-photon measurement"""
+    parser.add_argument("--latency", nargs="?", const="", metavar="PATH",
+                        help="measure capture -> inference -> state update -> present latency, print "
+                             "percentiles and a histogram at exit and log every frame to PATH "
+                             "(.jsonl or .csv); CV_LATENCY=PATH does the same")
+    return parser
+
+
+def make_parser(description):
+    """Parser with the options of every entry point: frame source, display and profiling.
+
+    Apps add the landmark, hand service, scheduler and latency options
+    themselves, only when they build the matching solution or tracker.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_source_arguments(parser)
+    add_display_arguments(parser)
+    add_profile_arguments(parser)
+    return parser
+
+
+def open_profiler(args, name):
+    """Create the stage profiler requested by --profile or CV_PROFILE"""
+    output = getattr(args, "profile", None)
+    if output is None:
+        output = os.environ.get("CV_PROFILE")
+    if output is None:
+        return make_profiler(False)
+    return make_profiler(True, output or None, name)
+
+
+def open_latency(args, name, required=("inference", "update")):
+    """Create the latency tracker requested by --latency or CV_LATENCY"""
+    output = getattr(args, "latency", None)
+    if output is None:
+        output = os.environ.get("CV_LATENCY")
+    if output is None:
+        return make_latency_tracker(False)
+    return make_latency_tracker(True, output or None, name, required)
+
+
+def open_display(args):
+    """Create the GUI display, or the headless one requested by --headless"""
+    return make_display(getattr(args, "headless", None), getattr(args, "events", None),
+                        getattr(args, "output_fps", 30.0))
+
+
+def open_capture(args, width=None, height=None):
+    """Open the frame source selected on the command line.
+
+    When replaying landmarks without an explicit --source, blank synthetic
+    frames matching the recording are generated so no camera is needed.
+    """
+    if getattr(args, "hand_service", None):
+        return SharedCapture(_get_ring(args))
+
+    if args.source is None and getattr(args, "replay", None):
+        replay = _get_replay(args)
+        frame_width, frame_height = replay.meta.get("frame_size") or (width or 640, height or 480)
+        return SyntheticSource(frame_width, frame_height, frames=len(replay), realtime=args.realtime)
+
+    source = args.source if args.source is not None else "0"
+    return open_source(source, realtime=args.realtime,
+                       width=width, height=height, loop=args.loop)
+
+
+def close_capture(cap):
+    """Release a capture and print how fast frames were consumed"""
+    stats = cap.stats()
+    cap.release()
+    print(f"[SOURCE] {stats['frames']} frames in {stats['elapsed']:.1f}s "
+          f"({stats['fps']:.1f} FPS)" +
+          (f", {stats['dropped']} dropped" if "dropped" in stats else ""))
+    return stats
+
+
+def _get_replay(args):
+    if getattr(args, "_replay", None) is None:
+        args._replay = LandmarkReplay(args.replay)
+    return args._replay
+
+
+def _get_ring(args):
+    if getattr(args, "_ring", None) is None:
+        args._ring = HandRingReader(args.hand_service)
+    return args._ring
+
+
+def _get_recorder(args):
+    if getattr(args, "_recorder", None) is None:
+        args._recorder = LandmarkRecorder(args.record)
+        atexit.register(args._recorder.close)
+    return args._recorder
+
+
+def make_solution(args, kind, factory, max_hands=None):
+    """Create a MediaPipe solution honouring --record/--replay/--hand-service.
+
+    kind is "hands", "pose" or "face"; factory builds the real solution and
+    is not called at all when replaying or reading from the hand service.
+    max_hands caps the hands taken from the service to what the app expects.
+    """
+    if getattr(args, "replay", None):
+        return ReplaySolution(_get_replay(args), kind)
+
+    if kind == "hands" and getattr(args, "hand_service", None):
+        return SharedHands(_get_ring(args), max_hands)
+
+    solution = factory()
+    if kind == "hands" and (getattr(args, "roi", False) or getattr(args, "hand_skip", 0) > 0):
+        crop_hands = None
+        if args.roi:
+            # Crops need a still image solution; the app's own one keeps tracking full frames
+            import mediapipe as mp
+            crop_hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=max_hands or 2)
+        solution = RoiHandTracker(solution, skip=args.hand_skip,
+                                  full_every=args.full_every if args.roi else 0,
+                                  max_hands=max_hands or 2, crop_hands=crop_hands)
+        atexit.register(solution.report)
+    if getattr(args, "record", None):
+        return RecordingSolution(solution, _get_recorder(args), kind)
+    return solution
@@ -0,0 +1,296 @@
+import atexit
+import json
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+VIDEO_CODECS = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID", ".mov": "mp4v"}
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "window"
+
+
+def _as_bgr(image):
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    return image
+
+
+class NullSink:
+    """Discards frames; only counts them"""
+
+    wants_frames = False  # Callers may pass None instead of converting a frame nobody looks at
+
+    def __init__(self):
+        self.frames = {}
+
+    def write(self, name, image):
+        self.frames[name] = self.frames.get(name, 0) + 1
+
+    def close(self):
+        pass
+
+
+class VideoSink(NullSink):
+    """Encodes every window into its own video next to `path`.
+
+    out.mp4 becomes out-<window>.mp4; frames whose size differs from the first
+    one of a window are resized, since a VideoWriter has a fixed size.
+    """
+
+    wants_frames = True
+
+    def __init__(self, path, fps=30.0):
+        super().__init__()
+        self.stem, self.ext = os.path.splitext(path)
+        self.fps = fps
+        self.writers = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, name, image):
+        super().write(name, image)
+        image = _as_bgr(image)
+        entry = self.writers.get(name)
+        if entry is None:
+            size = (image.shape[1], image.shape[0])
+            fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODECS.get(self.ext.lower(), "mp4v"))
+            path = f"{self.stem}-{_slug(name)}{self.ext}"
+            entry = self.writers[name] = (cv2.VideoWriter(path, fourcc, self.fps, size), size)
+        writer, size = entry
+        if (image.shape[1], image.shape[0]) != size:
+            image = cv2.resize(image, size)
+        writer.write(image)
+
+    def close(self):
+        for writer, _ in self.writers.values():
+            writer.release()
+        self.writers = {}
+
+
+class ImageSequenceSink(NullSink):
+    """Writes DIR/<window>/000000.jpg, 000001.jpg, ..."""
+
+    wants_frames = True
+
+    def __init__(self, path, ext=".jpg"):
+        super().__init__()
+        self.path = path
+        self.ext = ext
+
+    def write(self, name, image):
+        index = self.frames.get(name, 0)
+        super().write(name, image)
+        directory = os.path.join(self.path, _slug(name))
+        if index == 0:
+            os.makedirs(directory, exist_ok=True)
+        cv2.imwrite(os.path.join(directory, f"{index:06d}{self.ext}"), image)
+
+
+def open_sink(spec, fps=30.0):
+    """Sink for a --headless value: "null", a video file or an image directory"""
+    if not spec or spec == "null":
+        return NullSink()
+    ext = os.path.splitext(spec)[1].lower()
+    if ext in VIDEO_CODECS:
+        return VideoSink(spec, fps)
+    if ext in (".png", ".jpg", ".jpeg", ".bmp"):
+        raise ValueError(f"{spec}: give a directory for image sequences, not an image file")
+    return ImageSequenceSink(spec)
+
+
+class EventScript:
+    """Keyboard and mouse input read from a JSONL file, one event per line:
+
+        {"frame": 120, "key": "c"}            key press seen by wait_key()
+        {"frame": 300, "key": 27}             key code (27 = ESC)
+        {"frame": 5, "click": [300, 430]}     left click in the pygame window
+        {"frame": 900, "quit": true}          close the pygame window
+
+    `frame` counts loop iterations, i.e. calls to Display.wait_key().
+    Several keys on the same frame are delivered on consecutive frames.
+    """
+
+    def __init__(self, path=None):
+        self.keys = []
+        self.pygame = []
+        if path:
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    event = json.loads(line)
+                    if "key" in event:
+                        key = event["key"]
+                        code = ord(key) if isinstance(key, str) else int(key)
+                        self.keys.append((int(event["frame"]), code))
+                    else:
+                        self.pygame.append((int(event["frame"]), event))
+        self.keys.sort(key=lambda e: e[0])
+        self.pygame.sort(key=lambda e: e[0])
+
+    def key(self, frame):
+        if self.keys and self.keys[0][0] <= frame:
+            return self.keys.pop(0)[1]
+        return -1
+
+    def pygame_events(self, frame):
+        events = []
+        while self.pygame and self.pygame[0][0] <= frame:
+            events.append(self.pygame.pop(0)[1])
+        return events
+
+
+class Display:
+    """Window output and input of the apps.
+
+    The GUI implementation forwards to cv2.imshow / cv2.waitKey and pygame.
+    With a headless sink, windows are never created: frames go to the sink,
+    keys and clicks come from an EventScript and nothing waits or syncs, so a
+    run is as fast as the pipeline itself.
+    """
+
+    headless = False
+
+    def __init__(self):
+        self.frame = 0
+        self._closed = False
+
+    def named_window(self, name, flags=cv2.WINDOW_AUTOSIZE):
+        cv2.namedWindow(name, flags)
+
+    def move_window(self, name, x, y):
+        cv2.moveWindow(name, x, y)
+
+    def show(self, name, image):
+        cv2.imshow(name, image)
+
+    def window_visible(self, name):
+        """False once the user has closed the window"""
+        return cv2.getWindowProperty(name, cv2.WND_PROP_VISIBLE) >= 1
+
+    def wait_key(self, delay=1):
+        """cv2.waitKey(); also marks the end of a loop iteration"""
+        self.frame += 1
+        return cv2.waitKey(delay)
+
+    def next_frame(self):
+        """End a loop iteration that has no OpenCV window to service"""
+        self.frame += 1
+        return -1
+
+    def init_pygame(self, size, caption, flags=0):
+        """pygame.init() and the main window surface"""
+        import pygame
+        pygame.init()
+        surface = pygame.display.set_mode(size, flags)
+        pygame.display.set_caption(caption)
+        return surface
+
+    def pygame_events(self):
+        import pygame
+        return pygame.event.get()
+
+    def present(self, name, surface, dirty=None):
+        """Make a finished pygame frame visible; dirty limits the update to those rects"""
+        import pygame
+        if dirty is None:
+            pygame.display.update()
+        elif dirty:
+            pygame.display.update(dirty)
+
+    def tick(self, clock, fps):
+        """Frame rate limit of pygame loops"""
+        return clock.tick(fps)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        cv2.destroyAllWindows()
+
+
+class HeadlessDisplay(Display):
+    headless = True
+
+    def __init__(self, sink, events=None):
+        super().__init__()
+        self.sink = sink
+        self.events = events or EventScript()
+        self._start = None
+
+    def named_window(self, name, flags=cv2.WINDOW_AUTOSIZE):
+        pass
+
+    def move_window(self, name, x, y):
+        pass
+
+    def show(self, name, image):
+        if self._start is None:
+            self._start = time.perf_counter()
+        self.sink.write(name, image)
+
+    def window_visible(self, name):
+        return True
+
+    def wait_key(self, delay=1):
+        key = self.events.key(self.frame)
+        self.frame += 1
+        return key
+
+    def next_frame(self):
+        return self.wait_key()
+
+    def init_pygame(self, size, caption, flags=0):
+        # The dummy video driver has to be chosen before pygame.init()
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        return super().init_pygame(size, caption, 0)
+
+    def pygame_events(self):
+        import pygame
+        pygame.event.pump()
+        events = []
+        for event in self.events.pygame_events(self.frame):
+            if event.get("quit"):
+                events.append(pygame.event.Event(pygame.QUIT))
+            elif "click" in event:
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=tuple(event["click"]), button=1))
+        return events
+
+    def present(self, name, surface, dirty=None):
+        if not self.sink.wants_frames:
+            self.show(name, None)
+            return
+        import pygame
+        rgb = pygame.surfarray.pixels3d(surface)  # (w, h, 3) view
+        self.show(name, cv2.cvtColor(np.ascontiguousarray(rgb.swapaxes(0, 1)), cv2.COLOR_RGB2BGR))
+        del rgb  # Unlock the surface
+
+    def tick(self, clock, fps):
+        return clock.tick()  # Measure only, never sleep
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.sink.close()
+        elapsed = time.perf_counter() - self._start if self._start else 0.0
+        for name, frames in self.sink.frames.items():
+            print(f"[HEADLESS] {name}: {frames} frames in {elapsed:.1f}s "
+                  f"({frames / elapsed if elapsed > 0 else 0.0:.1f} FPS)")
+
+
+def make_display(headless=None, events=None, fps=30.0):
+    """GUI display, or a headless one writing to the sink named by `headless`"""
+    if headless is None:
+        return Display()
+    display = HeadlessDisplay(open_sink(headless, fps), EventScript(events))
+    atexit.register(display.close)
+    return display
@@ -0,0 +1,145 @@
+import numpy as np
+
+from common.landmarks import hands_to_array
+from common.recording import HANDEDNESS_LABELS, hand_results
+
+
+class RoiHandTracker:
+    """Cut the cost of Hands.process by cropping and skipping frames.
+
+    Wraps a MediaPipe Hands solution and is used in its place:
+
+    - after a hand is found, inference runs on a crop around the previous
+      landmarks (expanded by `margin`) instead of the full frame, through
+      `crop_hands`;
+    - the full frame is searched again after a miss and every `full_every`
+      inferences, so new hands are still picked up;
+    - `skip` frames between inferences get landmarks extrapolated from the
+      last two results (constant velocity), without running the model.
+
+    Landmarks are mapped back to full frame normalized coordinates, so the
+    results look exactly like what Hands itself returns.
+
+    The crops move and resize between calls, which a video mode solution
+    (static_image_mode=False) would take for one moving image and track its
+    hand ROI across, skipping palm detection on garbage. `crop_hands` must
+    therefore be a separate Hands built with static_image_mode=True; the
+    wrapped `hands` only ever sees full frames. Without crop_hands the
+    tracker only extrapolates.
+    """
+
+    def __init__(self, hands, skip=0, full_every=30, margin=0.35, min_size=0.2, max_hands=2, crop_hands=None):
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self.skip = skip
+        self.full_every = full_every
+        self.margin = margin
+        self.min_size = min_size  # Smallest crop side as a fraction of the frame
+        self.max_hands = max_hands
+
+        self.points = None        # (hands, 21, 3) from the last inference
+        self.velocity = None      # Change per frame between the last two inferences
+        self.handedness = None
+        self.since_inference = 0
+        self.since_full = 0
+
+        # Counters for reporting
+        self.frames = 0
+        self.full_runs = 0
+        self.roi_runs = 0
+        self.skipped = 0
+        self.misses = 0
+
+    def process(self, image):
+        self.frames += 1
+
+        # Extrapolate between inferences
+        if self.points is not None and self.since_inference < self.skip:
+            self.since_inference += 1
+            self.skipped += 1
+            predicted = self.points + self.velocity * self.since_inference
+            return hand_results(predicted, len(predicted), self.handedness)
+
+        height, width = image.shape[:2]
+        if self.crop_hands is not None and self.points is not None and self.since_full < self.full_every:
+            x0, y0, x1, y1 = self._roi(width, height)
+            crop = np.ascontiguousarray(image[y0:y1, x0:x1])
+            results = self.crop_hands.process(crop)
+            self.roi_runs += 1
+            self.since_full += 1
+            if results.multi_hand_landmarks:
+                points = hands_to_array(results, self.max_hands)
+                scale = np.array([(x1 - x0) / width, (y1 - y0) / height, (x1 - x0) / width], dtype=np.float32)
+                offset = np.array([x0 / width, y0 / height, 0.0], dtype=np.float32)
+                return self._update(points * scale + offset, results)
+            self.misses += 1
+
+        # Nothing tracked, periodic refresh or the hand left the crop
+        results = self.hands.process(image)
+        self.full_runs += 1
+        self.since_full = 0
+        if results.multi_hand_landmarks:
+            return self._update(hands_to_array(results, self.max_hands), results)
+
+        self.points = None
+        self.velocity = None
+        return results
+
+    def _roi(self, width, height):
+        """Pixel box around all tracked hands, expanded and clamped to the frame"""
+        xy = self.points[..., :2].reshape(-1, 2)
+        (left, top), (right, bottom) = xy.min(axis=0), xy.max(axis=0)
+        size_x = max(right - left, self.min_size)
+        size_y = max(bottom - top, self.min_size)
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        half_x = size_x * (0.5 + self.margin)
+        half_y = size_y * (0.5 + self.margin)
+        x0 = int(np.clip(cx - half_x, 0, 1) * width)
+        x1 = int(np.clip(cx + half_x, 0, 1) * width)
+        y0 = int(np.clip(cy - half_y, 0, 1) * height)
+        y1 = int(np.clip(cy + half_y, 0, 1) * height)
+        return x0, y0, max(x1, x0 + 1), max(y1, y0 + 1)
+
+    def _update(self, points, results):
+        elapsed = self.since_inference + 1
+        if self.points is not None and len(self.points) == len(points):
+            self.velocity = (points - self.points) / elapsed
+        else:
+            self.velocity = np.zeros_like(points)
+        self.points = points
+        self.since_inference = 0
+
+        labels = results.multi_handedness or []
+        self.handedness = np.array([
+            HANDEDNESS_LABELS.index(h.classification[0].label)
+            if h.classification[0].label in HANDEDNESS_LABELS else -1
+            for h in labels[:len(points)]
+        ] + [-1] * (len(points) - len(labels)), dtype=np.int8)
+        return hand_results(points, len(points), self.handedness)
+
+    def stats(self):
+        inferences = self.full_runs + self.roi_runs
+        return {
+            "frames": self.frames,
+            "full": self.full_runs,
+            "roi": self.roi_runs,
+            "skipped": self.skipped,
+            "misses": self.misses,
+            "inference_ratio": inferences / self.frames if self.frames else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"[SCHEDULER] {s['frames']} frames: {s['full']} full, {s['roi']} cropped, "
+              f"{s['skipped']} extrapolated, {s['misses']} crop misses")
+
+    def close(self):
+        self.hands.close()
+        if self.crop_hands is not None:
+            self.crop_hands.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
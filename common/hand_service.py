@@ -0,0 +1,375 @@
+"""Hand tracking daemon that publishes frames and landmarks over shared memory.
+
+Run one service per camera:
+
+    python -m common.hand_service --name kiosk0 --source 0 --width 1280 --height 720
+
+and start the apps with --hand-service kiosk0. They then read frames and
+landmarks from the ring buffer instead of opening the camera and running
+their own MediaPipe Hands.
+
+The apps copy each frame and its landmarks out of the ring (one memcpy of
+the frame, small next to MediaPipe) rather than working on views: an app
+lapped by the writer while it holds a view would otherwise see a torn
+frame, or a frame paired with another frame's landmarks. Zero-copy access
+is still there for consumers that can check still_valid() once they are
+done with a slot and discard their work when it fails.
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from common.inference import inference_input
+from common.latency import capture_timestamp
+from common.landmarks import HAND_POINTS, landmarks_to_array
+from common.recording import HANDEDNESS_LABELS, hand_results
+
+MAGIC = 0x48414E44  # "HAND"
+HEADER_FIELDS = 8   # magic, slots, width, height, max_hands, latest seq, closed, reserved
+LATEST, CLOSED = 5, 6
+
+
+def _layout(slots, width, height, max_hands):
+    """Byte offsets of every array in the shared block"""
+    fields = [
+        ("header", (HEADER_FIELDS,), np.int64),
+        ("meta", (slots, 4), np.int64),                  # seq_begin, seq_end, hand_count, -
+        ("timestamps", (slots,), np.float64),
+        ("handedness", (slots, max_hands), np.int8),
+        ("landmarks", (slots, max_hands, HAND_POINTS, 3), np.float32),
+        ("frames", (slots, height, width, 3), np.uint8),
+    ]
+    layout, offset = {}, 0
+    for name, shape, dtype in fields:
+        layout[name] = (offset, shape, dtype)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (size + 63) // 64 * 64  # Keep every array cache line aligned
+    return layout, offset
+
+
+def _views(buffer, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()}
+
+
+class HandRingWriter:
+    """Publisher side of the ring buffer.
+
+    Each slot is guarded like a seqlock: seq_end is cleared, seq_begin set,
+    the data written and then seq_end set to the same sequence number. A
+    reader accepts a slot only while both match the sequence it expects.
+    """
+
+    def __init__(self, name, width, height, slots=4, max_hands=2):
+        self.layout, size = _layout(slots, width, height, max_hands)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.arrays = _views(self.shm.buf, self.layout)
+        self.slots = slots
+        self.max_hands = max_hands
+        self.seq = 0
+
+        header = self.arrays["header"]
+        header[:] = 0
+        header[:5] = (MAGIC, slots, width, height, max_hands)
+
+    def publish(self, frame, landmarks, handedness, count, timestamp):
+        self.seq += 1
+        slot = self.seq % self.slots
+        a = self.arrays
+        a["meta"][slot, 1] = 0
+        a["meta"][slot, 0] = self.seq
+        a["frames"][slot] = frame
+        a["landmarks"][slot, :count] = landmarks[:count]
+        a["handedness"][slot] = -1
+        a["handedness"][slot, :count] = handedness[:count]
+        a["meta"][slot, 2] = count
+        a["timestamps"][slot] = timestamp
+        a["meta"][slot, 1] = self.seq
+        a["header"][LATEST] = self.seq
+
+    def close(self):
+        self.arrays["header"][CLOSED] = 1
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name):
+    """Open an existing block without letting this process' tracker unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached blocks too and would remove them on exit
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+# A slot copied out of the ring: frame, (max_hands, 21, 3) landmarks, handedness, hand count, capture time
+RingSample = namedtuple("RingSample", ["frame", "landmarks", "handedness", "count", "timestamp"])
+
+
+class HandRingReader:
+    """Consumer of a HandRingWriter block.
+
+    read() finds the newest slot; frame(), hands() and timestamp() are views
+    straight into shared memory that stay valid only until the writer wraps
+    around the ring, which is what still_valid() checks. fetch() copies a
+    slot out and keeps it only if the slot survived the copy, so the frame
+    and landmarks it returns always belong together.
+    """
+
+    def __init__(self, name, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                self.shm = _attach(name)
+                break
+            except FileNotFoundError:
+                if time.perf_counter() > deadline:
+                    raise
+                time.sleep(0.05)
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        if header[0] != MAGIC:
+            raise ValueError(f"{name} is not a hand tracking ring buffer")
+        slots, width, height, max_hands = (int(v) for v in header[1:5])
+        self.layout, _ = _layout(slots, width, height, max_hands)
+        self.arrays = _views(self.shm.buf, self.layout)
+        self.slots = slots
+        self.width, self.height = width, height
+        self.max_hands = max_hands
+
+        self.last_seq = 0
+        self.current = None  # (seq, slot) of the snapshot handed out last
+        self.sample = None   # RingSample copied out by the last fetch()
+        self.frames = 0
+        self.dropped = 0
+        self.torn = 0        # Slots overwritten while being copied
+        self._started = None
+
+    def closed(self):
+        return bool(self.arrays["header"][CLOSED])
+
+    def read(self, timeout=2.0):
+        """Wait for a newer slot and return its seq and index, or None"""
+        if self._started is None:
+            self._started = time.perf_counter()
+        deadline = time.perf_counter() + timeout
+        header = self.arrays["header"]
+        meta = self.arrays["meta"]
+        while True:
+            seq = int(header[LATEST])
+            if seq > self.last_seq:
+                slot = seq % self.slots
+                if meta[slot, 0] == seq and meta[slot, 1] == seq:
+                    if self.last_seq:
+                        self.dropped += seq - self.last_seq - 1
+                    self.last_seq = seq
+                    self.current = (seq, slot)
+                    self.frames += 1
+                    return self.current
+            if self.closed() or time.perf_counter() > deadline:
+                return None
+            time.sleep(0.0005)
+
+    def still_valid(self, snapshot=None):
+        """True while the writer has not started reusing the slot"""
+        seq, slot = snapshot or self.current
+        meta = self.arrays["meta"]
+        return meta[slot, 0] == seq and meta[slot, 1] == seq
+
+    def fetch(self, timeout=2.0):
+        """Copy of the newest consistent slot as a RingSample, or None.
+
+        A slot the writer started overwriting during the copy is counted as
+        torn and dropped, and the next newer slot is read instead.
+        """
+        while True:
+            snapshot = self.read(timeout)
+            if snapshot is None:
+                return None
+            landmarks, handedness, count = self.hands(snapshot)
+            sample = RingSample(self.frame(snapshot).copy(), landmarks[:count].copy(), handedness[:count].copy(),
+                                count, self.timestamp(snapshot))
+            if self.still_valid(snapshot):
+                self.sample = sample
+                return sample
+            self.torn += 1
+
+    def frame(self, snapshot=None):
+        return self.arrays["frames"][(snapshot or self.current)[1]]
+
+    def timestamp(self, snapshot=None):
+        return float(self.arrays["timestamps"][(snapshot or self.current)[1]])
+
+    def hands(self, snapshot=None):
+        """(landmarks view, handedness view, count) for a slot"""
+        slot = (snapshot or self.current)[1]
+        a = self.arrays
+        return a["landmarks"][slot], a["handedness"][slot], int(a["meta"][slot, 2])
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "torn": self.torn,
+            "elapsed": elapsed,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def close(self):
+        self.arrays = None
+        self.shm.close()
+
+
+class SharedCapture:
+    """cv2.VideoCapture style frame reader backed by a HandRingReader"""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.last_timestamp = None
+
+    def read(self):
+        sample = self.reader.fetch()
+        if sample is None:
+            return False, None
+        # perf_counter() of the service process; the clock is system wide on Linux
+        self.last_timestamp = sample.timestamp
+        return True, sample.frame
+
+    def stats(self):
+        return self.reader.stats()
+
+    def isOpened(self):
+        return not self.reader.closed()
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.reader.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.reader.height
+        return 0
+
+    def release(self):
+        self.reader.close()
+
+
+class SharedHands:
+    """Drop-in for mp.solutions.hands.Hands returning the service's landmarks
+    for the frame most recently read through the same HandRingReader"""
+
+    def __init__(self, reader, max_hands=None):
+        self.reader = reader
+        self.max_hands = max_hands or reader.max_hands
+
+    def process(self, image=None):
+        sample = self.reader.sample or self.reader.fetch()
+        if sample is None:
+            return hand_results(None, 0, None)
+        return hand_results(sample.landmarks, min(sample.count, self.max_hands), sample.handedness)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve(args):
+    import mediapipe as mp
+    from common.sources import open_source
+
+    cap = open_source(args.source, realtime=args.realtime, width=args.width, height=args.height)
+    hands = mp.solutions.hands.Hands(
+        max_num_hands=args.max_hands,
+        min_detection_confidence=args.min_detection_confidence,
+        min_tracking_confidence=args.min_tracking_confidence,
+    )
+
+    running = [True]
+    signal.signal(signal.SIGTERM, lambda *_: running.__setitem__(0, False))
+
+    writer = None
+    landmarks = np.zeros((args.max_hands, HAND_POINTS, 3), dtype=np.float32)
+    handedness = np.full(args.max_hands, -1, dtype=np.int8)
+    start = time.perf_counter()
+    try:
+        while running[0]:
+            ret, frame = cap.read()
+            if not ret:
+                if not cap.isOpened():
+                    break
+                continue
+            # When the frame was grabbed, not when this loop got it, so consumers see the capture latency
+            timestamp = capture_timestamp(cap)
+
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = HandRingWriter(args.name, width, height, args.slots, args.max_hands)
+                print(f"[SERVICE] Publishing {width}x{height} frames on '{args.name}'")
+
+            # Every app mirrors the frame before inference, so the landmarks
+            # are published for the mirrored image while the frame stays raw
+            rgb = inference_input(cv2.flip(frame, 1), args.inference_scale)
+            results = hands.process(rgb)
+
+            count = 0
+            if results.multi_hand_landmarks:
+                for hand, label in zip(results.multi_hand_landmarks, results.multi_handedness):
+                    if count == args.max_hands:
+                        break
+                    landmarks[count] = landmarks_to_array(hand)
+                    name = label.classification[0].label
+                    handedness[count] = HANDEDNESS_LABELS.index(name) if name in HANDEDNESS_LABELS else -1
+                    count += 1
+            writer.publish(frame, landmarks, handedness, count, timestamp)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - start
+        if writer is not None:
+            print(f"[SERVICE] {writer.seq} frames in {elapsed:.1f}s ({writer.seq / max(elapsed, 1e-9):.1f} FPS)")
+            writer.close()
+        cap.release()
+        hands.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared hand tracking service")
+    parser.add_argument("--name", default="hands0", help="shared memory block name")
+    parser.add_argument("--source", default="0", help="webcam index, video file, image directory or synthetic spec")
+    parser.add_argument("--realtime", action="store_true", help="pace file and synthetic sources at their FPS")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--slots", type=int, default=4, help="frames kept in the ring buffer")
+    parser.add_argument("--max-hands", type=int, default=2)
+    parser.add_argument("--min-detection-confidence", type=float, default=0.8)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.7)
+    parser.add_argument("--inference-scale", type=float, default=1.0, help="downscale frames by this factor for inference")
+    serve(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def inference_input(frame, scale=1.0):
+    """RGB image for MediaPipe, optionally downscaled, from a BGR display frame.
+
+    The resize happens before the colour conversion so only the small image is
+    converted. MediaPipe returns normalized landmarks, so results map back to
+    the full resolution frame by multiplying with the display size as before.
+    """
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def _make_solution(kind):
+    import mediapipe as mp
+    if kind == "hands":
+        return mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.7,
+                                        min_tracking_confidence=0.5)
+    if kind == "pose":
+        return mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+
+
+def _first_landmarks(kind, results):
+    """(N, 2) normalized x, y of the first detected hand / pose / face, or None"""
+    from common.landmarks import landmarks_to_array
+    if kind == "hands":
+        found = results.multi_hand_landmarks
+    elif kind == "pose":
+        found = [results.pose_landmarks] if results.pose_landmarks else None
+    else:
+        found = results.multi_face_landmarks
+    return landmarks_to_array(found[0], dims=2) if found else None
+
+
+def _benchmark(args):
+    """Run the same frames through one solution per scale and compare against the first scale"""
+    from common.sources import open_source
+
+    cap = open_source(args.source, width=args.width, height=args.height)
+    frames = []
+    while len(frames) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            if not cap.isOpened():
+                break
+            continue
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    if not frames:
+        print(f"[BENCH] No frames from {args.source}")
+        return
+    height, width = frames[0].shape[:2]
+    size = np.array([width, height], dtype=np.float32)
+
+    print(f"[BENCH] {args.kind}: {len(frames)} frames at {width}x{height}, "
+          f"error in display pixels against scale {args.scales[0]}")
+    print(f"{'scale':>6}{'input':>12}{'mean':>9}{'p95':>9}{'detect':>9}{'err':>9}{'err p95':>9}")
+
+    reference = None
+    for scale in args.scales:
+        solution = _make_solution(args.kind)  # Fresh tracking state per scale
+        latencies, points = [], []
+        for frame in frames:
+            start = time.perf_counter()
+            results = solution.process(inference_input(frame, scale))
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            points.append(_first_landmarks(args.kind, results))
+        solution.close()
+
+        if reference is None:
+            reference = points
+        errors = [np.linalg.norm((p - r) * size, axis=-1).mean()
+                  for p, r in zip(points, reference) if p is not None and r is not None and p.shape == r.shape]
+        detected = sum(p is not None for p in points) / len(points)
+        mean_error = float(np.mean(errors)) if errors else float("nan")
+        p95_error = float(np.percentile(errors, 95)) if errors else float("nan")
+        latencies = np.asarray(latencies)
+        print(f"{scale:>6.2f}{f'{round(width * scale)}x{round(height * scale)}':>12}"
+              f"{latencies.mean():>9.2f}{np.percentile(latencies, 95):>9.2f}"
+              f"{detected:>9.0%}{mean_error:>9.1f}{p95_error:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MediaPipe latency and landmark error against inference scale")
+    parser.add_argument("--source", default="0", help="webcam index, video file, image directory or synthetic spec")
+    parser.add_argument("--kind", choices=("hands", "pose", "face"), default="hands")
+    parser.add_argument("--frames", type=int, default=300, help="frames to capture up front")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.35, 0.25],
+                        help="first scale is the accuracy reference")
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import numpy as np
+
+HAND_POINTS = 21
+
+# Finger tips and the joints they are compared against (thumb first)
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+
+# Same pairs as mp.solutions.hands.HAND_CONNECTIONS, without importing MediaPipe
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),          # thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),          # index
+    (5, 9), (9, 10), (10, 11), (11, 12),     # middle
+    (9, 13), (13, 14), (14, 15), (15, 16),   # ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # pinky and palm
+)
+
+
+def landmarks_to_array(landmarks, dims=3):
+    """Convert MediaPipe landmarks to an (N, dims) float32 array.
+
+    Accepts a NormalizedLandmarkList, its `.landmark` sequence, a recorded /
+    shared-memory LandmarkList (whose array is used as is) or an array.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks[:, :dims]
+    array = getattr(landmarks, "array", None)
+    if array is not None:
+        return np.asarray(array[:, :dims], dtype=np.float32)
+    points = getattr(landmarks, "landmark", landmarks)
+    if dims == 2:
+        return np.array([(lm.x, lm.y) for lm in points], dtype=np.float32)
+    if dims == 4:
+        return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in points], dtype=np.float32)
+    return np.array([(lm.x, lm.y, lm.z) for lm in points], dtype=np.float32)
+
+
+def hands_to_array(results, max_hands=None):
+    """All hands of a Hands result as one (hands, 21, 3) float32 array"""
+    hands = results.multi_hand_landmarks or []
+    if max_hands is not None:
+        hands = hands[:max_hands]
+    if not hands:
+        return np.empty((0, HAND_POINTS, 3), dtype=np.float32)
+    return np.stack([landmarks_to_array(hand) for hand in hands])
+
+
+def to_pixels(points, width, height):
+    """Normalized (..., 2+) coordinates to int32 pixel positions"""
+    return (points[..., :2] * (width, height)).astype(np.int32)
+
+
+def fingers_extended(hands):
+    """(..., 5) bool: tip above its PIP joint for thumb, index, middle, ring, pinky"""
+    return hands[..., FINGER_TIPS, 1] < hands[..., FINGER_PIPS, 1]
+
+
+def joint_angles(a, b, c):
+    """Angle at b in degrees for (..., 3) point arrays"""
+    ba = a - b
+    bc = c - b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cos = (ba * bc).sum(axis=-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+
+from common.reporting import Reporter, percentiles, report_at_exit
+
+# Histogram bin edges in milliseconds; the last bin is open ended
+HISTOGRAM_BINS = (0, 10, 20, 30, 40, 50, 60, 70, 80, 100, 120, 150, 200, 300, 500)
+
+
+def capture_timestamp(cap):
+    """perf_counter() time at which the frame last returned by cap was grabbed.
+
+    ThreadedCapture, frame sources and the shared capture record it; for
+    anything else the current time is the best available estimate.
+    """
+    timestamp = getattr(cap, "last_timestamp", None)
+    return timestamp if timestamp is not None else time.perf_counter()
+
+
+class LatencyTracker(Reporter):
+    """Input-to-photon latency of the hand-controlled loops.
+
+    For every camera frame the app calls begin(capture_time), then mark()
+    when inference on it has finished and when the game / canvas state has
+    been updated from it, and present() once the resulting frame is on
+    screen. Each mark is stored as milliseconds since capture.
+
+    A frame is only completed by the first present() after all `required`
+    marks were set, so a loop that renders several times per camera frame
+    measures the frame that first shows the input. A frame replaced by a
+    newer begin() before that happens is counted as superseded.
+    """
+
+    def __init__(self, enabled=False, output=None, name="latency", required=("inference", "update")):
+        self.required = tuple(required)
+        self.marks = self.required + ("present",)
+        super().__init__(enabled, output, name, ["frame", "capture"] + [f"{mark}_ms" for mark in self.marks])
+        self.samples = {mark: [] for mark in self.marks}
+        self.frames = 0
+        self.superseded = 0
+        self._pending = None
+
+    def begin(self, capture_time):
+        if not self.enabled:
+            return
+        if self._pending is not None:
+            self.superseded += 1
+        self._pending = {"capture": capture_time}
+
+    def mark(self, name, timestamp=None):
+        if not self.enabled or self._pending is None or name in self._pending:
+            return
+        self._pending[name] = time.perf_counter() if timestamp is None else timestamp
+
+    def present(self, timestamp=None):
+        """The frame just shown reflects the pending input, if it is complete"""
+        if not self.enabled or self._pending is None:
+            return
+        record = self._pending
+        if any(mark not in record for mark in self.required):
+            return
+        record["present"] = time.perf_counter() if timestamp is None else timestamp
+        self._pending = None
+
+        capture = record["capture"]
+        latencies = {mark: (record[mark] - capture) * 1000.0 for mark in self.marks}
+        for mark, ms in latencies.items():
+            self.samples[mark].append(ms)
+
+        if self.records is not None:
+            self.records.write([[self.frames, f"{capture:.6f}"] + [f"{latencies[m]:.3f}" for m in self.marks]],
+                               {"frame": self.frames, "capture": round(capture, 6),
+                                **{m: round(latencies[m], 3) for m in self.marks}})
+        self.frames += 1
+
+    def summary(self):
+        """Per-mark count, mean, percentiles and max in milliseconds since capture"""
+        return {mark: percentiles(values) for mark, values in self.samples.items() if values}
+
+    def histogram(self, mark="present"):
+        """Frame counts per HISTOGRAM_BINS bucket"""
+        edges = list(HISTOGRAM_BINS) + [np.inf]
+        counts, _ = np.histogram(np.asarray(self.samples[mark]), bins=edges)
+        return counts.tolist()
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"\n[LATENCY] {self.name}: {self.frames} frames, {self.superseded} superseded before shown")
+        print(f"{'capture ->':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms)")
+        for mark in self.marks:
+            s = summary.get(mark)
+            if s:
+                print(f"{mark:<14}{s['mean']:>10.1f}{s['p50']:>10.1f}{s['p95']:>10.1f}"
+                      f"{s['p99']:>10.1f}{s['max']:>10.1f}")
+
+        counts = self.histogram("present")
+        peak = max(counts) or 1
+        print("capture -> present histogram:")
+        for i, count in enumerate(counts):
+            upper = f"{HISTOGRAM_BINS[i + 1]:>4}" if i + 1 < len(HISTOGRAM_BINS) else " inf"
+            print(f"  {HISTOGRAM_BINS[i]:>4}-{upper} ms {count:>7} {'#' * round(40 * count / peak)}")
+
+
+def make_latency_tracker(enabled=False, output=None, name="latency", required=("inference", "update")):
+    """Create a tracker that reports automatically when the process exits"""
+    return report_at_exit(LatencyTracker(enabled, output, name, required))
@@ -0,0 +1,170 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from common.landmarks import HAND_CONNECTIONS, HAND_POINTS, to_pixels
+
+# mp_drawing's default DrawingSpecs: red joints, light grey connections
+RED = (0, 0, 255)
+LIGHT_GREY = (224, 224, 224)
+
+
+def disc_offsets(radius):
+    """(M, 2) pixel offsets (dx, dy) of a filled disc"""
+    r = max(int(radius), 0)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = dx * dx + dy * dy <= r * r
+    return np.stack([dx[inside], dy[inside]], axis=-1).astype(np.int32)
+
+
+class GlyphAtlas:
+    """Label glyphs rendered once with cv2.putText and kept as pixel offsets.
+
+    Every label's set pixels are stored relative to the putText origin
+    (bottom left of the text), concatenated into one `offsets` array with the
+    label each pixel belongs to in `owner`. Drawing all labels of a frame is
+    then one fancy-indexed assignment, pixel-identical to calling putText per
+    label (which draws without anti-aliasing at the default line type).
+    """
+
+    def __init__(self, labels, font_scale=0.4, thickness=1, font=cv2.FONT_HERSHEY_SIMPLEX):
+        offsets, owner = [], []
+        for index, text in enumerate(labels):
+            (width, height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+            pad = thickness + 1
+            origin = (pad, pad + height)
+            canvas = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+            cv2.putText(canvas, text, origin, font, font_scale, 255, thickness)
+            ys, xs = np.nonzero(canvas)
+            offsets.append(np.stack([xs - origin[0], ys - origin[1]], axis=-1))
+            owner.append(np.full(len(xs), index))
+        self.offsets = np.concatenate(offsets).astype(np.int32)
+        self.owner = np.concatenate(owner).astype(np.intp)
+
+
+def stamp(image, coords, color):
+    """Set the (..., 2) pixel coordinates (x, y) of image to color, skipping any outside it"""
+    coords = coords.reshape(-1, 2)
+    height, width = image.shape[:2]
+    x, y = coords[:, 0], coords[:, 1]
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    image[y[inside], x[inside]] = color
+
+
+class LandmarkOverlay:
+    """Draw landmark skeletons onto a BGR frame in place.
+
+    Replaces mp_drawing.draw_landmarks, which loops over the landmarks and
+    connections in Python and issues one OpenCV call for each. Here all
+    connections of all hands go to a single cv2.polylines call, all joints are
+    stamped from a precomputed disc in one array assignment, and index labels
+    come from a GlyphAtlas the same way. Works on a landmark array, so callers
+    convert a result once with hands_to_array() / landmarks_to_array().
+
+    Arrays with a 4th visibility column (pose) only draw landmarks whose
+    visibility is at least `min_visibility`, like mp_drawing does.
+    """
+
+    def __init__(self, connections=HAND_CONNECTIONS, point_color=RED, radius=2, line_color=LIGHT_GREY,
+                 thickness=2, labels=False, label_color=(0, 255, 0), font_scale=0.4, min_visibility=0.5):
+        self.connections = np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+        self.point_color = point_color
+        self.line_color = line_color
+        self.thickness = thickness
+        self.label_color = label_color
+        self.min_visibility = min_visibility
+        self.disc = disc_offsets(radius) if radius > 0 else None
+
+        self.atlas = None
+        if labels:
+            if labels is True:
+                count = int(self.connections.max()) + 1 if len(self.connections) else HAND_POINTS
+                labels = [str(i) for i in range(count)]
+            self.atlas = GlyphAtlas(labels, font_scale)
+
+    def draw(self, image, landmarks):
+        """Draw (points, 2+) or (sets, points, 2+) normalized landmarks; returns image"""
+        landmarks = np.asarray(landmarks)
+        if landmarks.size == 0:
+            return image
+        count = landmarks.shape[-2]
+        height, width = image.shape[:2]
+        points = to_pixels(landmarks, width, height).reshape(-1, count, 2)
+
+        visible = None
+        if self.min_visibility is not None and landmarks.shape[-1] >= 4:
+            visible = (landmarks[..., 3] >= self.min_visibility).reshape(len(points), count)
+
+        if len(self.connections) and self.thickness > 0:
+            segments = points[:, self.connections]
+            if visible is not None:
+                segments = segments[visible[:, self.connections].all(axis=-1)]
+            segments = np.ascontiguousarray(segments.reshape(-1, 2, 2))
+            if len(segments):
+                cv2.polylines(image, list(segments), False, self.line_color, self.thickness)
+
+        if self.disc is not None:
+            joints = points if visible is None else points[visible]
+            stamp(image, joints.reshape(-1, 1, 2) + self.disc, self.point_color)
+
+        if self.atlas is not None:
+            keep = self.atlas.owner < count
+            owner = self.atlas.owner[keep]
+            pixels = points[:, owner] + self.atlas.offsets[keep]
+            if visible is not None:
+                pixels = pixels[visible[:, owner]]
+            stamp(image, pixels, self.label_color)
+        return image
+
+
+def _draw_per_element(image, hands, connections, labels):
+    """What mp_drawing.draw_landmarks plus one putText per label does, for comparison"""
+    height, width = image.shape[:2]
+    for hand in hands:
+        points = [(int(x * width), int(y * height)) for x, y in hand[:, :2].tolist()]
+        for a, b in connections:
+            cv2.line(image, points[a], points[b], LIGHT_GREY, 2)
+        for point in points:
+            cv2.circle(image, point, 2, RED, 2)
+        if labels:
+            for i, point in enumerate(points):
+                cv2.putText(image, str(i), point, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+
+
+def _benchmark(args):
+    rng = np.random.default_rng(0)
+    hands = rng.uniform(0.05, 0.95, (args.hands, HAND_POINTS, 3)).astype(np.float32)
+    frame = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    overlay = LandmarkOverlay(labels=args.labels)
+
+    def timed(draw):
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            draw(frame)
+        return (time.perf_counter() - start) * 1000.0 / args.frames
+
+    batched = timed(lambda image: overlay.draw(image, hands))
+    per_element = timed(lambda image: _draw_per_element(image, hands, HAND_CONNECTIONS, args.labels))
+    print(f"[OVERLAY] {args.hands} hands at {args.width}x{args.height}, labels={args.labels}: "
+          f"batched {batched:.3f} ms, per-element {per_element:.3f} ms ({per_element / max(batched, 1e-9):.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the batched landmark overlay against per-element drawing")
+    parser.add_argument("--hands", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--labels", action="store_true", help="also draw the landmark index labels")
+    _benchmark(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
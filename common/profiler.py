@@ -0,0 +1,112 @@
+import time
+
+from common.reporting import Reporter, percentiles, report_at_exit
+
+
+class _NullStage:
+    """Context manager returned while profiling is off; does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageProfiler(Reporter):
+    """Per-stage latency recorder for the frame loops.
+
+    Wrap each stage in `with profiler.stage("name"):` and call next_frame()
+    once per loop iteration. When disabled every call returns immediately, so
+    the instrumentation can stay in place permanently.
+
+    Per-frame records are streamed to `output` (.jsonl: one object per frame,
+    .csv: one frame,stage,ms row per stage) and a p50/p95/p99 table is printed
+    on close().
+    """
+
+    def __init__(self, enabled=False, output=None, name="pipeline"):
+        super().__init__(enabled, output, name, ["frame", "stage", "ms"])
+        self.samples = {}  # Stage name -> list of milliseconds
+        self.frames = 0
+        self._current = {}
+        self._frame_start = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        """Add a measured duration to the current frame"""
+        if not self.enabled:
+            return
+        self._current[name] = self._current.get(name, 0.0) + seconds * 1000.0
+
+    def next_frame(self):
+        """Close the running frame record and start a new one"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._finish_frame(now)
+        self._frame_start = now
+
+    def _finish_frame(self, now):
+        record = self._current
+        record["total"] = (now - self._frame_start) * 1000.0
+        for name, ms in record.items():
+            self.samples.setdefault(name, []).append(ms)
+
+        if self.records is not None:
+            self.records.write([[self.frames, name, f"{ms:.3f}"] for name, ms in record.items()],
+                               {"frame": self.frames, **{k: round(v, 3) for k, v in record.items()}})
+
+        self.frames += 1
+        self._current = {}
+        self._frame_start = None
+
+    def summary(self):
+        """Per-stage count, mean, percentiles and max in milliseconds"""
+        return {name: percentiles(values) for name, values in self.samples.items()}
+
+    def report(self):
+        """Print the summary table, slowest stages first"""
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"\n[PROFILE] {self.name}: {self.frames} frames")
+        print(f"{'stage':<14}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)")
+        rows = sorted(summary.items(), key=lambda item: (item[0] != "total", -item[1]["mean"]))
+        for name, s in rows:
+            print(f"{name:<14}{s['count']:>8}{s['mean']:>10.2f}{s['p50']:>10.2f}"
+                  f"{s['p95']:>10.2f}{s['p99']:>10.2f}")
+
+    def finish(self):
+        if self._frame_start is not None and self._current:
+            self._finish_frame(time.perf_counter())
+
+
+def make_profiler(enabled=False, output=None, name="pipeline"):
+    """Create a profiler that reports automatically when the process exits"""
+    return report_at_exit(StageProfiler(enabled, output, name))
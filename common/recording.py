@@ -0,0 +1,357 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from common.landmarks import HAND_POINTS, landmarks_to_array
+
+# Landmark counts for the MediaPipe solutions we record (HAND_POINTS comes from common.landmarks)
+POSE_POINTS = 33
+FACE_POINTS = 478  # 468 without refine_landmarks, the rest is NaN padded
+
+HANDEDNESS_LABELS = ("Left", "Right")
+UNKNOWN_HANDEDNESS = "Unknown"  # Label replayed for handedness code -1
+KINDS = ("hands", "pose", "face")
+# The .npy fields written for each kind, besides the timestamps
+KIND_FIELDS = {"hands": ("hands", "hand_count", "handedness"), "pose": ("pose",), "face": ("face",)}
+
+
+class LandmarkRecorder:
+    """Store MediaPipe results per frame as dense float32 arrays.
+
+    A recording is a directory of .npy chunks (one file per field per chunk)
+    plus meta.json, so it can be memory mapped and read back without parsing:
+
+        timestamps_00000.npy   (N,) float64     seconds since the first frame
+        hands_00000.npy        (N, H, 21, 3)    normalized x, y, z
+        hand_count_00000.npy   (N,) int8
+        handedness_00000.npy   (N, H) int8      0 = Left, 1 = Right, -1 = none
+        pose_00000.npy         (N, 33, 4)       x, y, z, visibility (NaN = none)
+        face_00000.npy         (N, 478, 3)      x, y, z (NaN = none)
+
+    Only the fields of the kinds recorded so far are written, so a hands
+    only session has no pose or face files; a kind that first shows up
+    later in the session is missing from the chunks before that.
+
+    Several solutions can feed one recorder; a row is committed as soon as a
+    kind that is already filled in arrives again, i.e. at the next frame.
+    """
+
+    def __init__(self, path, chunk_size=1024, max_hands=2):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_hands = max_hands
+        os.makedirs(path, exist_ok=True)
+
+        self.frames = 0
+        self.chunks = 0
+        self.kinds = set()
+        self.frame_size = None
+        self._t0 = None
+        self._allocate()
+        self._row = 0
+        self._row_kinds = set()
+        self._row_time = None
+
+    def _allocate(self):
+        n, h = self.chunk_size, self.max_hands
+        self.timestamps = np.zeros(n, dtype=np.float64)
+        self.hands = np.full((n, h, HAND_POINTS, 3), np.nan, dtype=np.float32)
+        self.hand_count = np.zeros(n, dtype=np.int8)
+        self.handedness = np.full((n, h), -1, dtype=np.int8)
+        self.pose = np.full((n, POSE_POINTS, 4), np.nan, dtype=np.float32)
+        self.face = np.full((n, FACE_POINTS, 3), np.nan, dtype=np.float32)
+
+    def add(self, kind, results, timestamp=None):
+        """Record the results of one solution for the current frame"""
+        if kind in self._row_kinds:
+            self._commit_row()
+
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = timestamp
+        if self._row_time is None:
+            self._row_time = timestamp - self._t0
+
+        row = self._row
+        if kind == "hands":
+            self._fill_hands(row, results)
+        elif kind == "pose":
+            self._fill_pose(row, results)
+        elif kind == "face":
+            self._fill_face(row, results)
+        else:
+            raise ValueError(f"Unknown landmark kind: {kind}")
+
+        self.kinds.add(kind)
+        self._row_kinds.add(kind)
+
+    def _fill_hands(self, row, results):
+        if not results.multi_hand_landmarks:
+            return
+        handedness = results.multi_handedness or []
+        count = min(len(results.multi_hand_landmarks), self.max_hands)
+        for i in range(count):
+            self.hands[row, i] = landmarks_to_array(results.multi_hand_landmarks[i])
+            if i < len(handedness):
+                label = handedness[i].classification[0].label
+                self.handedness[row, i] = HANDEDNESS_LABELS.index(label) if label in HANDEDNESS_LABELS else -1
+        self.hand_count[row] = count
+
+    def _fill_pose(self, row, results):
+        if not results.pose_landmarks:
+            return
+        self.pose[row] = landmarks_to_array(results.pose_landmarks, dims=4)
+
+    def _fill_face(self, row, results):
+        if not results.multi_face_landmarks:
+            return
+        points = landmarks_to_array(results.multi_face_landmarks[0])
+        self.face[row, :len(points)] = points[:FACE_POINTS]
+
+    def _commit_row(self):
+        if not self._row_kinds:
+            return
+        self.timestamps[self._row] = self._row_time
+        self._row += 1
+        self.frames += 1
+        self._row_kinds = set()
+        self._row_time = None
+        if self._row == self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        n = self._row
+        if n == 0:
+            return
+        index = f"{self.chunks:05d}"
+        names = ["timestamps"] + [name for kind in KINDS if kind in self.kinds for name in KIND_FIELDS[kind]]
+        for name in names:
+            np.save(os.path.join(self.path, f"{name}_{index}.npy"), getattr(self, name)[:n])
+        self.chunks += 1
+        self._row = 0
+        self._allocate()
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "frames": self.frames,
+            "chunks": self.chunks,
+            "chunk_size": self.chunk_size,
+            "max_hands": self.max_hands,
+            "kinds": sorted(self.kinds),
+            "frame_size": self.frame_size,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        self._commit_row()
+        self._flush()
+        self._write_meta()
+
+
+class _Point:
+    """Stands in for a MediaPipe NormalizedLandmark"""
+    __slots__ = ("x", "y", "z", "visibility", "presence")
+
+    def __init__(self, x, y, z, visibility=float("nan")):
+        self.x, self.y, self.z = x, y, z
+        self.visibility = visibility
+        self.presence = float("nan")
+
+    def HasField(self, name):
+        return getattr(self, name, None) is not None and not np.isnan(getattr(self, name))
+
+
+class LandmarkList:
+    """Stands in for a NormalizedLandmarkList, built lazily from an (N, 3|4) array"""
+    __slots__ = ("array", "_landmark")
+
+    def __init__(self, array):
+        self.array = array
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        if self._landmark is None:
+            self._landmark = [_Point(*row) for row in self.array.tolist()]
+        return self._landmark
+
+
+class _Classification:
+    __slots__ = ("label", "score", "index")
+
+    def __init__(self, label, index):
+        self.label, self.index, self.score = label, index, 1.0
+
+
+class _Handedness:
+    __slots__ = ("classification",)
+
+    def __init__(self, label_index):
+        label = HANDEDNESS_LABELS[label_index] if 0 <= label_index < len(HANDEDNESS_LABELS) else UNKNOWN_HANDEDNESS
+        self.classification = [_Classification(label, label_index)]
+
+
+class ReplayResults:
+    """Shaped like the result object returned by MediaPipe process()"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None,
+                 pose_landmarks=None, multi_face_landmarks=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.pose_landmarks = pose_landmarks
+        self.multi_face_landmarks = multi_face_landmarks
+
+
+def hand_results(hands, count, handedness):
+    """ReplayResults for `count` hands from (H, 21, 3) landmarks and (H,) handedness codes"""
+    if count == 0:
+        return ReplayResults()
+    return ReplayResults(
+        multi_hand_landmarks=[LandmarkList(hands[i]) for i in range(count)],
+        multi_handedness=[_Handedness(int(handedness[i])) for i in range(count)],
+    )
+
+
+class LandmarkReplay:
+    """Memory-mapped read access to a LandmarkRecorder directory"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        def load(name):
+            # None for chunks written before the field's kind was first recorded
+            files = [os.path.join(path, f"{name}_{i:05d}.npy") for i in range(self.meta["chunks"])]
+            return [np.load(f, mmap_mode="r") if os.path.exists(f) else None for f in files]
+
+        self.timestamps = load("timestamps")
+        self.hands = load("hands")
+        self.hand_count = load("hand_count")
+        self.handedness = load("handedness")
+        self.pose = load("pose")
+        self.face = load("face")
+        self.chunk_size = self.meta["chunk_size"]
+
+    def __len__(self):
+        return self.meta["frames"]
+
+    def _locate(self, index):
+        return divmod(index, self.chunk_size)
+
+    def timestamp(self, index):
+        chunk, row = self._locate(index)
+        return float(self.timestamps[chunk][row])
+
+    def results(self, index, kind):
+        """MediaPipe shaped results for one kind at frame index"""
+        chunk, row = self._locate(index)
+        if kind not in KINDS:
+            raise ValueError(f"Unknown landmark kind: {kind}")
+        if getattr(self, KIND_FIELDS[kind][0])[chunk] is None:
+            return ReplayResults()
+        if kind == "hands":
+            return hand_results(self.hands[chunk][row], int(self.hand_count[chunk][row]),
+                                self.handedness[chunk][row])
+        if kind == "pose":
+            pose = self.pose[chunk][row]
+            if np.isnan(pose[0, 0]):
+                return ReplayResults()
+            return ReplayResults(pose_landmarks=LandmarkList(pose))
+        if kind == "face":
+            face = self.face[chunk][row]
+            if np.isnan(face[0, 0]):
+                return ReplayResults()
+            valid = face[~np.isnan(face[:, 0])]
+            return ReplayResults(multi_face_landmarks=[LandmarkList(valid)])
+
+
+class RecordingSolution:
+    """Wrap a MediaPipe solution so every process() result is also recorded"""
+
+    def __init__(self, solution, recorder, kind):
+        self.solution = solution
+        self.recorder = recorder
+        self.kind = kind
+
+    def process(self, image):
+        if self.recorder.frame_size is None:
+            self.recorder.frame_size = [image.shape[1], image.shape[0]]
+        results = self.solution.process(image)
+        self.recorder.add(self.kind, results)
+        return results
+
+    def close(self):
+        self.solution.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplaySolution:
+    """Drop-in for a MediaPipe solution that returns recorded results.
+
+    The image passed to process() is ignored, so downstream gesture logic runs
+    at the cost of the Python code alone. Once the recording is exhausted empty
+    results are returned and `finished` is set.
+    """
+
+    def __init__(self, replay, kind, loop=False):
+        self.replay = replay
+        self.kind = kind
+        self.loop = loop
+        self.index = 0
+        self.finished = len(replay) == 0
+
+    def process(self, image=None):
+        if self.index >= len(self.replay):
+            if not self.loop or len(self.replay) == 0:
+                self.finished = True
+                return ReplayResults()
+            self.index = 0
+        results = self.replay.results(self.index, self.kind)
+        self.index += 1
+        return results
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _benchmark(path):
+    """Replay every recorded kind and report frames per second"""
+    replay = LandmarkReplay(path)
+    print(f"[REPLAY] {path}: {len(replay)} frames, kinds={replay.meta['kinds']}, "
+          f"duration={replay.timestamp(len(replay) - 1) if len(replay) else 0:.1f}s")
+    for kind in replay.meta["kinds"]:
+        start = time.perf_counter()
+        for i in range(len(replay)):
+            results = replay.results(i, kind)
+            lists = (results.multi_hand_landmarks or []) + (results.multi_face_landmarks or [])
+            if results.pose_landmarks:
+                lists.append(results.pose_landmarks)
+            for landmark_list in lists:
+                _ = landmark_list.landmark  # Materialize like real consumers do
+        elapsed = time.perf_counter() - start
+        print(f"[REPLAY] {kind}: {len(replay) / elapsed if elapsed else 0:.0f} frames/s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m common.recording RECORDING_DIR")
+        sys.exit(1)
+    _benchmark(sys.argv[1])
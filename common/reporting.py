@@ -0,0 +1,73 @@
+import atexit
+import csv
+import json
+
+import numpy as np
+
+
+def percentiles(values):
+    """Count, mean, p50/p95/p99 and max of a list of milliseconds (all zero when empty)"""
+    if len(values) == 0:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    data = np.asarray(values)
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {"count": len(values), "mean": float(data.mean()), "p50": float(p50),
+            "p95": float(p95), "p99": float(p99), "max": float(data.max())}
+
+
+class RecordFile:
+    """Per-frame records streamed to .jsonl (one object per line) or .csv (a header, then rows)"""
+
+    def __init__(self, path, header):
+        self._file = open(path, "w", newline="")
+        self._csv = None
+        if path.endswith(".csv"):
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(header)
+
+    def write(self, rows, record):
+        """Write `rows` to a CSV file, or the `record` dict as one JSON line"""
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class Reporter:
+    """Base of the measurement recorders that print a table when they close.
+
+    Subclasses fill in report() and, when a record may still be open at
+    the end, finish(). `records` is a RecordFile when enabled with an output
+    path, None otherwise.
+    """
+
+    def __init__(self, enabled, output, name, header):
+        self.enabled = enabled
+        self.name = name
+        self.records = RecordFile(output, header) if enabled and output else None
+        self._closed = False
+
+    def finish(self):
+        pass
+
+    def report(self):
+        raise NotImplementedError
+
+    def close(self):
+        if not self.enabled or self._closed:
+            return
+        self._closed = True
+        self.finish()
+        self.report()
+        if self.records is not None:
+            self.records.close()
+
+
+def report_at_exit(reporter):
+    """Close `reporter` (printing its report) when the process exits, if it is enabled"""
+    if reporter.enabled:
+        atexit.register(reporter.close)
+    return reporter
@@ -0,0 +1,162 @@
+"""Run many independent pipeline instances, one process per stream.
+
+    python -m common.runner robot --streams 4 --sources synthetic:640x480:600
+    python -m common.runner robot --sources sessions/*.mp4 --workers 3 -- --inference-scale 0.5
+
+Every worker process is pinned to its own cores and runs the app's main()
+headless with profiling on; the per-stream FPS and latency percentiles are
+collected and summed so the number of streams a pipeline sustains per core
+can be read off directly. Arguments after -- are passed to every app.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Apps whose main(argv) returns {"source": stats, "profile": summary}
+APPS = {
+    "object_detection": "Project-02-ObjectDetection/object_detection.py",
+    "robot": "Project-06-Robot/main.py",
+    "cloak": "Project-07-InvisibilityCloak/invisibility_cloak.py",
+}
+
+_worker_cores = None
+
+
+def _init_worker(slot_counter, core_groups, threads):
+    """Claim the next core group for this worker process and pin to it"""
+    global _worker_cores
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    _worker_cores = core_groups[slot % len(core_groups)]
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, _worker_cores)
+
+    # Keep OpenCV / BLAS / torch from spawning a thread per machine core
+    for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def _load_app(path):
+    app_dir = os.path.dirname(os.path.abspath(path))
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)  # For the app's own sibling imports
+    spec = importlib.util.spec_from_file_location("_runner_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run_stream(path, index, source, app_args):
+    """Worker: one complete pipeline run over one source"""
+    app = _load_app(path)
+    argv = ["--source", source, "--profile"] + list(app_args)
+    if not any(a == "--headless" or a.startswith("--headless=") for a in app_args):
+        argv.append("--headless")
+    start = time.perf_counter()
+    result = app.main(argv) or {}
+    return {
+        "stream": index,
+        "source": source,
+        "pid": os.getpid(),
+        "cores": sorted(_worker_cores or ()),
+        "wall": time.perf_counter() - start,
+        "stats": result.get("source", {}),
+        "profile": result.get("profile", {}),
+    }
+
+
+def _core_groups(cores, per_stream):
+    groups = [set(cores[i:i + per_stream]) for i in range(0, len(cores), per_stream)]
+    return [g for g in groups if len(g) == per_stream] or [set(cores)]
+
+
+def _report(results, cores_used, target_fps):
+    print(f"\n[RUNNER] {len(results)} streams on {cores_used} cores")
+    print(f"{'stream':>6}  {'source':<32}{'cores':>8}{'frames':>8}{'fps':>9}"
+          f"{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}   (ms/frame)")
+    for r in results:
+        total = r["profile"].get("total", {})
+        cores = ",".join(str(c) for c in r["cores"])
+        print(f"{r['stream']:>6}  {r['source'][-32:]:<32}{cores:>8}{r['stats'].get('frames', 0):>8}"
+              f"{r['stats'].get('fps', 0.0):>9.1f}{total.get('mean', 0.0):>9.2f}{total.get('p50', 0.0):>9.2f}"
+              f"{total.get('p95', 0.0):>9.2f}{total.get('p99', 0.0):>9.2f}")
+
+    fps = [r["stats"].get("fps", 0.0) for r in results]
+    aggregate = sum(fps)
+    sustained = sum(f >= target_fps for f in fps)
+    print(f"[RUNNER] aggregate {aggregate:.1f} FPS, {aggregate / max(cores_used, 1):.1f} FPS per core, "
+          f"{sustained}/{len(results)} streams at >= {target_fps:g} FPS "
+          f"(~{aggregate / target_fps / max(cores_used, 1):.2f} streams per core)")
+    return {"streams": len(results), "cores": cores_used, "aggregate_fps": aggregate,
+            "fps_per_core": aggregate / max(cores_used, 1), "sustained": sustained}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    app_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, app_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description="Run N pipeline instances across a process pool")
+    parser.add_argument("app", help=f"one of {', '.join(APPS)} or a path to a script with main(argv)")
+    parser.add_argument("--sources", nargs="+", default=["synthetic:640x480:600"],
+                        help="one source per stream (cycled when --streams is larger)")
+    parser.add_argument("--streams", type=int, default=None, help="number of streams (default: one per source)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes running at once (default: one per stream); "
+                             "extra streams queue, e.g. for a batch of recorded sessions")
+    parser.add_argument("--cores", type=int, nargs="+", default=None,
+                        help="cores to pin to (default: all available to this process)")
+    parser.add_argument("--cores-per-stream", type=int, default=1)
+    parser.add_argument("--target-fps", type=float, default=30.0,
+                        help="FPS a stream has to reach to count as sustained")
+    parser.add_argument("--json", metavar="PATH", help="write per-stream results and the summary here")
+    args = parser.parse_args(argv)
+
+    path = APPS.get(args.app)
+    path = os.path.join(ROOT, path) if path else args.app
+    streams = args.streams or len(args.sources)
+    sources = [args.sources[i % len(args.sources)] for i in range(streams)]
+    workers = min(args.workers or streams, streams)
+
+    if args.cores is not None:
+        cores = args.cores
+    elif hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    groups = _core_groups(cores, args.cores_per_stream)
+    if workers > len(groups):
+        print(f"[RUNNER] {workers} workers share {len(groups)} core groups")
+
+    # Spawn rather than fork: the parent must not hand threads or camera
+    # handles to the children
+    context = multiprocessing.get_context("spawn")
+    slot_counter = context.Value("i", 0)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(slot_counter, groups, args.cores_per_stream)) as pool:
+        futures = [pool.submit(_run_stream, path, i, source, app_args) for i, source in enumerate(sources)]
+        results = [future.result() for future in futures]
+
+    cores_used = len(set().union(*(set(r["cores"]) for r in results))) or len(cores)
+    summary = _report(results, cores_used, args.target_fps)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"app": args.app, "summary": summary, "streams": results}, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    main()
@@ -0,0 +1,228 @@
+import math
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+from common.capture import ThreadedCapture
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+# synthetic[:WIDTHxHEIGHT][@FPS][:FRAMES], e.g. synthetic:1280x720@30:600
+SYNTHETIC_SPEC = re.compile(r"^synthetic(?::(\d+)x(\d+))?(?:@(\d+(?:\.\d+)?))?(?::(\d+))?$")
+
+
+class FrameSource:
+    """Base class for non-camera sources with a cv2.VideoCapture style interface.
+
+    In max speed mode (the default) read() returns the next frame as soon as it
+    is asked for. With realtime=True reads are paced at the source FPS so the
+    pipeline sees the same timing it would get from a camera.
+    """
+
+    def __init__(self, fps=30.0, realtime=False):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.frames = 0
+        self._start = None
+        self._opened = True
+        self.last_timestamp = None
+
+    def _next_image(self):
+        """Return the next BGR image or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def _pace(self):
+        target = self._start + self.frames / self.fps
+        delay = target - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self._start is None:
+            self._start = time.perf_counter()
+        if self.realtime:
+            self._pace()
+
+        image = self._next_image()
+        if image is None:
+            self._opened = False
+            return False, None
+        self.last_timestamp = time.perf_counter()
+        self.frames += 1
+        return True, image
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._start if self._start else 0.0
+        return {
+            "frames": self.frames,
+            "elapsed": elapsed,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def release(self):
+        self._opened = False
+
+
+class VideoFileSource(FrameSource):
+    """Frames decoded from a video file"""
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime)
+        self.loop = loop
+
+    def _next_image(self):
+        ret, image = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, image = self.cap.read()
+        return image if ret else None
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Frames read from a directory of images in file name order"""
+
+    def __init__(self, path, fps=30.0, realtime=False, loop=False):
+        super().__init__(fps, realtime)
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise IOError(f"No images found in: {path}")
+        self.loop = loop
+        self.index = 0
+
+    def _next_image(self):
+        while True:
+            if self.index >= len(self.paths):
+                if not self.loop:
+                    return None
+                self.index = 0
+            path = self.paths[self.index]
+            self.index += 1
+            image = cv2.imread(path)
+            if image is not None:
+                return image
+            print(f"[SOURCE] Skipping unreadable image: {path}")
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated frames for machines without a camera.
+
+    A gradient background with a skin toned and a blue blob moving across it,
+    so the colour based pipelines (e.g. the cloak mask) have work to do.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, frames=None, realtime=False):
+        super().__init__(fps, realtime)
+        self.width, self.height = width, height
+        self.max_frames = frames
+        self._build_background()
+
+    def _build_background(self):
+        ramp_x = np.linspace(40, 200, self.width, dtype=np.float32)
+        ramp_y = np.linspace(20, 120, self.height, dtype=np.float32)
+        background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        background[..., 0] = ramp_x[None, :]
+        background[..., 1] = ramp_y[:, None]
+        background[..., 2] = 90
+        self.background = background
+
+    def _next_image(self):
+        if self.max_frames is not None and self.frames >= self.max_frames:
+            return None
+
+        t = self.frames / self.fps
+        image = self.background.copy()
+        radius = max(10, min(self.width, self.height) // 8)
+
+        # Skin toned blob on a circular path
+        hx = int(self.width / 2 + self.width / 3 * math.cos(t))
+        hy = int(self.height / 2 + self.height / 3 * math.sin(t))
+        cv2.circle(image, (hx, hy), radius, (120, 160, 220), -1)
+
+        # Blue "cloak" sweeping left and right
+        bx = int(self.width / 2 + self.width / 3 * math.sin(0.5 * t))
+        cv2.rectangle(image, (bx - radius, self.height // 3),
+                      (bx + radius, 2 * self.height // 3), (200, 90, 40), -1)
+
+        cv2.putText(image, str(self.frames), (10, self.height - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        return image
+
+    def set(self, prop, value):
+        # Honour the capture size the projects ask for
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+            return True
+        else:
+            return False
+        self._build_background()
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return super().get(prop)
+
+
+def open_source(spec=0, realtime=False, width=None, height=None, loop=False):
+    """Open a frame source from a command line style spec.
+
+    "0", "1", ...       webcam index (threaded, always real time)
+    synthetic[...]      generated frames, see SYNTHETIC_SPEC
+    a directory         images in file name order
+    anything else       a video file
+    """
+    spec = str(spec)
+
+    if spec.isdigit():
+        return ThreadedCapture(int(spec), width=width, height=height)
+
+    match = SYNTHETIC_SPEC.match(spec)
+    if match:
+        w, h, fps, frames = match.groups()
+        return SyntheticSource(
+            width=int(w) if w else (width or 640),
+            height=int(h) if h else (height or 480),
+            fps=float(fps) if fps else 30.0,
+            frames=int(frames) if frames else None,
+            realtime=realtime,
+        )
+
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, loop=loop)
+
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
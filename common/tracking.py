@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+from common.inference import inference_input
+from common.latency import capture_timestamp
+from common.profiler import make_profiler
+
+# Newest tracking result: normalized (x, y) of the followed landmark (None
+# without a hand), the capture time of its frame, a running number, the
+# mirrored camera frame, the raw solution results and when inference finished
+HandSample = namedtuple("HandSample", ["point", "timestamp", "seq", "frame", "results", "inferred"])
+
+
+class HandTrackingWorker:
+    """Run capture and Hands inference on a background thread.
+
+    The game loop calls latest() instead of cap.read() + hands.process(), which
+    never blocks: it returns the newest published sample, so rendering keeps
+    its own frame rate while inference runs as fast as the CPU allows.
+
+    `annotate(frame, results)` is called on the worker thread before a sample
+    is published, so drawing the landmarks on the preview is off the main loop
+    too. The capture and solution must not be used by anything else meanwhile.
+    """
+
+    def __init__(self, cap, hands, scale=1.0, landmark=8, annotate=None, profile=False):
+        self.cap = cap
+        self.hands = hands
+        self.scale = scale
+        self.landmark = landmark
+        self.annotate = annotate
+        self.profiler = make_profiler(profile, None, "tracking worker")
+
+        self.seq = 0
+        self.finished = False
+        self._latest = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._started = None
+
+    def start(self):
+        if self._thread is None:
+            self._started = time.perf_counter()
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, name="HandTrackingWorker", daemon=True)
+            self._thread.start()
+        return self
+
+    def _worker(self):
+        profiler = self.profiler
+        while self._running:
+            profiler.next_frame()
+            with profiler.stage("read"):
+                success, frame = self.cap.read()
+            if not success:
+                if not self.cap.isOpened():
+                    break
+                continue
+            timestamp = capture_timestamp(self.cap)
+
+            with profiler.stage("flip"):
+                frame = cv2.flip(frame, 1)
+            with profiler.stage("cvtColor"):
+                frame_rgb = inference_input(frame, self.scale)
+            with profiler.stage("inference"):
+                results = self.hands.process(frame_rgb)
+            inferred = time.perf_counter()
+
+            point = None
+            if results and results.multi_hand_landmarks:
+                lm = results.multi_hand_landmarks[0].landmark[self.landmark]
+                point = (lm.x, lm.y)
+                if self.annotate is not None:
+                    with profiler.stage("overlay"):
+                        self.annotate(frame, results)
+
+            with self._lock:
+                self.seq += 1
+                self._latest = HandSample(point, timestamp, self.seq, frame, results, inferred)
+        self.finished = True
+
+    def latest(self):
+        """Newest sample, or None before the first frame has been processed"""
+        with self._lock:
+            return self._latest
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "frames": self.seq,
+            "elapsed": elapsed,
+            "fps": self.seq / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
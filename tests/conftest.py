@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The project folders are not packages; their scripts import siblings by module name
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Project-01-HandCarGame"), os.path.join(ROOT, "Project-02-ObjectDetection")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
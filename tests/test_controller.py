@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+import controller
+from controller import AdaptiveController, parse_level
+
+LEVELS = [("yolov8m.pt", 640), ("yolov8s.pt", 640), ("yolov8n.pt", 320)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeModel:
+    """Takes latency[level] ms of fake time per frame"""
+
+    names = {0: "person"}
+
+    def __init__(self, clock, latency, level):
+        self.clock, self.latency, self.level = clock, latency, level
+
+    def __call__(self, frames, imgsz, verbose):
+        self.clock.now += self.latency[self.level] * len(frames) / 1000.0
+        return [None] * len(frames)
+
+
+@pytest.fixture
+def make_controller(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(controller.time, "perf_counter", clock)
+
+    def make(latency, **kwargs):
+        load = lambda weights, imgsz: FakeModel(clock, latency, LEVELS.index((weights, imgsz)))
+        return AdaptiveController(LEVELS, load, budget_ms=10.0, window=4, headroom=0.7, **kwargs)
+    return make
+
+
+def _run(adaptive, frames):
+    for _ in range(frames):
+        adaptive.predict([object()])
+
+
+def test_parse_level():
+    assert parse_level("yolov8s.pt:480") == ("yolov8s.pt", 480)
+    assert parse_level("yolov8s.pt") == ("yolov8s.pt", 640)
+    assert parse_level("C:/models/best.pt") == ("C:/models/best.pt", 640)
+
+
+def test_needs_a_level():
+    with pytest.raises(ValueError):
+        AdaptiveController([], None, budget_ms=10.0)
+
+
+def test_steps_down_over_budget_and_stops_at_fastest(make_controller):
+    adaptive = make_controller({0: 15.0, 1: 12.0, 2: 11.0})
+
+    _run(adaptive, 3)
+    assert adaptive.level == 0  # Not a full window yet
+    _run(adaptive, 1)
+    assert adaptive.current == LEVELS[1]
+    _run(adaptive, 8)
+    assert adaptive.current == LEVELS[2]
+    assert [s["to"] for s in adaptive.switches] == ["yolov8s@640", "yolov8n@320"]
+    assert adaptive.stats()["measured_p90"] == pytest.approx(
+        {"yolov8m@640": 15.0, "yolov8s@640": 12.0, "yolov8n@320": 11.0})
+
+
+def test_steps_up_under_headroom(make_controller):
+    adaptive = make_controller({0: 8.0, 1: 5.0, 2: 5.0})
+    adaptive.level = 1
+
+    _run(adaptive, 4)
+    assert adaptive.level == 0
+    # 8 ms is within budget but above the headroom: hold
+    _run(adaptive, 20)
+    assert adaptive.level == 0
+    assert len(adaptive.switches) == 1
+
+
+def test_reprobes_level_measured_over_budget_after_calm_windows(make_controller):
+    latency = {0: 15.0, 1: 5.0, 2: 5.0}
+    adaptive = make_controller(latency, reprobe=2)
+
+    _run(adaptive, 4)
+    assert adaptive.level == 1
+    # Calm frames count from the first full window; 2 windows of them re-probe level 0
+    _run(adaptive, 10)
+    assert adaptive.level == 1
+    _run(adaptive, 1)
+    assert adaptive.level == 0
+    assert 0 not in adaptive.measured
+
+    # Still too slow: back down, and the fresh measurement blocks the next step up again
+    _run(adaptive, 4)
+    assert adaptive.level == 1
+    _run(adaptive, 10)
+    assert adaptive.level == 1
+    assert len(adaptive.switches) == 3
+
+
+def test_switches_append_to_log(make_controller, tmp_path):
+    path = tmp_path / "adapt.jsonl"
+    path.write_text('{"earlier": "run"}\n')
+    adaptive = make_controller({0: 15.0, 1: 5.0, 2: 5.0}, log=str(path))
+
+    _run(adaptive, 4)
+    adaptive.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[0] == {"earlier": "run"}
+    assert lines[1]["from"] == "yolov8m@640" and lines[1]["to"] == "yolov8s@640"
+    assert lines[1]["frame"] == 4 and lines[1]["p90_ms"] == 15.0 and lines[1]["budget_ms"] == 10.0
@@ -0,0 +1,46 @@
+import numpy as np
+
+from obstacles import ObstacleField
+
+
+def test_spawn_grows_storage_and_keeps_rows():
+    field = ObstacleField(capacity=2)
+    field.spawn(10, -60, 40, 60)
+    field.spawn_many(np.array([100, 200, 300]), np.array([-10, -20, -30]), 50, 70)
+
+    assert len(field) == 4
+    assert len(field.rects) >= 4
+    assert field.active.tolist() == [[10, -60, 40, 60], [100, -10, 50, 70], [200, -20, 50, 70], [300, -30, 50, 70]]
+
+
+def test_advance_moves_and_culls_past_limit():
+    field = ObstacleField()
+    field.spawn_many(np.array([0, 10, 20]), np.array([0, 90, 195]), 10, 10)
+
+    passed = field.advance(10, 200)
+
+    assert passed == 1
+    assert field.active.tolist() == [[0, 10, 10, 10], [10, 100, 10, 10]]
+    assert field.advance(0, 200) == 0
+    assert len(field) == 2
+
+
+def test_advance_keeps_obstacle_exactly_on_limit():
+    field = ObstacleField()
+    field.spawn(0, 190, 10, 10)
+    assert field.advance(10, 200) == 0
+    assert field.advance(1, 200) == 1
+    assert len(field) == 0
+
+
+def test_hits_and_collides():
+    field = ObstacleField()
+    field.spawn(0, 0, 10, 10)
+    field.spawn(50, 50, 10, 10)
+
+    assert field.hits((5, 5, 10, 10)).tolist() == [True, False]
+    assert field.collides((55, 55, 1, 1))
+    # Touching edges do not overlap
+    assert not field.collides((10, 0, 10, 10))
+    field.clear()
+    assert not field.collides((0, 0, 100, 100))
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from pipeline import StageQueue
+
+
+def test_put_drops_oldest_when_full():
+    queue = StageQueue("test", maxsize=2)
+    for item in range(5):
+        queue.put(item)
+
+    assert len(queue) == 2
+    assert (queue.puts, queue.dropped) == (5, 3)
+    assert [queue.get(0), queue.get(0)] == [3, 4]
+    stats = queue.stats()
+    assert stats["max_depth"] == 2 and stats["dropped"] == 3 and stats["wait"]["count"] == 2
+
+
+def test_maxsize_at_least_one():
+    queue = StageQueue("test", maxsize=0)
+    queue.put("a")
+    queue.put("b")
+    assert queue.get_nowait() == "b"
+    assert queue.dropped == 1
+
+
+def test_get_times_out_with_none():
+    queue = StageQueue("test")
+    start = time.perf_counter()
+    assert queue.get(timeout=0.05) is None
+    assert time.perf_counter() - start >= 0.04
+    assert queue.get_nowait() is None
+    assert queue.stats()["wait"]["count"] == 0
+
+
+def test_get_wakes_on_put():
+    queue = StageQueue("test")
+    threading.Timer(0.02, queue.put, ("frame",)).start()
+    assert queue.get(timeout=5.0) == "frame"
+
+
+def test_close_wakes_waiter_and_drains_remaining_items():
+    queue = StageQueue("test")
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(queue.get()))
+    waiter.start()
+    time.sleep(0.02)
+    queue.close()
+    waiter.join(5.0)
+    assert not waiter.is_alive() and results == [None]
+
+    # Whatever is still queued is handed out, then get() returns None without waiting
+    queue.put("last")
+    assert queue.get() == "last"
+    assert queue.get() is None
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from common.recording import (HAND_POINTS, POSE_POINTS, LandmarkList, LandmarkRecorder, LandmarkReplay,
+                              ReplayResults, hand_results)
+
+
+def _hands(frame, count):
+    points = np.full((2, HAND_POINTS, 3), frame / 100.0, dtype=np.float32)
+    points[1] += 0.5
+    return points, count
+
+
+def _pose(frame):
+    pose = np.full((POSE_POINTS, 4), frame / 100.0, dtype=np.float32)
+    pose[:, 3] = 0.9
+    return ReplayResults(pose_landmarks=LandmarkList(pose))
+
+
+def _record(path, frames=10, pose_from=6, chunk_size=4):
+    recorder = LandmarkRecorder(str(path), chunk_size=chunk_size)
+    for frame in range(frames):
+        points, count = _hands(frame, frame % 3)
+        recorder.add("hands", hand_results(points, count, np.array([1, -1], dtype=np.int8)), timestamp=frame * 0.1)
+        if frame >= pose_from:
+            recorder.add("pose", _pose(frame), timestamp=frame * 0.1)
+    recorder.close()
+    return recorder
+
+
+def test_round_trip_across_chunks(tmp_path):
+    _record(tmp_path)
+    replay = LandmarkReplay(str(tmp_path))
+
+    assert len(replay) == 10
+    assert replay.meta["chunks"] == 3
+    assert sorted(replay.meta["kinds"]) == ["hands", "pose"]
+    for frame in range(10):
+        assert abs(replay.timestamp(frame) - frame * 0.1) < 1e-9
+        results = replay.results(frame, "hands")
+        points, count = _hands(frame, frame % 3)
+        assert len(results.multi_hand_landmarks or []) == count
+        for i, hand in enumerate(results.multi_hand_landmarks or []):
+            np.testing.assert_allclose(hand.array, points[i])
+
+
+def test_kind_first_recorded_mid_session(tmp_path):
+    _record(tmp_path, pose_from=6)
+    replay = LandmarkReplay(str(tmp_path))
+
+    # Chunk 0 (frames 0-3) was flushed before any pose arrived, so it has no pose file
+    assert not os.path.exists(tmp_path / "pose_00000.npy")
+    assert os.path.exists(tmp_path / "pose_00001.npy")
+    for frame in range(10):
+        pose = replay.results(frame, "pose").pose_landmarks
+        if frame < 6:
+            assert pose is None
+        else:
+            np.testing.assert_allclose(pose.array[:, 0], frame / 100.0)
+
+
+def test_only_recorded_kinds_are_written(tmp_path):
+    _record(tmp_path, pose_from=10)
+    assert not any(name.startswith(("face_", "pose_")) for name in os.listdir(tmp_path))
+    replay = LandmarkReplay(str(tmp_path))
+    assert replay.results(0, "face").multi_face_landmarks is None
+
+
+def test_unknown_handedness_is_not_replayed_as_left(tmp_path):
+    _record(tmp_path)
+    replay = LandmarkReplay(str(tmp_path))
+    labels = [h.classification[0].label for h in replay.results(2, "hands").multi_handedness]
+    assert labels == ["Right", "Unknown"]
@@ -0,0 +1,39 @@
+from simulation import CarSimulation, run, steering_signal
+
+
+def test_same_seed_same_run():
+    first, _, _ = run(3000, seed=7, steer="random", restart=True)
+    second, _, _ = run(3000, seed=7, steer="random", restart=True)
+    assert first.digest() == second.digest()
+    assert first.score == second.score
+
+
+def test_different_seed_different_obstacles():
+    first, _, _ = run(600, seed=1, steer="sine", stress=50)
+    second, _, _ = run(600, seed=2, steer="sine", stress=50)
+    assert first.digest() != second.digest()
+
+
+def test_stress_mode_never_ends_the_game():
+    sim, games, _ = run(2000, seed=3, steer="sine", stress=200)
+    assert games == 1
+    assert not sim.game_over
+    assert sim.ticks == 2000
+    assert sim.collisions > 0
+
+
+def test_steer_is_clamped_to_the_road():
+    sim = CarSimulation(600, 800, seed=0)
+    for _ in range(50):
+        sim.step(0.0)
+    assert sim.car_x == 40
+    for _ in range(50):
+        sim.step(1.0)
+    assert sim.car_x + sim.car_w == 600 - 40
+
+
+def test_steering_file_repeats_and_keeps_missing_hands(tmp_path):
+    path = tmp_path / "steer.txt"
+    path.write_text("0.25\n\nnan\n0.75\n")
+    signal = steering_signal(str(path))
+    assert [next(signal) for _ in range(6)] == [0.25, None, None, 0.75, 0.25, None]
@@ -0,0 +1,52 @@
+import numpy as np
+
+from tiling import merge_detections, tile_grid
+
+
+def test_tile_grid_covers_frame_and_ends_on_border():
+    tiles = tile_grid(1920, 1080, 640, overlap=0.2)
+
+    assert sorted(set(tiles[:, 0].tolist())) == [0, 512, 1024, 1280]
+    assert sorted(set(tiles[:, 1].tolist())) == [0, 440]
+    assert len(tiles) == 8
+    assert ((tiles[:, 2] - tiles[:, 0]) == 640).all() and ((tiles[:, 3] - tiles[:, 1]) == 640).all()
+    assert tiles[:, 2].max() == 1920 and tiles[:, 3].max() == 1080
+
+    covered = np.zeros((1080, 1920), dtype=bool)
+    for x1, y1, x2, y2 in tiles:
+        covered[y1:y2, x1:x2] = True
+    assert covered.all()
+
+
+def test_tile_grid_frame_smaller_than_tile():
+    assert tile_grid(320, 240, 640).tolist() == [[0, 0, 320, 240]]
+    assert tile_grid(640, 640, 640).tolist() == [[0, 0, 640, 640]]
+    assert tile_grid(1000, 200, 640, overlap=0.5).tolist() == [[0, 0, 640, 200], [320, 0, 960, 200],
+                                                               [360, 0, 1000, 200]]
+
+
+def test_merge_drops_cut_box_inside_whole_one():
+    boxes = np.array([[100, 100, 200, 200], [150, 100, 200, 200], [400, 400, 450, 450]], dtype=np.float32)
+    scores = np.array([0.6, 0.9, 0.5], dtype=np.float32)
+    classes = np.array([0, 0, 0])
+
+    kept_boxes, kept_scores, kept_classes = merge_detections(boxes, scores, classes)
+
+    # The half box has IoU 0.5 with the whole one but lies entirely inside it; the higher score wins
+    assert kept_boxes.tolist() == [[150, 100, 200, 200], [400, 400, 450, 450]]
+    assert kept_scores.tolist() == [np.float32(0.9), np.float32(0.5)]
+    assert kept_classes.tolist() == [0, 0]
+
+
+def test_merge_is_class_aware():
+    boxes = np.array([[0, 0, 100, 100], [10, 10, 90, 90]], dtype=np.float32)
+    scores = np.array([0.8, 0.7], dtype=np.float32)
+
+    assert len(merge_detections(boxes, scores, np.array([0, 1]))[0]) == 2
+    assert len(merge_detections(boxes, scores, np.array([2, 2]))[0]) == 1
+
+
+def test_merge_empty():
+    boxes, scores, classes = merge_detections(np.zeros((0, 4), np.float32), np.zeros(0, np.float32),
+                                              np.zeros(0, np.int64))
+    assert boxes.shape == (0, 4) and len(scores) == 0 and len(classes) == 0
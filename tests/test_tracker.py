@@ -0,0 +1,80 @@
+import numpy as np
+
+from tracker import BoxTracker, DetectionSchedule
+
+
+def _boxes(*rows):
+    return np.array(rows, dtype=np.float32)
+
+
+def _textured(height=240, width=320, seed=0):
+    image = np.random.default_rng(seed).integers(0, 256, (height // 8, width // 8), dtype=np.uint8)
+    return np.kron(image, np.ones((8, 8), dtype=np.uint8))
+
+
+def test_update_keeps_ids_of_matched_boxes():
+    tracker = BoxTracker(iou_threshold=0.3)
+    gray = np.zeros((240, 320), np.uint8)
+    tracker.update(gray, _boxes([10, 10, 50, 50], [100, 100, 150, 150]),
+                   np.array([0.9, 0.8], np.float32), np.array([0, 1]))
+
+    tracks = tracker.update(gray, _boxes([102, 101, 152, 151], [12, 11, 52, 51]),
+                            np.array([0.7, 0.6], np.float32), np.array([1, 0]))
+
+    assert {t.id: t.box.tolist() for t in tracks} == {1: [12, 11, 52, 51], 2: [102, 101, 152, 151]}
+    assert tracker.next_id == 3
+    assert all(t.missed == 0 for t in tracks)
+
+
+def test_update_does_not_match_across_classes():
+    tracker = BoxTracker()
+    gray = np.zeros((240, 320), np.uint8)
+    tracker.update(gray, _boxes([10, 10, 50, 50]), np.array([0.9], np.float32), np.array([0]))
+    tracks = tracker.update(gray, _boxes([10, 10, 50, 50]), np.array([0.9], np.float32), np.array([2]))
+
+    assert [(t.id, t.cls, t.missed) for t in tracks] == [(1, 0, 1), (2, 2, 0)]
+
+
+def test_unmatched_tracks_dropped_after_max_missed():
+    tracker = BoxTracker(max_missed=1)
+    gray = np.zeros((240, 320), np.uint8)
+    boxes, scores, classes = tracker.detections()
+    tracker.update(gray, _boxes([10, 10, 50, 50]), np.array([0.9], np.float32), np.array([0]))
+
+    tracker.update(gray, boxes, scores, classes)
+    assert [t.missed for t in tracker.tracks] == [1]
+    tracker.update(gray, boxes, scores, classes)
+    assert tracker.tracks == []
+    assert len(tracker.detections()[0]) == 0
+
+
+def test_propagate_follows_shifted_image():
+    tracker = BoxTracker()
+    previous = _textured()
+    tracker.update(previous, _boxes([80, 60, 160, 140]), np.array([0.9], np.float32), np.array([0]))
+
+    lost = tracker.propagate(np.roll(previous, (2, 3), axis=(0, 1)))
+
+    assert lost == 0
+    np.testing.assert_allclose(tracker.tracks[0].box, [83, 62, 163, 142], atol=0.5)
+    boxes, scores, classes = tracker.detections()
+    assert boxes.dtype == np.float32 and scores.tolist() == [np.float32(0.9)] and classes.tolist() == [0]
+
+
+def test_schedule_detects_every_n_and_after_trigger():
+    schedule = DetectionSchedule(every=3)
+    gray = np.zeros((240, 320), np.uint8)
+    empty = schedule.tracker.detections()
+
+    decisions = []
+    for _ in range(7):
+        decisions.append(schedule.due())
+        if decisions[-1]:
+            schedule.detect(gray, *empty)
+        else:
+            schedule.track(gray)
+
+    assert decisions == [True, False, False, True, False, False, True]
+    assert (schedule.detected, schedule.tracked) == (3, 4)
+    schedule.trigger()
+    assert schedule.due()